@@ -11,7 +11,6 @@ Supervised by: Jose Jesus Castro Sanchez
 import sys
 import os
 import logging
-import json
 import ctypes
 import pygame
 import pygame_gui
@@ -25,19 +24,32 @@ from src.render.menu import MainMenu
 from src.render.level_select import LevelSelect
 from src.render.game import GameScreen
 from src.render.missing_image import missing_texture_pygame
-from src.script.game_manager import GameManager
+from src.script.game_manager import GameManager, TICK_SEQUENTIAL
+from src.level.level_cache import level_cache
+from src.storage.score_store import score_store
+from src.storage.persistence import persistence
+from src.storage.settings import settings
+from src.storage.script_store import script_store
 from src.render.error_handler import error_handler
 from src.render.sound_manager import sound_manager
+from src.render.invalidation import invalidation
+from src.render.frame_timer import FrameTimer
 
 # Constants
 SCREEN_WIDTH = 1000  # 1000
 SCREEN_HEIGHT = 600  # 600
 GAME_NAME = "Syntax Depot"
-DATA_FILE = "data/options.json"
 SPRITES_FOLDER = "res/sprites"
 SFX_FOLDER = "res/sfx"
 
 FONTS = ["res/fonts/PixelOperator8.ttf", "res/fonts/PixelOperatorMono8.ttf"]
+FPS = 60  # Frame rate while something is moving
+IDLE_FPS = 10  # Frame rate when nothing changes on screen
+ACTIVE_TIME = 500  # Time (ms) after the last input event during which the whole screen keeps being redrawn (UI transitions)
+RESIZE_DELAY = 150  # Time (ms) without resize events after which the scene is laid out for the final window size
+SIMULATION_THREAD = False  # Run the simulation on a worker thread instead of the main loop
+SIMULATION_STEPS_PER_SECOND = 2.0  # Simulation speed when it runs on the worker thread
+TICK_MODE = TICK_SEQUENTIAL  # TICK_INTENTS resolves the robot actions of each step together (order independent, one step later)
 
 
 def main():
@@ -76,7 +88,7 @@ def main():
     pygame.init()  # Initialize pygame
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
     pygame.display.set_caption(f"{GAME_NAME} - Main menu")  # Set the window title
-    game_manager = GameManager()  # Create the game manager
+    game_manager = GameManager(tick_mode=TICK_MODE)  # Create the game manager
     manager = pygame_gui.UIManager((SCREEN_WIDTH, SCREEN_HEIGHT))  # Create the UI manager
     manager.get_theme().get_font_dictionary().add_font_path("PixelOperator8", FONTS[0])  # Add the custom font 1
     manager.get_theme().get_font_dictionary().add_font_path("PixelOperatorMono8", FONTS[1])  # Add the custom font 2
@@ -124,45 +136,11 @@ def main():
 
     sound_manager.play("menu", fade_ms=1000)  # Play the menu music
 
-    # Check if options.json exists and if it has the correct data:
-    if not os.path.exists(DATA_FILE):
-        logging.warning("Options file not found. Creating a new one.")
-        with open(DATA_FILE, "w") as f:
-            f.write('{"last_player": "Anonymous", "mute": 0}')
-    else:
-        with open(DATA_FILE, "r") as f:
-            try:
-                options = json.load(f)
-                if not isinstance(options, dict):
-                    # Recreate the file if it's not a dictionary
-                    logging.warning("Options file is not a dictionary. Recreating the file.")
-                    f.seek(0)
-                    f.truncate()
-                    f.write('{"last_player": "Anonymous", "mute": 0, "mute_music": 0}')
-                if "last_player" not in options or "mute" not in options or "mute_music" not in options:
-                    # Recreate the file with default values
-                    logging.warning("Options file is missing keys. Recreating the file.")
-                    f.seek(0)
-                    f.truncate()
-                    f.write('{"last_player": "Anonymous", "mute": 0, "mute_music": 0}')
-            except (json.JSONDecodeError, ValueError) as e:
-                # Recreate the file if there's a JSON error
-                logging.warning(f"Options file is corrupted: {e}. Recreating the file.")
-                with open(DATA_FILE, "w") as f:
-                    f.write('{"last_player": "Anonymous", "mute": 0, "mute_music": 0}')
-            except Exception as e:
-                # Catch all other exceptions
-                logging.error(f"Unexpected error while loading options: {e}. Recreating the file.")
-                with open(DATA_FILE, "w") as f:
-                    f.write('{"last_player": "Anonymous", "mute": 0, "mute_music": 0}')
-
-    # Load the mute setting
-    with open(DATA_FILE, "r") as f:
-        options = json.load(f)
-        if int(sound_manager.muted) != options["mute"]:
-            sound_manager.toggle_mute()
-        if int(sound_manager.music_muted) != options.get("mute_music", 0):
-            sound_manager.toggle_music()
+    # Load the mute settings (options.json is loaded, validated and fixed if needed by the settings service)
+    if int(sound_manager.muted) != settings.get("mute"):
+        sound_manager.toggle_mute()
+    if int(sound_manager.music_muted) != settings.get("mute_music"):
+        sound_manager.toggle_music()
 
     try:
         icon = pygame.image.load(os.path.join(SPRITES_FOLDER, "icon.png"))  # Load the icon
@@ -175,7 +153,8 @@ def main():
     # Scene management
     def change_scene(new_scene, level_name=None, level_folder=None):
         """
-        Changes the current scene and resets UI elements.
+        Changes the current scene. The menu and level select scenes are kept alive (hidden) when leaving them
+        and resumed when coming back, while the game scene is destroyed, as it belongs to a single level.
         
         Args:
             new_scene (str): The name of the new scene to switch to.
@@ -191,11 +170,15 @@ def main():
             running = False
             return
 
-        # Destroy the current scene before switching
+        # Leave the current scene: the game scene is destroyed, the others are hidden until resumed
         if scenes[current_scene]:
-            scenes[current_scene].destroy()
+            if current_scene == "game":
+                scenes[current_scene].destroy()
+                scenes[current_scene] = None
+            else:
+                scenes[current_scene].suspend()
 
-        # Create the new scene
+        # Resume the new scene if it is cached, create it otherwise
         match new_scene:
             case "game":
                 if sound_manager.current_music != "think":
@@ -206,15 +189,22 @@ def main():
             case "level_select":
                 if sound_manager.current_music != "menu":
                     sound_manager.play("menu", fade_ms=500)
-                scenes[new_scene] = LevelSelect(screen, manager, change_scene, game_manager)
+                if scenes[new_scene]:
+                    scenes[new_scene].resume()
+                else:
+                    scenes[new_scene] = LevelSelect(screen, manager, change_scene, game_manager)
                 pygame.display.set_caption(f"{GAME_NAME} - Pick a level")
             case "menu":
                 if sound_manager.current_music != "menu":
                     sound_manager.play("menu", fade_ms=500)
-                scenes[new_scene] = MainMenu(screen, manager, change_scene)
+                if scenes[new_scene]:
+                    scenes[new_scene].resume()
+                else:
+                    scenes[new_scene] = MainMenu(screen, manager, change_scene)
                 pygame.display.set_caption(f"{GAME_NAME} - Main menu")
 
         current_scene = new_scene
+        invalidation.invalidate()
 
 
     scenes = {
@@ -235,16 +225,31 @@ def main():
     else:
         logging.warning("Window maximization is not supported on this platform.")
 
+    if SIMULATION_THREAD:
+        game_manager.start_simulation_thread(SIMULATION_STEPS_PER_SECOND)
+
     # Game loop
     clock = pygame.time.Clock()
-    FPS = 60
+    frame_timer = FrameTimer()  # Time spent in each phase of the frame
     running = True
+    last_input = 0  # Time of the last input event (ms)
+    full_redraw = True  # Whether the last frame redrew the whole screen
+    error_panel = None  # Error panel shown in the last frame
+    last_resize = None  # Time of the last resize event whose relayout is pending (ms)
 
+    # Each frame runs the phases in order: events -> simulation -> UI update -> render -> present
     while running:
-        time_delta = clock.tick(FPS) / 1000.0  # Convert to seconds
+        # Full frame rate while the simulation runs or the screen is animating, idle frame rate otherwise
+        busy = game_manager.is_running or full_redraw or last_resize is not None
+        time_delta = clock.tick(FPS if busy else IDLE_FPS) / 1000.0  # Convert to seconds
+        frame_timer.start_frame()
 
-        # Handle events
+        # Events
         events = pygame.event.get()  # Get all events
+        if events:
+            last_input = pygame.time.get_ticks()
+        if pygame.time.get_ticks() - last_input < ACTIVE_TIME:
+            invalidation.invalidate()  # Hover, click and typing feedback
         for event in events:
             manager.process_events(event)
             match event.type:
@@ -253,22 +258,66 @@ def main():
                 case pygame.VIDEORESIZE:
                     screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
                     manager.set_window_resolution((event.w, event.h))
-                    scenes[current_scene].resize()
+                    invalidation.invalidate()
+                    last_resize = pygame.time.get_ticks()  # Relayout once the window stops changing size
                 case _:
                     scenes[current_scene].handle_events(event) 
+        if last_resize is not None and pygame.time.get_ticks() - last_resize >= RESIZE_DELAY:
+            last_resize = None
+            scenes[current_scene].resize()
+            invalidation.invalidate()
+        frame_timer.mark("events")
 
-        # Update and render
+        # Simulation ticks, before the UI reads the game state (no-op while the simulation thread runs the steps)
+        if scenes["game"]:
+            scenes["game"].game_manager.tick()  # Update the game state
+        frame_timer.mark("simulation")
+
+        # UI update (the UI manager is updated once per frame, here)
         manager.update(time_delta)
         error_handler.update(time_delta, events) 
+        if error_handler.current_panel is not error_panel:  # An error was shown or dismissed
+            error_panel = error_handler.current_panel
+            invalidation.invalidate()
 
-        screen.fill((0, 0, 0))  # Black background
-        scenes[current_scene].render()
         scenes[current_scene].update(time_delta)
-        if scenes["game"]:
-            scenes["game"].game_manager.tick()  # Update the game state
-        manager.draw_ui(screen)
-        pygame.display.flip()
 
+        for element in manager.get_focus_set() or ():  # Blinking cursor of the focused text box
+            if isinstance(element, (pygame_gui.elements.UITextEntryLine, pygame_gui.elements.UITextEntryBox)):
+                invalidation.invalidate(element.rect)
+        frame_timer.mark("ui_update")
+
+        # Render only the regions that changed, skip the frame if nothing did
+        rects = None
+        redraw = invalidation.pending()
+        if redraw:
+            rects = invalidation.take()
+            full_redraw = rects is None
+            if not full_redraw:
+                screen.set_clip(rects[0].unionall(rects[1:]))
+            screen.fill((0, 0, 0))  # Black background
+            scenes[current_scene].render()
+            manager.draw_ui(screen)  # The UI is drawn once per frame, here
+            screen.set_clip(None)
+        else:
+            full_redraw = False
+        frame_timer.mark("render")
+
+        # Present
+        if redraw:
+            if full_redraw:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+        frame_timer.mark("present")
+        frame_timer.end_frame()
+
+    game_manager.stop_simulation_thread()
+    level_cache.shutdown()
+    settings.flush()  # Save the changed settings without waiting for the save delay
+    persistence.shutdown()  # Finish the pending writes
+    score_store.close()
+    script_store.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -31,6 +31,8 @@ class Blue(Robot):
     Example:
         blue_robot = Blue(5, 10, 'E')
     """
+    __slots__ = ()
+
     def __init__(self, x, y, direction='N'):
         """
         Initializes a Blue robot with specified coordinates and direction.
@@ -33,6 +33,8 @@ class Camera(Entity):
     Example:
         camera = Camera(x=5, y=10, height=1, direction='N')
     """
+    __slots__ = ()
+
     def __init__(self, x, y, height, direction='N'):
         """
         Initializes a Camera with specified coordinates, height, and direction.
@@ -31,6 +31,7 @@ class ChargePad(Entity):
     Example:
         charge_pad = ChargePad(5, 10, 0)
     """
+    __slots__ = ('active',)
 
     def __init__(self, x, y, height):
         """
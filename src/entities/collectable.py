@@ -30,6 +30,7 @@ class Collectable(Entity):
     Example:
         collectable = Collectable(5, 10, 0)
     """
+    __slots__ = ()
 
     def __init__(self, x, y, height):
         """
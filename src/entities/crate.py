@@ -26,6 +26,7 @@ class Crate(Entity):
     Example:
         crate = Crate(10, 20, 5, small=True)
     """
+    __slots__ = ('small',)
 
     def __init__(self, x, y, height, small=False):
         """
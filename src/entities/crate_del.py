@@ -31,6 +31,7 @@ class CrateDel(Entity):
     Example:
         crate_delivery = CrateDel(5, 10, 1)
     """
+    __slots__ = ('active',)
 
     def __init__(self, x, y, height):
         """
@@ -32,6 +32,7 @@ class CrateGen(Entity):
     Example:
         crate_gen = CrateGen(x=10, y=20, height=5, crate_count=3, crate_type="big")
     """
+    __slots__ = ('active', 'crate_count', 'crate_type')
 
     def __init__(self, x, y, height, crate_count=0, crate_type="big"):
         """
@@ -34,6 +34,8 @@ class Entity(ABC):
     
     Note: Do not instantiate this class directly. Instead, create subclasses that implement specific entity behavior.
     """
+    __slots__ = ('x', 'y', 'height', 'direction', 'pickable')  # Fixed attribute set, avoids a __dict__ per entity
+
     def __init__(self, x, y, height, direction='N', pickable=False):
         """
         Initializes an Entity with specified coordinates, height, direction, and pickability.
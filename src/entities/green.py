@@ -33,6 +33,7 @@ class Green(Robot):
     Example:
         green_robot = Green(5, 10, 'N')
     """
+    __slots__ = ('crate',)
 
     def __init__(self, x, y, direction='N'):
         """
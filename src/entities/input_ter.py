@@ -31,6 +31,7 @@ class InputTer(Entity):
     Example:
         input_terminal = InputTer(x=5, y=10, height=0, ter_one="red", ter_two="blue", operation="+")
     """
+    __slots__ = ('input_ter_one', 'input_ter_two', 'activated', 'operation')
 
     def __init__(self, x, y, height, ter_one=None, ter_two=None, operation=None):
         """
@@ -30,6 +30,7 @@ class OutputTer(Entity):
     Example:
         output_terminal = OutputTer(x=5, y=10, color="red", height=0)
     """
+    __slots__ = ('color', 'number')
 
     def __init__(self, x, y, color, height):
         """
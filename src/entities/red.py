@@ -30,6 +30,7 @@ class Red(Robot):
     Example:
         red_robot = Red(x=5, y=10, direction='N')
     """
+    __slots__ = ('crate',)
 
     def __init__(self, x, y, direction='N'):
         """
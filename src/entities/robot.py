@@ -34,6 +34,8 @@ class Robot(Entity):
 
     Note: Do not instantiate this class directly. Instead, use the specific robot types like Red, Green, or Blue.
     """
+    __slots__ = ('script', 'color')
+
     def __init__(self, x, y, height, direction='N', pickable=False):
         """
         Initialize a Robot at the specified coordinates, height, and direction.
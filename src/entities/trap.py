@@ -32,6 +32,7 @@ class Trap(Entity):
     Example:
         trap = Trap(5, 10, 0)
     """
+    __slots__ = ('active',)
 
     def __init__(self, x, y, height):
         """
@@ -0,0 +1,74 @@
+"""
+Level generator module.
+This module generates procedural warehouse levels in the same format as structure.json.
+It is meant for stress testing and benchmarking (large levels), not for the campaign levels.
+
+Methods:
+    generate_warehouse(width, height, seed=None, crates=None, collectables=None, encoding=None): Generates a warehouse level structure.
+"""
+
+import numpy as np
+from src.level.grid import PATH, MID_WALL, WALL
+from src.level.matrix_encoding import encode_matrix
+
+
+def generate_warehouse(width, height, seed=None, crates=None, collectables=None, encoding=None):
+    """
+    Generate a warehouse level: outer walls, rows of shelves (mid-height walls) separated by aisles,
+    and a few solid pillars. Places the three robots, a charge pad, a crate deletor, crates and collectables
+    on random path tiles, so the result passes the load_level checks.
+
+    Args:
+        width (int): Width of the level in tiles (at least 8).
+        height (int): Height of the level in tiles (at least 8).
+        seed (int, optional): Seed for the random generator. Default is None.
+        crates (int, optional): Number of small crates. Default is 1% of the tiles.
+        collectables (int, optional): Number of collectables. Default is 1% of the tiles.
+        encoding (str, optional): Compact encoding of the matrix (see src/level/matrix_encoding.py). Default is None.
+
+    Returns:
+        dict: Level structure with the "size", "matrix" and "entities" keys
+            (matrix as a NumPy array, or encoded if an encoding is given).
+    """
+    rng = np.random.default_rng(seed)
+    matrix = np.full((height, width), PATH, dtype=np.uint8)
+
+    # Shelves: every third row inside the walls is a shelf, with a gap every 8 tiles to cross it
+    shelf_rows = np.arange(2, height - 2, 3)
+    matrix[shelf_rows, 1:-1] = MID_WALL
+    matrix[np.ix_(shelf_rows, np.arange(1, width - 1, 8))] = PATH
+
+    # Pillars on random aisle tiles, then the outer walls
+    pillars = (rng.random((height, width)) < 0.02) & (matrix == PATH)
+    matrix[pillars] = WALL
+    matrix[[0, -1], :] = WALL
+    matrix[:, [0, -1]] = WALL
+
+    free_ys, free_xs = np.nonzero(matrix == PATH)
+    cells = width * height
+    crates = max(1, cells // 100) if crates is None else crates
+    collectables = max(1, cells // 100) if collectables is None else collectables
+    picks = rng.choice(len(free_xs), size=min(len(free_xs), crates + collectables + 5), replace=False)
+    spots = [(int(free_xs[i]), int(free_ys[i])) for i in picks]
+
+    (red_x, red_y), (blue_x, blue_y), (green_x, green_y), (pad_x, pad_y), (del_x, del_y) = spots[:5]
+    crate_spots = spots[5:5 + crates]
+    collectable_spots = spots[5 + crates:]
+
+    entities = {
+        "tile": [
+            {"type": "ChargePad", "x": pad_x, "y": pad_y},
+            {"type": "CrateDel", "x": del_x, "y": del_y},
+        ],
+        "ground": [
+            {"type": "Red", "x": red_x, "y": red_y, "direction": "N"},
+            {"type": "Blue", "x": blue_x, "y": blue_y, "direction": "E"},
+        ] + [{"type": "Crate", "x": x, "y": y, "small": True} for x, y in crate_spots]
+          + [{"type": "Collectable", "x": x, "y": y} for x, y in collectable_spots],
+        "air": [
+            {"type": "Green", "x": green_x, "y": green_y, "direction": "S"},
+        ],
+    }
+    if encoding is not None:
+        matrix = encode_matrix(matrix, encoding)
+    return {"size": [width, height], "matrix": matrix, "entities": entities}
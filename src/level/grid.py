@@ -0,0 +1,431 @@
+"""
+Level grid module.
+This module defines a structure-of-arrays representation of a level, which the tiles of the level are views of.
+Terrain, entity occupancy and walkability are stored as NumPy arrays, so they can be built in bulk from the
+level matrix and queried with vectorized operations (objective counts, free tiles, reachability...).
+
+Classes:
+    LevelGrid: Array-backed representation of the terrain and the entities of a level.
+
+Constants:
+    PATH, MID_WALL, WALL: Terrain codes, same values used in the "matrix" of structure.json.
+    LAYERS: Names of the entity layers, indexed by the numerical height of the entities.
+"""
+
+import logging
+import numpy as np
+
+# Terrain codes (Same as the structure.json matrix)
+PATH = 0  # Walkable by every robot
+MID_WALL = 1  # Only air entities can cross it
+WALL = 2  # Nothing can cross it (except the camera)
+
+LAYERS = ("tile", "ground", "air", "camera")  # Index = numerical height of the entity
+EMPTY = 0  # Entity id used for empty cells
+
+
+class LevelGrid:
+    """
+    LevelGrid class, an array-backed representation of a level.
+    It holds a terrain code array, one occupancy array per layer with the ids of the entities on each cell,
+    and the walkability masks for ground and air entities. Entities are registered once and get an integer id,
+    along with a kind code (one per entity class) used for vectorized queries.
+
+    Attributes:
+        width (int): Width of the level in tiles.
+        height (int): Height of the level in tiles.
+        terrain (numpy.ndarray): (height, width) array of terrain codes.
+        occupancy (numpy.ndarray): (4, height, width) array of entity ids per layer (0 = empty).
+        ground_walkable (numpy.ndarray): Boolean mask of the cells ground entities can stand on.
+        air_walkable (numpy.ndarray): Boolean mask of the cells air entities can stand on.
+        entities (list): Registered entities, indexed by their id (index 0 is reserved for empty cells).
+        kind_names (list): Names of the entity kinds, indexed by their kind code.
+
+    Methods:
+        from_matrix(matrix): Creates a grid from a terrain matrix.
+        set_terrain(matrix): Loads the terrain codes in bulk and rebuilds the walkability masks.
+        set_terrain_rows(blocks): Loads the terrain codes block by block and rebuilds the walkability masks.
+        kind_code(name): Gets (or registers) the kind code of an entity class name.
+        register(entity): Registers an entity, returning its id.
+        place(entity, x, y, layer): Places a registered entity on a cell.
+        place_many(kind, xs, ys, layer): Places many anonymous entities of the same kind at once.
+        clear(x, y, layer): Empties a cell of a layer.
+        entity_at(x, y, layer): Gets the entity on a cell of a layer.
+        is_free(x, y, layer): Checks if an entity can be placed on a cell of a layer.
+        kind_mask(kind, layer): Boolean mask of the cells of a layer occupied by a kind.
+        count(kind, layer): Counts the entities of a kind on a layer.
+        positions(kind, layer): Gets the coordinates of the entities of a kind on a layer.
+        reachable(x, y, air=False): Boolean mask of the cells reachable from a cell.
+
+    Example:
+        grid = LevelGrid.from_matrix([[2, 2, 2], [2, 0, 2], [2, 2, 2]])
+    """
+    def __init__(self, width, height):
+        """
+        Initializes an empty grid. All cells start as walls, same as Tile objects do.
+
+        Args:
+            width (int): Width of the level in tiles.
+            height (int): Height of the level in tiles.
+        """
+        self.width = width
+        self.height = height
+        self.terrain = np.full((height, width), WALL, dtype=np.uint8)
+        self.occupancy = np.zeros((len(LAYERS), height, width), dtype=np.int32)
+        self.ground_walkable = np.zeros((height, width), dtype=bool)
+        self.air_walkable = np.zeros((height, width), dtype=bool)
+        self._labels = {}  # Cached component labels of each walkability mask (terrain never changes mid-level)
+
+        self.entities = [None]  # Id 0 is reserved for empty cells
+        self._ids = {}  # Entity -> id
+        self._kinds = np.full(64, -1, dtype=np.int16)  # Id -> kind code (grows on demand)
+        self.kind_names = []  # Kind code -> class name
+        self._kind_codes = {}  # Class name -> kind code
+
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """
+        Creates a grid from a terrain matrix (list of rows or 2D array).
+
+        Args:
+            matrix (list or numpy.ndarray): Terrain codes, one row per y coordinate.
+
+        Returns:
+            LevelGrid: The new grid.
+        """
+        terrain = np.asarray(matrix, dtype=np.uint8)
+        grid = cls(terrain.shape[1], terrain.shape[0])
+        grid.set_terrain(terrain)
+        return grid
+
+
+    def set_terrain(self, matrix):
+        """
+        Loads the terrain codes in bulk and rebuilds the walkability masks.
+        Unknown codes are treated as walls.
+
+        Args:
+            matrix (list or numpy.ndarray): Terrain codes, one row per y coordinate.
+
+        Returns:
+            bool: True if the terrain was loaded, False if the matrix does not fit the grid.
+        """
+        terrain = np.asarray(matrix)
+        if terrain.shape != (self.height, self.width):
+            logging.error(f"Terrain matrix shape {terrain.shape} does not match the level size {(self.height, self.width)}.")
+            return False
+        self.terrain = np.where((terrain == PATH) | (terrain == MID_WALL), terrain, WALL).astype(np.uint8)
+        self.ground_walkable = self.terrain == PATH
+        self.air_walkable = self.terrain != WALL
+        self._labels = {}
+        return True
+
+
+    def set_terrain_rows(self, blocks):
+        """
+        Loads the terrain codes block by block (as decoded from a compact matrix encoding), writing each block
+        of rows straight into the terrain array, then rebuilds the walkability masks. Unknown codes are treated as walls.
+
+        Args:
+            blocks (iterable): (y, rows) pairs, rows being a (n, width) array of terrain codes starting at row y.
+
+        Returns:
+            bool: True if the terrain was loaded, False if the blocks do not cover the grid row by row.
+        """
+        next_y = 0
+        for y, rows in blocks:
+            if y != next_y or rows.ndim != 2 or rows.shape[1] != self.width or y + rows.shape[0] > self.height:
+                logging.error(f"Terrain rows {y} to {y + len(rows) - 1} do not match the level size {(self.height, self.width)}.")
+                self.terrain[:] = WALL
+                return False
+            self.terrain[y:y + len(rows)] = np.where((rows == PATH) | (rows == MID_WALL), rows, WALL)
+            next_y = y + len(rows)
+        if next_y != self.height:
+            logging.error(f"Terrain has {next_y} rows, expected {self.height}.")
+            self.terrain[:] = WALL
+            return False
+        self.ground_walkable = self.terrain == PATH
+        self.air_walkable = self.terrain != WALL
+        self._labels = {}
+        return True
+
+
+    def kind_code(self, name):
+        """
+        Gets the kind code of an entity class name, registering it if it is new.
+
+        Args:
+            name (str): Class name of the entity, lowercase (e.g. "crate").
+
+        Returns:
+            int: Kind code of the class.
+        """
+        code = self._kind_codes.get(name)
+        if code is None:
+            code = len(self.kind_names)
+            self.kind_names.append(name)
+            self._kind_codes[name] = code
+        return code
+
+
+    def _new_ids(self, count, kind):
+        """
+        Reserves a block of ids of the same kind, growing the kind table if needed.
+
+        Args:
+            count (int): Number of ids to reserve.
+            kind (int): Kind code of the ids.
+
+        Returns:
+            numpy.ndarray: The reserved ids.
+        """
+        first = len(self.entities)
+        last = first + count
+        if last > len(self._kinds):
+            grown = np.full(max(last, 2 * len(self._kinds)), -1, dtype=np.int16)
+            grown[:len(self._kinds)] = self._kinds
+            self._kinds = grown
+        self._kinds[first:last] = kind
+        self.entities.extend([None] * count)
+        return np.arange(first, last, dtype=np.int32)
+
+
+    def register(self, entity):
+        """
+        Registers an entity, returning its id. Registering the same entity twice returns the same id.
+
+        Args:
+            entity (Entity): Entity to register.
+
+        Returns:
+            int: Id of the entity.
+        """
+        eid = self._ids.get(entity)
+        if eid is None:
+            eid = int(self._new_ids(1, self.kind_code(entity.__class__.__name__.lower()))[0])
+            self.entities[eid] = entity
+            self._ids[entity] = eid
+        return eid
+
+
+    def _in_bounds(self, x, y):
+        """
+        Checks if a cell is inside the grid.
+
+        Args:
+            x (int): X coordinate of the cell.
+            y (int): Y coordinate of the cell.
+
+        Returns:
+            bool: True if the cell is inside the grid, False otherwise.
+        """
+        return x is not None and y is not None and 0 <= x < self.width and 0 <= y < self.height
+
+
+    def place(self, entity, x, y, layer):
+        """
+        Places an entity on a cell, registering it if needed. Does not check the terrain (see is_free()).
+
+        Args:
+            entity (Entity): Entity to place.
+            x (int): X coordinate of the cell.
+            y (int): Y coordinate of the cell.
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            bool: True if the entity was placed, False otherwise.
+        """
+        if not self._in_bounds(x, y) or not 0 <= layer < len(LAYERS):
+            return False
+        self.occupancy[layer, y, x] = self.register(entity)
+        return True
+
+
+    def place_many(self, kind, xs, ys, layer):
+        """
+        Places many anonymous entities of the same kind at once.
+        Useful to build large generated levels without creating an Entity object per cell.
+
+        Args:
+            kind (str): Class name of the entities, lowercase (e.g. "crate").
+            xs (array-like): X coordinates of the entities.
+            ys (array-like): Y coordinates of the entities.
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            numpy.ndarray: Ids of the placed entities.
+        """
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        ids = self._new_ids(len(xs), self.kind_code(kind))
+        self.occupancy[layer, ys, xs] = ids
+        return ids
+
+
+    def clear(self, x, y, layer):
+        """
+        Empties a cell of a layer. The entity stays registered and keeps its id.
+
+        Args:
+            x (int): X coordinate of the cell.
+            y (int): Y coordinate of the cell.
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            bool: True if the cell was cleared, False if it is out of bounds.
+        """
+        if not self._in_bounds(x, y) or not 0 <= layer < len(LAYERS):
+            return False
+        self.occupancy[layer, y, x] = EMPTY
+        return True
+
+
+    def entity_at(self, x, y, layer):
+        """
+        Gets the entity on a cell of a layer.
+
+        Args:
+            x (int): X coordinate of the cell.
+            y (int): Y coordinate of the cell.
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            Entity: The entity on the cell (None if empty, out of bounds or anonymous).
+        """
+        if not self._in_bounds(x, y):
+            return None
+        return self.entities[self.occupancy[layer, y, x]]
+
+
+    def is_free(self, x, y, layer):
+        """
+        Checks if an entity could be placed on a cell of a layer (terrain allows it and nothing is there).
+
+        Args:
+            x (int): X coordinate of the cell.
+            y (int): Y coordinate of the cell.
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            bool: True if the cell is free, False otherwise.
+        """
+        if not self._in_bounds(x, y) or self.occupancy[layer, y, x] != EMPTY:
+            return False
+        match layer:
+            case 0 | 1:
+                return bool(self.ground_walkable[y, x])
+            case 2:
+                return bool(self.air_walkable[y, x])
+            case 3:
+                return True
+            case _:
+                return False
+
+
+    def kind_mask(self, kind, layer):
+        """
+        Boolean mask of the cells of a layer occupied by entities of a kind.
+
+        Args:
+            kind (str): Class name of the entities, lowercase (e.g. "chargepad").
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            numpy.ndarray: (height, width) boolean mask.
+        """
+        code = self._kind_codes.get(kind)
+        if code is None:
+            return np.zeros((self.height, self.width), dtype=bool)
+        return self._kinds[self.occupancy[layer]] == code  # Id 0 maps to kind -1, never matches
+
+
+    def count(self, kind, layer):
+        """
+        Counts the entities of a kind on a layer.
+
+        Args:
+            kind (str): Class name of the entities, lowercase (e.g. "collectable").
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            int: Number of entities of that kind on the layer.
+        """
+        return int(np.count_nonzero(self.kind_mask(kind, layer)))
+
+
+    def positions(self, kind, layer):
+        """
+        Gets the coordinates of the entities of a kind on a layer.
+
+        Args:
+            kind (str): Class name of the entities, lowercase (e.g. "crate").
+            layer (int): Numerical height of the layer (0 = tile, 1 = ground, 2 = air, 3 = camera).
+
+        Returns:
+            list: List of (x, y) tuples, in row order.
+        """
+        ys, xs = np.nonzero(self.kind_mask(kind, layer))
+        return list(zip(xs.tolist(), ys.tolist()))
+
+
+    def reachable(self, x, y, air=False):
+        """
+        Boolean mask of the cells reachable from a cell by 4-directional movement, ignoring entities.
+        Uses connected component labelling of the walkable mask (see _label_components()), computed once per terrain.
+
+        Args:
+            x (int): X coordinate of the starting cell.
+            y (int): Y coordinate of the starting cell.
+            air (bool, optional): If True, use the air walkability (mid-height walls can be crossed). Default is False.
+
+        Returns:
+            numpy.ndarray: (height, width) boolean mask. All False if the starting cell is not walkable.
+        """
+        mask = self.air_walkable if air else self.ground_walkable
+        if not self._in_bounds(x, y) or not mask[y, x]:
+            return np.zeros((self.height, self.width), dtype=bool)
+        labels = self._labels.get(air)
+        if labels is None:
+            labels = self._labels[air] = _label_components(mask)
+        return labels == labels[y, x]
+
+
+def _label_components(mask):
+    """
+    Labels the 4-connected components of a boolean mask without a Python loop per cell.
+    Horizontal runs are labelled first, then the runs touching vertically are merged by repeated
+    minimum-label propagation and pointer jumping until the labels settle.
+
+    Args:
+        mask (numpy.ndarray): (height, width) boolean mask.
+
+    Returns:
+        numpy.ndarray: (height, width) array of component labels (0 = not in the mask).
+    """
+    height, width = mask.shape
+    # Step 1: Label horizontal runs (a run starts where the previous cell of the row is outside the mask)
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    runs = np.cumsum(starts.ravel(), dtype=np.int64).reshape(height, width)
+    runs[~mask] = 0
+    run_count = int(runs.max()) if runs.size else 0
+    if run_count == 0:
+        return runs
+
+    # Step 2: Pairs of runs touching vertically
+    touching = mask[:-1, :] & mask[1:, :]
+    upper = runs[:-1, :][touching]
+    lower = runs[1:, :][touching]
+
+    # Step 3: Merge them until every run points to the smallest label of its component
+    parent = np.arange(run_count + 1, dtype=np.int64)
+    while True:
+        previous = parent.copy()
+        low = np.minimum(parent[upper], parent[lower])
+        np.minimum.at(parent, parent[upper], low)
+        np.minimum.at(parent, parent[lower], low)
+        parent = parent[parent]  # Pointer jumping
+        if np.array_equal(parent, previous):
+            break
+    return parent[runs]
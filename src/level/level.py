@@ -7,15 +7,60 @@ Classes:
 """
 
 import os
+import copy
 import logging
+import hashlib
 import pygame
 import threading
-from src.level.tile import Tile
+from collections import namedtuple
+import numpy as np
+from src.level.tile import TileMatrix
+from src.level.grid import LevelGrid, LAYERS
+from src.level.matrix_encoding import iter_matrix_rows
+from src.entities.red import Red
+from src.entities.green import Green
+from src.entities.blue import Blue
+from src.entities.crate import Crate
+from src.entities.charge_pad import ChargePad
+from src.entities.collectable import Collectable
+from src.entities.input_ter import InputTer
+from src.entities.output_ter import OutputTer
 from src.render.missing_image import missing_texture_pygame
 from src.render.error_handler import error_handler, ErrorLevel
 from src.render.sound_manager import sound_manager
 
 
+# Facing directions in clockwise order, so turning is an index step (+1 right, +3 left)
+DIRECTIONS = ("N", "E", "S", "W")
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+DIRECTION_VECTORS = ((0, -1), (1, 0), (0, 1), (-1, 0))  # (dx, dy) for each direction index
+TURN_STEPS = {"left": 3, "right": 1}
+
+# Movement directions accepted by move_entity (the facing directions and their up/down/left/right aliases)
+MOVE_VECTORS = {
+    "N": DIRECTION_VECTORS[0], "up": DIRECTION_VECTORS[0],
+    "E": DIRECTION_VECTORS[1], "right": DIRECTION_VECTORS[1],
+    "S": DIRECTION_VECTORS[2], "down": DIRECTION_VECTORS[2],
+    "W": DIRECTION_VECTORS[3], "left": DIRECTION_VECTORS[3],
+}
+
+# What each robot type can do, looked up once per action instead of comparing class names
+RobotCapabilities = namedtuple("RobotCapabilities", [
+    "carry",  # Can pickup() and drop() crates
+    "carry_big",  # Can carry big crates (otherwise only small ones)
+    "terminals",  # Can read() and write() terminals
+    "targets_below",  # Targets its own tile instead of the one in front
+    "charges",  # Plays the charge sound when entering a charge pad
+    "move_sound",  # Sound played when moving or turning
+])
+
+ROBOT_CAPABILITIES = {
+    Red: RobotCapabilities(carry=True, carry_big=True, terminals=False, targets_below=False, charges=True, move_sound="red_move"),
+    Green: RobotCapabilities(carry=True, carry_big=False, terminals=False, targets_below=True, charges=False, move_sound="green_move"),
+    Blue: RobotCapabilities(carry=False, carry_big=False, terminals=True, targets_below=False, charges=True, move_sound="blue_move"),
+}
+
+
 class Level:
     """
     Level class, defining the structure of a level in-game, including how the objectives and physical representation are handled.
@@ -25,20 +70,27 @@ class Level:
         tile_size (int): Size of each tile in pixels.
         width (int): Width of the level in tiles.
         height (int): Height of the level in tiles.
-        bg (pygame.Surface): Background image of the level.
-        img_mtx (list): List of lists containing the image matrix.
-        tiles (list): 2D array of Tile objects representing the level.
+        bg (pygame.Surface): Background image of the level, released (None) once split into the image matrix.
+        img_mtx (list): List of lists containing the image matrix (identical sections share one surface).
+        tiles (TileMatrix): 2D matrix of the tiles of the level (tiles[y][x]), derived on access from the grid and the image matrix.
+        grid (LevelGrid): Array-backed terrain and entity positions of the level.
         objectives (dict): Dictionary containing the objectives of the level.
+        batch_effects (dict): Sounds and errors held back while resolve_intents() runs (None outside of it).
 
     Methods:
-        __init__(self, width, height, background_image): Initializes the level with the given width, height, and background image.
+        __init__(self, width, height, background_image, remove_callback=None, img_mtx=None): Initializes the level with the given width, height, and background image.
         __str__(self): Returns a string representation of the level.
         split_image(self): Splits the background image into 64x64 sections.
+        set_terrain(self, matrix): Loads the terrain matrix into the grid and the tiles.
         add_entity(self, entity): Adds an entity to the level.
+        clone(self, new_numbers=True): Copies the level, for a fresh instance of a pristine level.
         get_camera_position(self): Gets the position of the camera in the level.
         remove_entity(self, entity): Removes an entity from the level.
         teleport_entity(self, entity, x, y): Teleports an entity to a new position in the level.
         move_entity(self, entity, direction): Moves an entity in a direction.
+        _play(self, sound): Plays a sound, or holds it back while resolving intents.
+        _push_error(self, title, message, level): Pushes an error, or holds it back while resolving intents.
+        resolve_intents(self, intents): Resolves the actions of all robots for one tick in a single batch.
         move(self, entity): Moves one entity on the direction it is facing currently.
         turn(self, entity, direction): Turns an entity in a direction.
         _get_target_coords(self, entity): Gets the target coordinates of an entity based on its direction.
@@ -49,7 +101,7 @@ class Level:
         write(self, entity, data): Writes data to an entity that can be written to.
         wait(self, entity): Waits for one turn.
     """
-    def __init__(self, width, height, background_image, remove_callback=None):
+    def __init__(self, width, height, background_image, remove_callback=None, img_mtx=None):
         """
         Initializes the level with the given width, height, and background image.
 
@@ -58,6 +110,8 @@ class Level:
             height (int): Height of the level in tiles.
             background_image (str): Path to the background image file.
             remove_callback (function, optional): Callback function to remove entities from the level. Defaults to None.
+            img_mtx (list, optional): Background already split into tile sections (from a level pack).
+                If given, the background image is not loaded. Defaults to None.
         """
         self.tile_size = 64
         self.width = width
@@ -65,19 +119,28 @@ class Level:
         self.remove_callback = remove_callback  # Callback function to remove entities from the level
         self.success = True  # Success flag for the level
         self.lock = threading.Lock()
+        self.batch_effects = None  # Sounds and errors held back while resolving a batch of intents
 
-        if os.path.exists(background_image):
-            try:
-                self.bg = pygame.image.load(background_image)
-            except pygame.error as e:
-                logging.error(f"Error loading background image: {e}")
-                self.bg = missing_texture_pygame(width * self.tile_size, height * self.tile_size)
+        self.bg = None
+        if img_mtx is not None:
+            self.img_mtx = img_mtx
         else:
-            logging.warning(f"Background image '{background_image}' not found. Using fallback texture.")
-            self.bg = missing_texture_pygame(width * self.tile_size, height * self.tile_size)
-            
-        self.img_mtx = self.split_image()
-        self.tiles = [[Tile(x, y, self.img_mtx[y][x]) for x in range(width)] for y in range(height)]  # 2D array of tiles
+            if os.path.exists(background_image):
+                try:
+                    self.bg = pygame.image.load(background_image)
+                except pygame.error as e:
+                    logging.error(f"Error loading background image: {e}")
+            else:
+                logging.warning(f"Background image '{background_image}' not found. Using fallback texture.")
+
+            if self.bg is not None:
+                self.img_mtx = self.split_image()
+                self.bg = None  # Only the tiles are drawn, so the full-size image is released once split
+            else:  # The fallback checkerboard repeats every tile, so a single tile is shared by all of them
+                fallback = missing_texture_pygame(self.tile_size, self.tile_size)
+                self.img_mtx = [[fallback] * width for _ in range(height)]
+        self.grid = LevelGrid(width, height)  # Array representation of the level
+        self.tiles = TileMatrix(self.grid, self.img_mtx)  # Tiles are views of the grid, nothing is stored per cell
 
         self.objectives = {
             "charge_pads": 0,  # Number of charge pads in the level
@@ -106,22 +169,55 @@ class Level:
     def split_image(self):
         """
         Split an image into 64x64 sections. If the bg is not divisible by 64, it will be extended.
+        Sections with the same pixels (repeated floor and wall tiles) share a single surface, found by content hash.
+        Sections are copies, so the scaled image is not kept alive by them.
 
         Returns:
             list: List of lists containing the image matrix.
         """
         img = self.bg
         img_matrix = []
+        unique_tiles = {}  # Content hash -> tile surface
 
-        img = pygame.transform.scale(img, (self.width * self.tile_size, self.height * self.tile_size))
+        size = (self.width * self.tile_size, self.height * self.tile_size)
+        if img.get_size() != size:
+            img = pygame.transform.scale(img, size)
 
         for y in range(0, self.height * self.tile_size, self.tile_size):  # Create subimages to assign to tiles
             img_matrix.append([])
             for x in range(0, self.width * self.tile_size, self.tile_size):
-                img_matrix[y // self.tile_size].append(img.subsurface(x, y, self.tile_size, self.tile_size))
+                section = img.subsurface(x, y, self.tile_size, self.tile_size)
+                key = hashlib.blake2b(pygame.image.tobytes(section, "RGBA"), digest_size=16).digest()
+                tile_image = unique_tiles.get(key)
+                if tile_image is None:
+                    tile_image = unique_tiles[key] = section.copy()
+                img_matrix[y // self.tile_size].append(tile_image)
+        logging.debug(f"Background split into {len(unique_tiles)} unique tiles out of {self.width * self.height}")
         return img_matrix
 
 
+    def set_terrain(self, matrix):
+        """
+        Load the terrain matrix (0 = path, 1 = mid-height wall, 2 = wall) into the grid in bulk (the tiles read it from there).
+        Compact encoded matrices (see src/level/matrix_encoding.py) are decoded into the grid block by block.
+
+        Args:
+            matrix (list or dict): List of rows with the terrain codes of the level, or an encoded matrix.
+
+        Returns:
+            bool: True if the terrain was loaded, False if the matrix does not match the level size.
+        """
+        if isinstance(matrix, dict):
+            try:
+                loaded = self.grid.set_terrain_rows(iter_matrix_rows(matrix, self.width, self.height))
+            except ValueError as e:
+                logging.error(f"Invalid encoded level matrix: {e}")
+                loaded = False
+        else:
+            loaded = self.grid.set_terrain(matrix)
+        return loaded
+
+
     def add_entity(self, entity):
         """
         Adds an entity to the level, placing it in the corresponding tile.
@@ -143,45 +239,52 @@ class Level:
         else:
             tile = self.tiles[y][x]
             match height:
-                case 0:  # Tile entities
-                    if tile.entities['tile'] is not None:  # Check if the tile is empty
-                        logging.error(f"Tile {tile} is already occupied by {tile.entities['tile']}.")
-                        success = False
-                    elif tile.is_path:  # Tiles can only be placed on paths
-                        tile.entities['tile'] = entity
-                    else:
-                        logging.error(f"Entity {entity} cannot be placed on a wall.")
-                        success = False
-                case 1:  # Ground entities
-                    if tile.entities['ground'] is not None:
-                        logging.error(f"Tile {tile} is already occupied by {tile.entities['ground']}.")
-                        success = False
-                    elif tile.is_path:  # Ground entities can only be placed on paths
-                        tile.entities['ground'] = entity
-                    else:
-                        logging.error(f"Entity {entity} cannot be placed on a wall.")
-                        success = False
-                case 2:  # Air entities
-                    if tile.entities['air'] is not None:
-                        logging.error(f"Tile {tile} is already occupied by {tile.entities['air']}.")
-                        success = False
-                    elif tile.is_path or tile.is_mid_wall:  # Air entities can be placed on paths or mid-height walls
-                        tile.entities['air'] = entity
-                    else:
-                        logging.error(f"Entity {entity} cannot be placed on a wall.")
-                        success = False
+                case 0 | 1:  # Tile and ground entities can only be placed on paths
+                    allowed = tile.is_path
+                case 2:  # Air entities can be placed on paths or mid-height walls
+                    allowed = tile.is_path or tile.is_mid_wall
                 case 3:  # Camera entity
-                    if tile.entities['camera'] is not None:
-                        logging.error(f"Tile {tile} is already occupied by {tile.entities['camera']}.")
-                        success = False
-                    else:
-                        tile.entities['camera'] = entity
+                    allowed = True
                 case _:
                     logging.error(f"Invalid entity height: {height}")
-                    success = False
+                    return False
+            occupant = tile.entities[LAYERS[height]]
+            if occupant is not None:  # Check if the tile is empty
+                logging.error(f"Tile {tile} is already occupied by {occupant}.")
+                success = False
+            elif not allowed:
+                logging.error(f"Entity {entity} cannot be placed on a wall.")
+                success = False
+            else:
+                self.grid.place(entity, x, y, height)
         return success
 
 
+    def clone(self, new_numbers=True):
+        """
+        Copies the level, for a fresh instance of a pristine (not yet played) level.
+        The background sections are shared, while the tiles, the grid and the entities are new, so playing the copy
+        does not change the original. Entities are added again in id order, so they keep their ids if none was removed.
+
+        Args:
+            new_numbers (bool, optional): Whether output terminals draw a new number, as they do when the level
+                is loaded. Default is True.
+
+        Returns:
+            Level: The copy.
+        """
+        level = Level(self.width, self.height, None, img_mtx=self.img_mtx)
+        level.set_terrain(self.grid.terrain)
+        for entity in self.grid.entities[1:]:
+            if entity is not None:
+                entity = copy.copy(entity)
+                if new_numbers and isinstance(entity, OutputTer):
+                    entity.generate_number()
+                level.add_entity(entity)
+        level.objectives = dict(self.objectives)
+        return level
+
+
     def get_camera_position(self):
         """
         Get the position of the camera in the level.
@@ -189,10 +292,9 @@ class Level:
         Returns:
             tuple: Position of the camera.
         """
-        for row in self.tiles:
-            for tile in row:
-                if tile.entities['camera']:
-                    return (tile.x, tile.y)
+        ys, xs = np.nonzero(self.grid.occupancy[3])  # Camera layer
+        if len(xs):
+            return (int(xs[0]), int(ys[0]))
 
 
     def remove_entity(self, entity):
@@ -214,21 +316,13 @@ class Level:
             logging.error(f"Entity {entity} is out of bounds.")
             success = False
         else:
-            tile = self.tiles[y][x]
-            match height:
-                case 0:
-                    tile.entities['tile'] = None
-                case 1:
-                    tile.entities['ground'] = None
-                case 2:
-                    tile.entities['air'] = None
-                case 3:
-                    tile.entities['camera'] = None
-                case _:
-                    logging.error(f"Invalid entity height: {height}")
-                    success = False
+            if 0 <= height < len(LAYERS):
+                self.grid.clear(x, y, height)
+            else:
+                logging.error(f"Invalid entity height: {height}")
+                success = False
             # If the entity is not a robot
-            if entity.__class__.__name__.lower() not in ["red", "green", "blue"]:
+            if type(entity) not in ROBOT_CAPABILITIES:
                 self.remove_callback(entity)  # Do not remove bots
         return success
 
@@ -320,27 +414,14 @@ class Level:
         if (x < 0 or x >= self.width or y < 0 or y >= self.height):
             logging.error(f"Entity {entity} is out of bounds.")
             success = False
+        elif direction not in MOVE_VECTORS:
+            logging.error(f"Invalid movement direction: {direction}")
+            success = False
+        elif not 0 <= entity.height < len(LAYERS):
+            logging.error(f"Invalid entity height: {entity.height}")
+            success = False
         else:
-            match direction:
-                case "up":
-                    dx, dy = 0, -1
-                case "down":
-                    dx, dy = 0, 1
-                case "left":
-                    dx, dy = -1, 0
-                case "right":
-                    dx, dy = 1, 0
-                case "N":  # Same as up
-                    dx, dy = 0, -1
-                case "S":  # Same as down
-                    dx, dy = 0, 1
-                case "E":  # Same as right
-                    dx, dy = 1, 0
-                case "W":  # Same as left
-                    dx, dy = -1, 0
-                case _:
-                    logging.error(f"Invalid movement direction: {direction}")
-                    success = False
+            dx, dy = MOVE_VECTORS[direction]
             new_x = x + dx
             new_y = y + dy
 
@@ -348,39 +429,146 @@ class Level:
                 success = False
             else:
                 if not self.teleport_entity(entity, new_x, new_y):
-                    string_height = None
-                    match entity.height:
-                        case 0:
-                            string_height = 'tile'
-                        case 1:
-                            string_height = 'ground'
-                        case 2:
-                            string_height = 'air'
-                        case 3:
-                            string_height = 'camera'
-                        case _:
-                            logging.error(f"Invalid entity height: {entity.height}")
-                            success = False
+                    blocker = self.tiles[new_y][new_x].entities[LAYERS[entity.height]]
                     # If the fail reason is a collectable
-                    if self.tiles[new_y][new_x].entities[string_height].__class__.__name__.lower() == "collectable":
+                    if isinstance(blocker, Collectable):
                         # Remove the collectable from the tile and redo the teleport
-                        collectable = self.tiles[new_y][new_x].entities[string_height]
-                        self.remove_entity(collectable)
-                        sound_manager.play("collectable")
+                        self.remove_entity(blocker)
+                        self._play("collectable")
                         self.teleport_entity(entity, new_x, new_y)
                     else:
                         logging.error(f"Entity {entity} cannot move to ({new_x}, {new_y}). Tile is already occupied.")
                         success = False
             # After movement is confirmed successful
-            if success and entity.__class__.__name__.lower() in ["red", "blue"]:
+            capabilities = ROBOT_CAPABILITIES.get(type(entity))
+            if success and capabilities is not None and capabilities.charges:
                 # Check if target position has a chargepad
-                target_tile = self.tiles[entity.y][entity.x]
-                if (target_tile.entities['tile'] and 
-                    target_tile.entities['tile'].__class__.__name__.lower() == "chargepad"):
-                    sound_manager.play("charge")
+                if isinstance(self.tiles[entity.y][entity.x].entities['tile'], ChargePad):
+                    self._play("charge")
         return success
     
 
+    def _play(self, sound):
+        """
+        Play a sound, or hold it back until the end of the batch if intents are being resolved.
+
+        Args:
+            sound (str): Name of the sound.
+        """
+        if self.batch_effects is None:
+            sound_manager.play(sound)
+        else:
+            self.batch_effects["sounds"][sound] = None
+
+
+    def _push_error(self, title, message, level=ErrorLevel.ERROR):
+        """
+        Push an error to the error handler, or hold it back until the end of the batch if intents are being resolved.
+
+        Args:
+            title (str): Title of the error.
+            message (str): Message of the error.
+            level (ErrorLevel, optional): Severity of the error. Defaults to ErrorLevel.ERROR.
+        """
+        if self.batch_effects is None:
+            error_handler.push_error(title, message, level)
+        else:
+            self.batch_effects["errors"][(title, message, level)] = None
+
+
+    def resolve_intents(self, intents):
+        """
+        Resolve the actions every robot wants to perform this tick (see CoroutineInterpreter intent mode) in one batch.
+        The outcome does not depend on the order of the robots:
+            - turn(), wait() and read() run first, then write() and pickup(), then drop() and move().
+            - pickup(), drop() and move() claim a tile (and height). If two of them claim the same one, all of them fail.
+            - A move into a tile that another robot is leaving this tick waits for that robot to move first.
+              Robots swapping places or moving in a circle block each other and fail.
+        Sounds and errors are collected during the batch and played/pushed once at the end.
+
+        Args:
+            intents (dict): Robot -> ActionIntent.
+
+        Returns:
+            dict: Robot -> result of its action.
+        """
+        results = {}
+        actions = {
+            "move": lambda entity, args: self.move(entity),
+            "turn": lambda entity, args: self.turn(entity, *args),
+            "pickup": lambda entity, args: self.pickup(entity),
+            "drop": lambda entity, args: self.drop(entity),
+            "read": lambda entity, args: self.read(entity),
+            "write": lambda entity, args: self.write(entity, *args),
+            "wait": lambda entity, args: self.wait(entity),
+        }
+        self.batch_effects = {"sounds": {}, "errors": {}}  # Dicts as ordered sets
+        try:
+            # Step 1: Find the tile every pickup, drop and move claims
+            claims = {}
+            for entity, intent in intents.items():
+                if intent.name in ("pickup", "drop"):
+                    x, y = self._get_target_coords(entity)
+                    if x is not None:
+                        claims.setdefault((x, y, 1), []).append(entity)  # Crates are on the ground
+                elif intent.name == "move" and entity.direction in DIRECTION_INDEX:
+                    dx, dy = DIRECTION_VECTORS[DIRECTION_INDEX[entity.direction]]
+                    claims.setdefault((entity.x + dx, entity.y + dy, entity.height), []).append(entity)
+
+            targets = {}
+            for (x, y, height), claimants in claims.items():
+                if len(claimants) == 1:
+                    targets[claimants[0]] = (x, y, height)
+                    continue
+                names = " and ".join(str(claimant) for claimant in claimants)
+                self._push_error(
+                    "Execution Problem",
+                    f"Robots {names} tried to use the same tile ({x}, {y}) at the same time.",
+                    ErrorLevel.WARNING
+                )
+                self.success = False  # Mark level as failed
+                logging.error(f"Robots {names} collided at ({x}, {y}).")
+                for claimant in claimants:
+                    results[claimant] = False
+
+            # Step 2: Actions that only affect the robot itself or a terminal, then pickups
+            for phase in (("turn", "wait", "read"), ("write", "pickup"), ("drop",)):
+                for entity, intent in intents.items():
+                    if intent.name in phase and entity not in results:
+                        results[entity] = actions[intent.name](entity, intent.args)
+
+            # Step 3: Moves, each one once the robot leaving its target tile (if any) has moved
+            waiting = [entity for entity, intent in intents.items() if intent.name == "move" and entity not in results]
+            while waiting:
+                moved = False
+                for entity in list(waiting):
+                    target = targets.get(entity)
+                    blocker = None
+                    if target is not None and 0 <= target[0] < self.width and 0 <= target[1] < self.height:
+                        blocker = self.grid.entity_at(*target)
+                    if blocker is None or blocker not in waiting:
+                        results[entity] = self.move(entity)
+                        waiting.remove(entity)
+                        moved = True
+                if not moved:  # Swaps and circles, the move fails on the occupied tile
+                    for entity in waiting:
+                        results[entity] = self.move(entity)
+                    break
+
+            # Unknown actions are reported by the interpreter, this only guards against bad input
+            for entity, intent in intents.items():
+                if entity not in results:
+                    logging.error(f"Unknown intent {intent} for {entity}.")
+                    results[entity] = None
+        finally:
+            effects, self.batch_effects = self.batch_effects, None
+            for sound in effects["sounds"]:
+                self._play(sound)
+            for title, message, level in effects["errors"]:
+                self._push_error(title, message, level)
+        return results
+
+
     # ======== LANGUAGE ACTIONS ========
 
     def move(self, entity):  # move() in language (Wrapper function for move_entity())
@@ -396,21 +584,15 @@ class Level:
         with self.lock:
             success = self.move_entity(entity, entity.direction)
             if not success:
-                error_handler.push_error(
+                self._push_error(
                     "Execution Problem",
                     f"Entity {entity} cannot advance.\nThe tile is occupied, out of bounds or it cannot cross it.",
                     ErrorLevel.WARNING
                 )
                 self.success = False  # Mark level as failed
                 logging.error(f"Entity {entity} cannot move.")
-            else:
-                match entity.__class__.__name__.lower():
-                    case "red":
-                        sound_manager.play("red_move")
-                    case "green":
-                        sound_manager.play("green_move")
-                    case "blue":
-                        sound_manager.play("blue_move")
+            elif type(entity) in ROBOT_CAPABILITIES:
+                self._play(ROBOT_CAPABILITIES[type(entity)].move_sound)
             return success
 
     
@@ -427,37 +609,15 @@ class Level:
         """
         with self.lock:
             success = True
-            if direction == "left":
-                match entity.direction:
-                    case "N":
-                        entity.direction = "W"
-                    case "W":
-                        entity.direction = "S"
-                    case "S":
-                        entity.direction = "E"
-                    case "E":
-                        entity.direction = "N"
-            elif direction == "right":
-                match entity.direction:
-                    case "N":
-                        entity.direction = "E"
-                    case "E":
-                        entity.direction = "S"
-                    case "S":
-                        entity.direction = "W"
-                    case "W":
-                        entity.direction = "N"
+            if direction in TURN_STEPS:
+                index = DIRECTION_INDEX.get(entity.direction)
+                if index is not None:
+                    entity.direction = DIRECTIONS[(index + TURN_STEPS[direction]) % 4]
             else:
                 logging.error(f"Invalid turn direction: {direction}")
                 success = False
-            if success:
-                match entity.__class__.__name__.lower():
-                    case "red":
-                        sound_manager.play("red_move")
-                    case "green":
-                        sound_manager.play("green_move")
-                    case "blue":
-                        sound_manager.play("blue_move")
+            if success and type(entity) in ROBOT_CAPABILITIES:
+                self._play(ROBOT_CAPABILITIES[type(entity)].move_sound)
             return success
 
 
@@ -478,23 +638,17 @@ class Level:
             logging.error(f"Entity {entity} is out of bounds.")
             new_x, new_y = None, None
         else:
-            if entity.__class__.__name__.lower() == "red" or entity.__class__.__name__.lower() == "blue":  # Red and blue target up in front
-                match entity.direction:
-                    case "N":
-                        new_x, new_y = x, y - 1
-                    case "S":
-                        new_x, new_y = x, y + 1
-                    case "E":
-                        new_x, new_y = x + 1, y
-                    case "W":
-                        new_x, new_y = x - 1, y
-                    case _:
-                        logging.error(f"Invalid direction: {entity.direction}")
-                        new_x, new_y = None, None
-            elif entity.__class__.__name__.lower() == "green":  # Green targets down below
+            capabilities = ROBOT_CAPABILITIES.get(type(entity))
+            if capabilities is None:
+                logging.error(f"Entity {entity.__class__.__name__} cannot have a target")
+                new_x, new_y = None, None
+            elif capabilities.targets_below:  # Green targets down below
                 new_x, new_y = x, y
+            elif entity.direction in DIRECTION_INDEX:  # Red and blue target up in front
+                dx, dy = DIRECTION_VECTORS[DIRECTION_INDEX[entity.direction]]
+                new_x, new_y = x + dx, y + dy
             else:
-                logging.error(f"Entity {entity.__class__.__name__} cannot have a target")
+                logging.error(f"Invalid direction: {entity.direction}")
                 new_x, new_y = None, None
 
             if not new_x is None or not new_y is None:
@@ -518,7 +672,7 @@ class Level:
             vision = None
             new_x, new_y = self._get_target_coords(entity)
             if new_x is None or new_y is None:  # Check the target was set
-                error_handler.push_error(
+                self._push_error(
                     "Execution Problem",
                     f"Entity {entity} cannot see an invalid tile (out of bounds).",
                     ErrorLevel.WARNING
@@ -578,54 +732,44 @@ class Level:
         """
         with self.lock:
             success = True
-            if entity.__class__.__name__.lower() in ["red", "green"]:  # Only red and green can pick up
+            capabilities = ROBOT_CAPABILITIES.get(type(entity))
+            if capabilities is not None and capabilities.carry:  # Only red and green can pick up
                 new_x, new_y = self._get_target_coords(entity)
                 if new_x is None or new_y is None:  # Check the target was set
                     logging.error(f"Entity {entity} cannot be picked up.")
                     success = False
                 else:
                     target_entity = self.tiles[new_y][new_x].entities['ground']
-                    target_entity_class = target_entity.__class__.__name__.lower()
-                    if target_entity is not None and target_entity_class == "crate" and target_entity.pickable:  # Check if there is an entity to pick up thereç
+                    if isinstance(target_entity, Crate) and target_entity.pickable:  # Check if there is an entity to pick up there
                         if entity.crate is None:  # Check if the entity is already carrying a crate
-                            # Make sure only green and red can pickup
-                            match entity.__class__.__name__.lower():
-                                case "red":  # Pick up any crate
-                                    entity.crate = target_entity
-                                    self.remove_entity(target_entity)  # Remove the reference to the crate from the tile
-                                    entity.crate.x = None  # Temporarelly disable it's coordinates
-                                    entity.crate.y = None
-                                    logging.info(f"Entity {entity} picked up crate {target_entity}.")
-                                    if target_entity.small:
-                                        sound_manager.play("pickup_small")
-                                    else:
-                                        sound_manager.play("pickup_big")
-                                case "green":
-                                    if target_entity.small:
-                                        entity.crate = target_entity
-                                        self.remove_entity(target_entity)
-                                        entity.crate.x = None
-                                        entity.crate.y = None
-                                        logging.info(f"Entity {entity} picked up crate {target_entity}.")
-                                        sound_manager.play("pickup_small")
-                                    else:
-                                        error_handler.push_error(
-                                            "Execution Problem",
-                                            f"Entity {entity} can only carry small crates.\nBig crates must be carried by Red",
-                                            ErrorLevel.WARNING
-                                        )
-                                        self.success = False  # Mark level as failed
-                                        logging.error(f"Entity {entity} cannot pick up crate {target_entity} (Too big).")
-                                        success = False
+                            if capabilities.carry_big or target_entity.small:  # Red picks up any crate, green only small ones
+                                entity.crate = target_entity
+                                self.remove_entity(target_entity)  # Remove the reference to the crate from the tile
+                                entity.crate.x = None  # Temporarelly disable it's coordinates
+                                entity.crate.y = None
+                                logging.info(f"Entity {entity} picked up crate {target_entity}.")
+                                if target_entity.small:
+                                    self._play("pickup_small")
+                                else:
+                                    self._play("pickup_big")
+                            else:
+                                self._push_error(
+                                    "Execution Problem",
+                                    f"Entity {entity} can only carry small crates.\nBig crates must be carried by Red",
+                                    ErrorLevel.WARNING
+                                )
+                                self.success = False  # Mark level as failed
+                                logging.error(f"Entity {entity} cannot pick up crate {target_entity} (Too big).")
+                                success = False
                         else:  # If the entity is carrying a crate, 
-                            error_handler.push_error(
+                            self._push_error(
                                 "Execution Problem",
                                 f"{entity} is already carrying a crate.",
                                 ErrorLevel.WARNING
                             )
                             self.success = False
                     else:
-                        error_handler.push_error(
+                        self._push_error(
                             "Execution Problem",
                             f"Entity {entity} can only pick up crates.",
                             ErrorLevel.WARNING
@@ -635,7 +779,7 @@ class Level:
                         success = False
             else:
                 logging.error(f"Entity {entity} cannot pick up.")
-                error_handler.push_error(
+                self._push_error(
                     "Execution Problem",
                     f"Robot {entity} cannot execute pickup() actions.\nOnly Red and Green can.",
                     ErrorLevel.WARNING
@@ -657,10 +801,11 @@ class Level:
         """
         with self.lock:
             success = True
-            if entity.__class__.__name__.lower() in ["red", "green"]:  # Only red and green can drop
+            capabilities = ROBOT_CAPABILITIES.get(type(entity))
+            if capabilities is not None and capabilities.carry:  # Only red and green can drop
                 new_x, new_y = self._get_target_coords(entity)
                 if new_x is None or new_y is None:
-                    error_handler.push_error(
+                    self._push_error(
                         "Execution Problem",
                         f"Entity {entity} cannot drop it's crate on an invalid tile (out of bounds).",
                         ErrorLevel.WARNING
@@ -676,13 +821,13 @@ class Level:
                             entity.crate.y = new_y
                             self.add_entity(entity.crate)
                             if entity.crate.small:
-                                sound_manager.play("drop_small")
+                                self._play("drop_small")
                             else:
-                                sound_manager.play("drop_big")
+                                self._play("drop_big")
                             entity.crate = None
                             logging.info(f"Entity {entity} dropped crate at ({new_x}, {new_y}).")
                         else:
-                            error_handler.push_error(
+                            self._push_error(
                                 "Execution Problem",
                                 f"Entity {entity} is not holding a crate.",
                                 ErrorLevel.WARNING
@@ -691,7 +836,7 @@ class Level:
                             logging.error(f"Entity {entity} has nothing to drop.")
                             success = False
                     else:
-                        error_handler.push_error(
+                        self._push_error(
                             "Execution Problem",
                             f"Entity {entity} cannot drop it's crate on an occupied tile.",
                             ErrorLevel.WARNING
@@ -700,7 +845,7 @@ class Level:
                         logging.error(f"Cannot drop entity at ({new_x}, {new_y}). Tile is already occupied.")
                         success = False
             else:
-                error_handler.push_error(
+                self._push_error(
                     "Execution Problem",
                     f"Robot {entity} cannot hold crates.\nOnly Red and Green can.",
                     ErrorLevel.WARNING
@@ -722,11 +867,12 @@ class Level:
             str: Data read from the entity (None if the read action could not be completed)
         """
         with self.lock:
-            if entity.__class__.__name__.lower() == "blue":  # Only blue can read
-                data = None
+            data = None
+            capabilities = ROBOT_CAPABILITIES.get(type(entity))
+            if capabilities is not None and capabilities.terminals:  # Only blue can read
                 new_x, new_y = self._get_target_coords(entity)
                 if new_x is None or new_y is None:
-                    error_handler.push_error(
+                    self._push_error(
                         "Execution Problem",
                         f"Robot {entity} can only read from output terminals",
                         ErrorLevel.WARNING
@@ -736,11 +882,11 @@ class Level:
                 else:
                     target_entity = self.tiles[new_y][new_x].entities['ground']
                     target_entity_class = target_entity.__class__.__name__.lower()
-                    if target_entity is not None and target_entity_class == "outputter":
+                    if isinstance(target_entity, OutputTer):
                         data = target_entity.number
-                        sound_manager.play("read")
+                        self._play("read")
                     else:
-                        error_handler.push_error(
+                        self._push_error(
                             "Execution Problem",
                             f"There is nothing to read in front of {entity}.\nGot: {target_entity_class}\nExpected: outputter",
                             ErrorLevel.WARNING
@@ -748,7 +894,7 @@ class Level:
                         self.success = False  # Mark level as failed
                         logging.error(f"No entity to read at ({new_x}, {new_y}).")
             else:
-                error_handler.push_error(
+                self._push_error(
                     "Execution Problem",
                     f"Robot {entity} cannot execute read() actions.",
                     ErrorLevel.WARNING
@@ -771,10 +917,11 @@ class Level:
         """
         with self.lock:
             success = True
-            if entity.__class__.__name__.lower() == "blue":  # Only blue can write
+            capabilities = ROBOT_CAPABILITIES.get(type(entity))
+            if capabilities is not None and capabilities.terminals:  # Only blue can write
                 new_x, new_y = self._get_target_coords(entity)
                 if new_x is None or new_y is None:
-                    error_handler.push_error(
+                    self._push_error(
                         "Execution Problem",
                         f"Robot {entity} can only write to input terminals",
                         ErrorLevel.WARNING
@@ -784,50 +931,47 @@ class Level:
                     success = False
                 else:
                     target_entity = self.tiles[new_y][new_x].entities['ground']
-                    target_entity_class = target_entity.__class__.__name__.lower()
-                    if target_entity is not None and target_entity_class == "inputter":
-                        if entity.__class__.__name__.lower() == "blue":
-                            # Write (Check if the numbers required on the terminals num op num is the same as data)
-                            # Locate the terminals in the level that have the colors
-                            num_one = None
-                            num_two = None
-                            for tile in self.tiles:
-                                for t in tile:
-                                    if t.entities['ground'] is not None and t.entities['ground'].__class__.__name__.lower() == "outputter":
-                                        if target_entity.input_ter_one == t.entities['ground'].color:
-                                            num_one = t.entities['ground'].number
-                                        elif target_entity.input_ter_two == t.entities['ground'].color:
-                                            num_two = t.entities['ground'].number
-                            result = None
-                            match target_entity.operation:
-                                case "+":
-                                    result = num_one + num_two
-                                case "-":
-                                    result = num_one - num_two
-                                case "*":
-                                    result = num_one * num_two
-                                case "/":
-                                    if num_two != 0:
-                                        result = num_one / num_two
-                                    else:
-                                        logging.error("Division by zero error.")
-                                        success = False
-                            if result == data:
-                                target_entity.activated = True
-                                logging.info(f"Entity {entity} wrote {data} to {target_entity}.")
-                                sound_manager.play("correct")
-                            else:
-                                error_handler.push_error(
-                                    "Execution Problem",
-                                    f"Robot {entity} wrote the wrong data to a terminal.\nGot: {data}\nExpected: {result}",
-                                    ErrorLevel.WARNING
-                                )
-                                self.success = False  # Mark level as failed
-                                logging.error(f"Entity {entity} failed to write {data} to {target_entity}.")
-                                sound_manager.play("incorrect")
-                                success = False
+                    if isinstance(target_entity, InputTer):
+                        # Write (Check if the numbers required on the terminals num op num is the same as data)
+                        # Locate the terminals in the level that have the colors
+                        num_one = None
+                        num_two = None
+                        for x, y in self.grid.positions("outputter", 1):
+                            outputter = self.grid.entity_at(x, y, 1)
+                            if target_entity.input_ter_one == outputter.color:
+                                num_one = outputter.number
+                            elif target_entity.input_ter_two == outputter.color:
+                                num_two = outputter.number
+                        result = None
+                        match target_entity.operation:
+                            case "+":
+                                result = num_one + num_two
+                            case "-":
+                                result = num_one - num_two
+                            case "*":
+                                result = num_one * num_two
+                            case "/":
+                                if num_two != 0:
+                                    result = num_one / num_two
+                                else:
+                                    logging.error("Division by zero error.")
+                                    success = False
+                        if result == data:
+                            target_entity.activated = True
+                            logging.info(f"Entity {entity} wrote {data} to {target_entity}.")
+                            self._play("correct")
+                        else:
+                            self._push_error(
+                                "Execution Problem",
+                                f"Robot {entity} wrote the wrong data to a terminal.\nGot: {data}\nExpected: {result}",
+                                ErrorLevel.WARNING
+                            )
+                            self.success = False  # Mark level as failed
+                            logging.error(f"Entity {entity} failed to write {data} to {target_entity}.")
+                            self._play("incorrect")
+                            success = False
                     else:
-                        error_handler.push_error(
+                        self._push_error(
                             "Execution Problem",
                             f"Robot {entity} needs an Input terminal in front to write.",
                             ErrorLevel.WARNING
@@ -836,7 +980,7 @@ class Level:
                         logging.error(f"Entity {entity} cannot write to {target_entity}.")
                         success = False
             else:
-                error_handler.push_error(
+                self._push_error(
                     "Execution Problem",
                     f"Robot {entity} cannot execute write() actions.",
                     ErrorLevel.WARNING
@@ -859,11 +1003,9 @@ class Level:
         """
         with self.lock:
             success = True
-            if entity is not None and (entity.__class__.__name__.lower() == "green" or entity.__class__.__name__.lower() == "blue" or entity.__class__.__name__.lower() == "red"):
-                pass
-            else:
+            if type(entity) not in ROBOT_CAPABILITIES:
                 logging.error(f"Entity {entity} cannot wait.")
-                error_handler.push_error(
+                self._push_error(
                     "Execution Error",
                     f"Robot {entity} cannot wait.",
                     ErrorLevel.WARNING
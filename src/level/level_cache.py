@@ -0,0 +1,187 @@
+"""
+Level cache module.
+Keeps the last loaded levels in their pristine (not yet played) state, so playing or resetting a level hands out a copy
+of the cached level instead of loading it from disk again. Levels can be preloaded on a background thread (the level
+select screen preloads the selected and the next unlocked levels while the player reads the leaderboard), so the
+level is usually ready by the time Play is pressed.
+
+Classes:
+    LevelCache: LRU cache of pristine levels with background preloading.
+
+Objects:
+    level_cache (LevelCache): Global level cache instance.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from src.level.level_pack import load_packed_level, source_mtimes
+
+CACHE_SIZE = 4  # Pristine levels kept
+
+
+class LevelCache:
+    """
+    LRU cache of pristine levels, by level folder name. A cached level is dropped when one of its source files
+    changes. Preloads run one at a time on a worker thread; getting a level being preloaded waits for it.
+
+    Attributes:
+        size (int): Maximum number of cached levels.
+        loader (function): Function loading a level from its folder name (None if it fails).
+        levels (OrderedDict): Level folder name -> (source file modification times, pristine Level), oldest first.
+        pending (dict): Level folder name -> Future of the preloads not finished yet.
+        lock (threading.Lock): Guards the cached levels and the pending preloads.
+
+    Methods:
+        get(folder): Gets a fresh copy of a level, loading it if it is not cached.
+        preload(folders): Loads levels into the cache on the worker thread.
+        clear(): Drops all the cached levels.
+        shutdown(): Cancels the pending preloads and stops the worker thread.
+
+    Example:
+        level_cache.preload(["1_First Steps", "2_Long Walk"])
+        level = level_cache.get("1_First Steps")
+    """
+    def __init__(self, size=CACHE_SIZE, loader=load_packed_level):
+        """
+        Initializes an empty cache. The worker thread is started with the first preload.
+
+        Args:
+            size (int, optional): Maximum number of cached levels. Default is CACHE_SIZE.
+            loader (function, optional): Function loading a level from its folder name. Default is load_packed_level.
+        """
+        self.size = size
+        self.loader = loader
+        self.levels = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = None  # Worker thread of the preloads, created on demand
+
+
+    def get(self, folder):
+        """
+        Gets a fresh copy of a level, loading it (or waiting for its preload) if it is not cached.
+
+        Args:
+            folder (str): Level folder name.
+
+        Returns:
+            Level: A copy of the pristine level, or None if it could not be loaded.
+        """
+        with self.lock:
+            future = self.pending.get(folder)
+        if future is not None:
+            wait([future])  # Wait for the preload (it logs its own errors)
+
+        level = self._cached(folder)
+        if level is not None:
+            return level.clone()
+        level = self._load(folder)
+        return level.clone(new_numbers=False) if level is not None else None  # Its numbers were just drawn
+
+
+    def preload(self, folders):
+        """
+        Loads levels into the cache on the worker thread. Levels already cached or being preloaded are skipped.
+
+        Args:
+            folders (list): Level folder names, in preload order.
+        """
+        with self.lock:
+            for folder in folders:
+                if folder is None or folder in self.pending or self._is_fresh(folder):
+                    continue
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level_preload")
+                self.pending[folder] = self.executor.submit(self._preload, folder)
+
+
+    def clear(self):
+        """
+        Drops all the cached levels.
+        """
+        with self.lock:
+            self.levels.clear()
+
+
+    def shutdown(self):
+        """
+        Cancels the pending preloads and stops the worker thread (the preload running, if any, is finished first).
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+    def _is_fresh(self, folder):
+        """
+        Checks if a level is cached and its source files did not change since it was loaded (call with the lock held).
+
+        Args:
+            folder (str): Level folder name.
+
+        Returns:
+            bool: True if the cached level can be used.
+        """
+        cached = self.levels.get(folder)
+        return cached is not None and cached[0] == source_mtimes(folder)
+
+
+    def _cached(self, folder):
+        """
+        Gets a cached pristine level, marking it as the most recently used. Stale levels are dropped.
+
+        Args:
+            folder (str): Level folder name.
+
+        Returns:
+            Level: The pristine level, or None if it is not cached.
+        """
+        with self.lock:
+            if not self._is_fresh(folder):
+                self.levels.pop(folder, None)
+                return None
+            self.levels.move_to_end(folder)
+            return self.levels[folder][1]
+
+
+    def _load(self, folder):
+        """
+        Loads a level and caches it, dropping the least recently used levels over the cache size.
+
+        Args:
+            folder (str): Level folder name.
+
+        Returns:
+            Level: The pristine level, or None if it could not be loaded.
+        """
+        mtimes = source_mtimes(folder)  # Before loading, so a file changed meanwhile makes it stale
+        level = self.loader(folder)
+        if level is not None:
+            with self.lock:
+                self.levels[folder] = (mtimes, level)
+                self.levels.move_to_end(folder)
+                while len(self.levels) > self.size:
+                    self.levels.popitem(last=False)
+        return level
+
+
+    def _preload(self, folder):
+        """
+        Worker thread body of a preload.
+
+        Args:
+            folder (str): Level folder name.
+        """
+        try:
+            self._load(folder)
+            logging.debug(f"Level preloaded: {folder}")
+        except Exception as e:
+            logging.error(f"Error preloading level {folder}: {e}")
+        finally:
+            with self.lock:
+                self.pending.pop(folder, None)
+
+
+level_cache = LevelCache()
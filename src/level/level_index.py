@@ -0,0 +1,184 @@
+"""
+Level index module.
+Keeps an index of the level folders (number, name, validity and the modification times they were read at), saved to
+disk between runs. Refreshing the index only lists the level folder again when its modification time changes, and only
+checks again the structure files that changed, so building the level select screen does not scan every level folder.
+The leaderboards are kept by the score store (see src.storage.score_store).
+
+Classes:
+    LevelIndex: Cached index of the level folders.
+
+Objects:
+    level_index (LevelIndex): Global level index instance.
+"""
+
+import os
+import json
+import logging
+from src.level.load_level import DEFAULT_LEVEL_PATH
+
+INDEX_FILE = "data/cache/level_index.json"
+INDEX_VERSION = 2  # Bump when the entry format changes, to rebuild the saved indexes
+
+_UNKNOWN = object()  # Modification time of a file not read yet
+
+
+def _mtime(path):
+    """
+    Gets the modification time of a file or folder.
+
+    Args:
+        path (str): Path to the file or folder.
+
+    Returns:
+        float: Modification time, or None if it does not exist.
+    """
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class LevelIndex:
+    """
+    Cached index of the level folders. Each entry holds the level number and name, and whether the level is valid
+    (a "X_Name" folder, X being a number, with a structure.json file).
+
+    Attributes:
+        level_path (str): Folder containing the level folders.
+        index_file (str): File the index is saved to.
+        folder_mtime (float): Modification time of the level folder when it was last listed.
+        entries (dict): Level folder name -> entry (number, name, valid and the structure file mtime).
+
+    Methods:
+        refresh(): Updates the entries of the changed folders and files.
+        levels(): Gets the entries of the valid levels, sorted by level number.
+        load(): Loads the index saved to disk.
+        save(): Saves the index to disk.
+
+    Example:
+        level_index.refresh()
+        for folder, level_info in level_index.levels().items():
+            print(level_info["number"], level_info["name"])
+    """
+    def __init__(self, level_path=DEFAULT_LEVEL_PATH, index_file=INDEX_FILE):
+        """
+        Initializes an empty index. The saved index is loaded on the first refresh.
+
+        Args:
+            level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+            index_file (str, optional): File the index is saved to. Default is INDEX_FILE.
+        """
+        self.level_path = level_path
+        self.index_file = index_file
+        self.folder_mtime = None
+        self.entries = {}
+        self.loaded = False  # Whether the saved index was loaded
+
+
+    def refresh(self):
+        """
+        Updates the index: lists the level folder again if it changed (added or removed levels), then checks again
+        the levels whose structure file modification time changed. The index is saved if anything changed.
+
+        Returns:
+            bool: True if any entry changed.
+        """
+        if not self.loaded:
+            self.load()
+        changed = False
+
+        folder_mtime = _mtime(self.level_path)
+        if folder_mtime != self.folder_mtime:
+            names = set(os.listdir(self.level_path)) if folder_mtime is not None else set()
+            for folder in list(self.entries):
+                if folder not in names:  # Removed level
+                    del self.entries[folder]
+            for folder in names.difference(self.entries):
+                if os.path.isdir(os.path.join(self.level_path, folder)):  # New level
+                    self.entries[folder] = {}
+            self.folder_mtime = folder_mtime
+            changed = True
+
+        for folder, entry in self.entries.items():
+            changed |= self._update_entry(folder, entry)
+
+        if changed:
+            self.save()
+        return changed
+
+
+    def levels(self):
+        """
+        Gets the entries of the valid levels, sorted by level number.
+
+        Returns:
+            dict: Level folder name -> entry, in level number order.
+        """
+        valid = [(folder, entry) for folder, entry in self.entries.items() if entry["valid"]]
+        return dict(sorted(valid, key=lambda item: (item[1]["number"], item[0])))
+
+
+    def load(self):
+        """
+        Loads the index saved to disk. A missing, corrupted or outdated index is ignored (it is built again).
+        """
+        self.loaded = True
+        try:
+            with open(self.index_file, "r") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("level_path") == os.path.normpath(self.level_path):
+                self.folder_mtime = data["folder_mtime"]
+                self.entries = data["entries"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.warning(f"Level index {self.index_file} is corrupted: {e}. Building it again.")
+
+
+    def save(self):
+        """
+        Saves the index to disk (through a temporary file, so an interrupted write never leaves a broken index).
+        """
+        data = {
+            "version": INDEX_VERSION,
+            "level_path": os.path.normpath(self.level_path),
+            "folder_mtime": self.folder_mtime,
+            "entries": self.entries,
+        }
+        temp_file = f"{self.index_file}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+            with open(temp_file, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.index_file)
+        except OSError as e:
+            logging.warning(f"Could not save the level index: {e}")
+
+
+    def _update_entry(self, folder, entry):
+        """
+        Checks a level again if its structure file changed.
+
+        Args:
+            folder (str): Level folder name.
+            entry (dict): Index entry of the level, updated in place.
+
+        Returns:
+            bool: True if the entry changed.
+        """
+        structure_mtime = _mtime(os.path.join(self.level_path, folder, "structure.json"))
+        if entry.get("structure_mtime", _UNKNOWN) != structure_mtime:
+            parts = folder.split("_")
+            valid_name = len(parts) == 2 and parts[0].isdigit()  # "X_Name", X being the level number
+            entry["number"] = int(parts[0]) if valid_name else None
+            entry["name"] = parts[1] if valid_name else folder
+            entry["valid"] = valid_name and structure_mtime is not None
+            if valid_name and structure_mtime is None:
+                logging.debug(f"Missing structure.json in {folder}")
+            entry["structure_mtime"] = structure_mtime
+            return True
+        return False
+
+
+level_index = LevelIndex()
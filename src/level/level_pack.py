@@ -0,0 +1,535 @@
+"""
+Level pack module.
+A level pack is a single binary file holding the compiled levels of a level folder tree: for each level its terrain and
+entity table, already validated by load_level, its background already split into tile textures, and its dialogue.
+The pack is memory-mapped, so loading a packed level skips the JSON parsing, the validation and the decoding and scaling
+of the background. Each packed level records the modification times of its source files and is compiled again when
+one of them changes. Packs can be built ahead of time with tools/build_level_pack.py.
+
+Compiling a level appends its sections and a new index to the pack, then points the header to the new index, so the
+other levels are never copied nor rewritten (an interrupted append leaves the previous index in use). The sections of
+replaced levels and the previous indexes are left unused in the file until the pack is compacted, which only
+tools/build_level_pack.py does.
+
+Pack layout:
+    header: magic, format version, and offset and length of the index (HEADER)
+    sections of each level: terrain codes (uint8, height x width), texture index of each tile
+        (uint16, or uint32 for levels with more textures, height x width) and unique tile textures
+        (RGBA, tile_size x tile_size each, zlib compressed)
+    index: UTF-8 JSON with the level path and, for each level folder, the modification times of its source files,
+        its size, tile index type, entity table, objectives and dialogue, and the [offset, length] of its sections
+        in the file
+
+Classes:
+    LevelPack: Memory-mapped level pack.
+
+Methods:
+    source_mtimes(folder, level_path=DEFAULT_LEVEL_PATH): Gets the modification times of the source files of a level.
+    compile_level(folder, level_path=DEFAULT_LEVEL_PATH): Loads and validates a level folder, compiling it for a pack.
+    open_pack(pack_path=PACK_FILE): Opens a pack, reusing it if it is already open.
+    build_pack(folders, level_path=DEFAULT_LEVEL_PATH, pack_path=PACK_FILE, force=False, prune=False, compact=False): Compiles level folders into a pack.
+    load_packed_level(folder, level_path=DEFAULT_LEVEL_PATH, pack_path=PACK_FILE): Loads a level from the pack, compiling it if needed.
+    get_packed_dialogue(folder, level_path=DEFAULT_LEVEL_PATH, pack_path=PACK_FILE): Gets the packed dialogue of a level.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import struct
+import logging
+import threading
+import numpy as np
+import pygame
+from src.level.level import Level
+from src.level.load_level import load_level, DEFAULT_LEVEL_PATH, ENTITY_CLASSES
+from src.entities.camera import Camera
+
+PACK_FILE = "data/cache/levels.pack"  # Pack of the game levels
+PACK_MAGIC = b"SDLP"
+PACK_VERSION = 2  # Bump when the pack layout changes, so older packs are rebuilt
+HEADER = struct.Struct("<4sIQQ")  # Magic, format version, index offset, index length
+TILE_COMPRESSION = 1  # zlib level of the tile textures (upscaled pixel art, already about 18 times smaller)
+SOURCE_FILES = ("structure.json", "bg.png", "dialogue.json")  # Files a packed level is compiled from
+SECTIONS = ("terrain", "tile_index", "tiles")  # Binary sections of each level, in data order
+TILE_INDEX_TYPES = ("uint16", "uint32")  # Types of the tile index section, the smallest one fitting the textures is used
+ENTITY_HEIGHTS = {"tile": 0, "ground": 1, "air": 2}  # Numerical height of each entity list (others default to 0)
+
+_open_packs = {}  # Pack path -> open LevelPack
+_pack_lock = threading.RLock()  # Guards the open packs while they are read or written (not while levels are compiled)
+
+
+class LevelPack:
+    """
+    Memory-mapped level pack. Sections are read straight from the mapped file when a level is loaded.
+
+    Attributes:
+        path (str): Path of the pack file.
+        level_path (str): Folder containing the packed level folders.
+        levels (dict): Level folder name -> index entry of the level.
+        unused (int): Bytes of the file no longer used (replaced sections and previous indexes).
+        data (mmap.mmap): Mapped pack file.
+
+    Methods:
+        is_fresh(folder, level_path=DEFAULT_LEVEL_PATH): Checks if a level is packed and its source files are unchanged.
+        section(folder, name): Gets the bytes of a section of a level.
+        copy_section(folder, name, f): Writes a section of a level to a file without loading it.
+        load_level(folder): Builds a level from its packed data.
+        close(): Unmaps and closes the pack file.
+
+    Example:
+        pack = open_pack()
+        if pack is not None and pack.is_fresh("1_First Steps"):
+            level = pack.load_level("1_First Steps")
+    """
+    def __init__(self, path):
+        """
+        Maps a pack file and reads its index.
+
+        Args:
+            path (str): Path of the pack file.
+
+        Raises:
+            OSError: If the file can not be opened or mapped.
+            ValueError: If the file is not a pack of the current format version.
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_offset, index_length = HEADER.unpack_from(self.data, 0)
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                raise ValueError(f"not a level pack of version {PACK_VERSION}")
+            index = json.loads(self.data[index_offset:index_offset + index_length])
+            self.level_path = index["level_path"]
+            self.levels = index["levels"]
+            used = HEADER.size + index_length + sum(entry[name][1] for entry in self.levels.values() for name in SECTIONS)
+            self.unused = len(self.data) - used
+        except (ValueError, KeyError, TypeError, IndexError, struct.error):
+            self.close()
+            raise ValueError(f"corrupted level pack {path}")
+        except OSError:
+            self.close()
+            raise
+
+
+    def is_fresh(self, folder, level_path=DEFAULT_LEVEL_PATH):
+        """
+        Checks if a level is packed and none of its source files changed since it was compiled.
+
+        Args:
+            folder (str): Level folder name.
+            level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+
+        Returns:
+            bool: True if the packed level can be used.
+        """
+        entry = self.levels.get(folder)
+        return (
+            entry is not None
+            and self.level_path == os.path.normpath(level_path)
+            and entry["mtimes"] == source_mtimes(folder, level_path)
+        )
+
+
+    def section(self, folder, name):
+        """
+        Gets the bytes of a section of a level.
+
+        Args:
+            folder (str): Level folder name.
+            name (str): Section name (one of SECTIONS).
+
+        Returns:
+            bytes: Content of the section.
+        """
+        offset, length = self.levels[folder][name]
+        return self.data[offset:offset + length]
+
+
+    def copy_section(self, folder, name, f):
+        """
+        Writes a section of a level to a file straight from the mapped pack, without copying it into memory.
+
+        Args:
+            folder (str): Level folder name.
+            name (str): Section name (one of SECTIONS).
+            f (file): Binary file to write to.
+        """
+        offset, length = self.levels[folder][name]
+        with memoryview(self.data) as view:
+            f.write(view[offset:offset + length])
+
+
+    def load_level(self, folder):
+        """
+        Builds a level from its packed data, without validating it again.
+        Entities are added in the order load_level added them, so they get the same ids.
+
+        Args:
+            folder (str): Level folder name.
+
+        Returns:
+            Level: The loaded level.
+        """
+        entry = self.levels[folder]
+        width, height = entry["size"]
+        tile_size = entry["tile_size"]
+        tile_bytes = tile_size * tile_size * 4
+        tiles = zlib.decompress(self.section(folder, "tiles"))
+        textures = [
+            pygame.image.frombytes(tiles[start:start + tile_bytes], (tile_size, tile_size), "RGBA")
+            for start in range(0, len(tiles), tile_bytes)
+        ]
+        index_type = entry.get("tile_index_type", "uint16")
+        if index_type not in TILE_INDEX_TYPES:
+            raise ValueError(f"unknown tile index type {index_type!r}")
+        tile_index = np.frombuffer(self.section(folder, "tile_index"), dtype=index_type).reshape(height, width)
+        img_mtx = [[textures[i] for i in row] for row in tile_index.tolist()]
+
+        level = Level(width, height, os.path.join(self.level_path, folder, "bg.png"), img_mtx=img_mtx)
+        level.set_terrain(np.frombuffer(self.section(folder, "terrain"), dtype=np.uint8).reshape(height, width))
+        for numerical_height, entity in entry["entities"]:
+            obj = ENTITY_CLASSES[entity["type"]](entity)
+            obj.height = numerical_height
+            level.add_entity(obj)
+        level.add_entity(Camera(width // 2, height // 2, 3))
+        level.objectives.update(entry["objectives"])
+        return level
+
+
+    def close(self):
+        """
+        Unmaps and closes the pack file. Levels already loaded do not use it.
+        """
+        data = getattr(self, "data", None)
+        if data is not None:
+            data.close()
+            self.data = None
+        self.file.close()
+
+
+def source_mtimes(folder, level_path=DEFAULT_LEVEL_PATH):
+    """
+    Gets the modification times of the source files of a level.
+
+    Args:
+        folder (str): Level folder name.
+        level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+
+    Returns:
+        list: Modification time of each file of SOURCE_FILES (None for missing files).
+    """
+    mtimes = []
+    for filename in SOURCE_FILES:
+        try:
+            mtimes.append(os.path.getmtime(os.path.join(level_path, folder, filename)))
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+
+def compile_level(folder, level_path=DEFAULT_LEVEL_PATH):
+    """
+    Loads and validates a level folder with load_level, compiling it into a pack entry and its sections.
+
+    Args:
+        folder (str): Level folder name.
+        level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+
+    Returns:
+        tuple: (Level, entry, sections) with the loaded level, its index entry and its section bytes,
+            or None if the level is not valid (the errors are pushed by load_level).
+    """
+    mtimes = source_mtimes(folder, level_path)  # Before loading, so a file changed meanwhile is compiled again
+    level = load_level(folder, level_path)
+    if level is None:
+        return None
+
+    with open(os.path.join(level_path, folder, "structure.json"), "r") as f:
+        structure = json.load(f)
+    entities = [
+        [ENTITY_HEIGHTS.get(height, 0), entity]
+        for height, entity_list in structure["entities"].items()
+        for entity in entity_list
+        if entity["type"] in ENTITY_CLASSES  # Unknown types are skipped by load_level
+    ]
+
+    dialogue = None  # Missing or invalid dialogues are left to the game screen to report
+    try:
+        with open(os.path.join(level_path, folder, "dialogue.json"), "r") as f:
+            dialogue = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    texture_ids = {}  # id(surface) -> texture index (identical sections share a surface)
+    textures = []
+    tile_index = np.zeros((level.height, level.width), dtype=np.uint32)
+    for y, row in enumerate(level.img_mtx):
+        for x, image in enumerate(row):
+            index = texture_ids.get(id(image))
+            if index is None:
+                index = texture_ids[id(image)] = len(textures)
+                textures.append(pygame.image.tobytes(image, "RGBA"))
+            tile_index[y, x] = index
+    index_type = next(name for name in TILE_INDEX_TYPES if len(textures) - 1 <= np.iinfo(name).max)
+
+    entry = {
+        "mtimes": mtimes,
+        "size": [level.width, level.height],
+        "tile_size": level.tile_size,
+        "tile_index_type": index_type,
+        "entities": entities,
+        "objectives": dict(level.objectives),
+        "dialogue": dialogue,
+    }
+    sections = {
+        "terrain": level.grid.terrain.tobytes(),
+        "tile_index": tile_index.astype(index_type).tobytes(),
+        "tiles": zlib.compress(b"".join(textures), TILE_COMPRESSION),
+    }
+    return level, entry, sections
+
+
+def open_pack(pack_path=PACK_FILE):
+    """
+    Opens a pack, reusing it if it is already open.
+
+    Args:
+        pack_path (str, optional): Path of the pack file. Default is PACK_FILE.
+
+    Returns:
+        LevelPack: The pack, or None if it does not exist or is corrupted.
+    """
+    with _pack_lock:
+        pack = _open_packs.get(pack_path)
+        if pack is None:
+            try:
+                pack = _open_packs[pack_path] = LevelPack(pack_path)
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not open level pack {pack_path}: {e}")
+                return None
+        return pack
+
+
+def _open_pack_of(pack_path, level_path):
+    """
+    Opens a pack if it holds the levels of a level path (call with the pack lock held).
+
+    Args:
+        pack_path (str): Path of the pack file.
+        level_path (str): Folder containing the level folders.
+
+    Returns:
+        LevelPack: The pack, or None if it does not exist, is corrupted or holds another level path.
+    """
+    pack = open_pack(pack_path)
+    if pack is not None and pack.level_path != os.path.normpath(level_path):
+        return None
+    return pack
+
+
+def _close_pack(pack_path):
+    """
+    Closes a pack if it is open (before its file is replaced).
+
+    Args:
+        pack_path (str): Path of the pack file.
+    """
+    pack = _open_packs.pop(pack_path, None)
+    if pack is not None:
+        pack.close()
+
+
+def _write_levels(f, index, levels, pack=None):
+    """
+    Writes the sections of levels at the current position of a pack file and adds their entries to the index.
+
+    Args:
+        f (file): Binary pack file.
+        index (dict): Index of the pack being written.
+        levels (dict): Level folder name -> (entry, sections), with sections None to copy them from the pack.
+        pack (LevelPack, optional): Pack to copy the sections from. Default is None.
+    """
+    for folder, (entry, sections) in levels.items():
+        entry = dict(entry)
+        for name in SECTIONS:
+            offset = f.tell()
+            if sections is None:
+                pack.copy_section(folder, name, f)
+            else:
+                f.write(sections[name])
+            entry[name] = [offset, f.tell() - offset]
+        index["levels"][folder] = entry
+
+
+def _write_index(f, index):
+    """
+    Writes the index at the current position of a pack file and then points the header to it. The index is synced
+    to disk before the header is written, so the header never points to an index that is not complete.
+
+    Args:
+        f (file): Binary pack file.
+        index (dict): Index of the pack.
+    """
+    index_offset = f.tell()
+    index_bytes = json.dumps(index).encode("utf-8")
+    f.write(index_bytes)
+    f.flush()
+    os.fsync(f.fileno())
+    f.seek(0)
+    f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, index_offset, len(index_bytes)))
+
+
+def _write_pack(pack_path, level_path, levels, pack=None):
+    """
+    Writes a whole pack, without unused space, to a temporary file and renames it over the pack, so an interrupted
+    write never leaves a broken pack. The sections of the levels kept from the open pack are streamed from its mapped
+    file.
+
+    Args:
+        pack_path (str): Path of the pack file.
+        level_path (str): Folder containing the packed level folders.
+        levels (dict): Level folder name -> (entry, sections), with sections None to copy them from the pack.
+        pack (LevelPack, optional): Open pack to copy the sections from. Default is None.
+    """
+    index = {"level_path": os.path.normpath(level_path), "levels": {}}
+    os.makedirs(os.path.dirname(pack_path) or ".", exist_ok=True)
+    temp_path = f"{pack_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, 0))  # Rewritten once the index is written
+        _write_levels(f, index, levels, pack)
+        _write_index(f, index)
+    _close_pack(pack_path)
+    os.replace(temp_path, pack_path)
+
+
+def _append_pack(pack, levels):
+    """
+    Appends the sections of new or compiled again levels and a new index to a pack. The other levels stay where they
+    are; the sections they replace and the previous index become unused space.
+
+    Args:
+        pack (LevelPack): Open pack (it is closed, as its index is replaced).
+        levels (dict): Level folder name -> (entry, sections) of the levels in the new index, with sections None for
+            the levels kept as they are.
+    """
+    index = {
+        "level_path": pack.level_path,
+        "levels": {folder: entry for folder, (entry, sections) in levels.items() if sections is None},  # Already in the file
+    }
+    path = pack.path
+    _close_pack(path)
+    with open(path, "r+b") as f:
+        f.seek(0, os.SEEK_END)  # After the previous index (and after the data of an interrupted append)
+        _write_levels(f, index, {folder: level for folder, level in levels.items() if level[1] is not None})
+        _write_index(f, index)
+
+
+def build_pack(folders, level_path=DEFAULT_LEVEL_PATH, pack_path=PACK_FILE, force=False, prune=False, compact=False):
+    """
+    Compiles level folders into a pack. Levels already packed with unchanged source files are kept as they are
+    (unless forced), as are the other levels of the pack (unless pruning). Levels that are not valid are left out.
+    A pack holds the levels of a single level path, so a pack of another level path is replaced.
+
+    The compiled levels are appended to the pack. Compacting writes the whole pack again without its unused space,
+    copying the kept levels from the old pack file (meant for tools/build_level_pack.py, not for the game).
+    Levels are compiled without holding the pack lock, so a background compile does not hold up the game reading other
+    levels or dialogues from the pack; the lock is only taken to find the levels to compile and to write the pack.
+
+    Args:
+        folders (list): Level folder names to compile.
+        level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+        pack_path (str, optional): Path of the pack file. Default is PACK_FILE.
+        force (bool, optional): Compile the levels even if they are up to date. Default is False.
+        prune (bool, optional): Drop the packed levels not in folders. Default is False.
+        compact (bool, optional): Write the whole pack again without unused space. Default is False.
+
+    Returns:
+        dict: Level folder name -> Level, for the levels that were compiled.
+    """
+    with _pack_lock:
+        pack = _open_pack_of(pack_path, level_path)
+        stale = [folder for folder in folders if pack is None or force or not pack.is_fresh(folder, level_path)]
+
+    compiled = {}
+    sections_of = {}  # Level folder name -> (entry, sections) of the compiled levels
+    for folder in stale:
+        result = compile_level(folder, level_path)
+        if result is not None:
+            level, entry, sections = result
+            sections_of[folder] = (entry, sections)
+            compiled[folder] = level
+
+    with _pack_lock:
+        pack = _open_pack_of(pack_path, level_path)  # Again, another thread may have written the pack meanwhile
+
+        levels = {}  # Level folder name -> (entry, sections) of the new pack (sections None if kept as they are)
+        if pack is not None and not prune:
+            for folder in pack.levels:
+                if folder not in folders:
+                    levels[folder] = (pack.levels[folder], None)
+        for folder in folders:
+            if folder in sections_of:
+                levels[folder] = sections_of[folder]
+            elif folder not in stale and pack is not None and folder in pack.levels:  # Fresh, kept as it is
+                levels[folder] = (pack.levels[folder], None)
+
+        changed = pack is None or compiled or levels.keys() != pack.levels.keys()
+        try:
+            if pack is None or (compact and (changed or pack.unused)):
+                _write_pack(pack_path, level_path, levels, pack)
+                logging.debug(f"Level pack {pack_path} written with {len(levels)} levels ({len(compiled)} compiled)")
+            elif changed:
+                _append_pack(pack, levels)
+                logging.debug(f"Level pack {pack_path} updated with {len(compiled)} compiled levels")
+        except OSError as e:
+            logging.warning(f"Could not write level pack {pack_path}: {e}")
+            _close_pack(pack_path)  # Opened again (or found broken) on the next use
+        return compiled
+
+
+def load_packed_level(folder, level_path=DEFAULT_LEVEL_PATH, pack_path=PACK_FILE):
+    """
+    Loads a level from the pack. If it is not packed or its source files changed, it is loaded with load_level
+    and compiled into the pack for the next time.
+
+    Args:
+        folder (str): Level folder name.
+        level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+        pack_path (str, optional): Path of the pack file. Default is PACK_FILE.
+
+    Returns:
+        Level: The loaded level, or None if an error occurred
+    """
+    corrupted = False
+    with _pack_lock:
+        pack = open_pack(pack_path)
+        if pack is not None and pack.is_fresh(folder, level_path):
+            try:
+                return pack.load_level(folder)
+            except (KeyError, ValueError, TypeError, zlib.error, pygame.error) as e:
+                logging.warning(f"Packed level {folder} is corrupted: {e}. Compiling it again.")
+                corrupted = True
+    return build_pack([folder], level_path, pack_path, force=corrupted).get(folder)  # Compiled without the pack lock
+
+
+def get_packed_dialogue(folder, level_path=DEFAULT_LEVEL_PATH, pack_path=PACK_FILE):
+    """
+    Gets the dialogue of a packed level, if the level is packed and up to date.
+
+    Args:
+        folder (str): Level folder name.
+        level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+        pack_path (str, optional): Path of the pack file. Default is PACK_FILE.
+
+    Returns:
+        dict: The dialogue messages, or None if they are not packed (the dialogue file has to be read instead).
+    """
+    with _pack_lock:
+        pack = open_pack(pack_path)
+        if pack is None or not pack.is_fresh(folder, level_path):
+            return None
+        return pack.levels[folder]["dialogue"]
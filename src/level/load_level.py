@@ -5,15 +5,19 @@ This module is responsible for loading a level from a specified folder.
 It reads the level structure from a JSON file and background map, validates the entities, and creates a Level object.
 It also performs various checks to ensure the level is valid, such as checking for required robots, charge pads, and terminals.
 
+Objects:
+    ENTITY_CLASSES (dict): Entity type -> function creating the entity from its entry in the structure file.
+
 Methods:
-    load_level(folder): Loads a level from the specified folder and returns a Level object or None if an error occurs.
+    load_level(folder, level_path=DEFAULT_LEVEL_PATH): Loads a level from the specified folder and returns a Level object or None if an error occurs.
 """
 
 import os
 import logging
 import json
+import numpy as np
 from src.level.level import Level
-from src.level.tile import Tile
+from src.level.grid import LAYERS
 from src.entities.blue import Blue
 from src.entities.camera import Camera
 from src.entities.charge_pad import ChargePad
@@ -30,19 +34,35 @@ from src.render.error_handler import error_handler, ErrorLevel
 
 DEFAULT_LEVEL_PATH = "./data/level/"
 
+# Entity creation mapping, from the entity type of the structure file to a function creating it from its entry
+ENTITY_CLASSES = {
+    "Blue": lambda e: Blue(e["x"], e["y"], e.get("direction", "N")),
+    "Red": lambda e: Red(e["x"], e["y"], e.get("direction", "N")),
+    "Green": lambda e: Green(e["x"], e["y"], e.get("direction", "N")),
+    "ChargePad": lambda e: ChargePad(e["x"], e["y"], 0),
+    "Collectable": lambda e: Collectable(e["x"], e["y"], e.get("height", 0)),
+    "Trap": lambda e: Trap(e["x"], e["y"], 0),
+    "CrateDel": lambda e: CrateDel(e["x"], e["y"], 0),
+    "CrateGen": lambda e: CrateGen(e["x"], e["y"], 0, e.get("crate_count", 0), e.get("crate_type", "big")),
+    "Crate": lambda e: Crate(e["x"], e["y"], 0, small=e.get("small", False)),
+    "InputTer": lambda e: InputTer(e["x"], e["y"], 0, e.get("ter_one"), e.get("ter_two"), e.get("operation")),
+    "OutputTer": lambda e: OutputTer(e["x"], e["y"], e["color"], 0),
+}
+
 
-def load_level(folder):
+def load_level(folder, level_path=DEFAULT_LEVEL_PATH):
     """
     Load a level from a folder containing the level structure and background map.
     
     Args:
         folder (str): Folder name containing the level files.
+        level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
 
     Returns:
         Level: The loaded level, or None if an error occurred
     """
-    structure = DEFAULT_LEVEL_PATH + folder + "/structure.json"  # Level structure file
-    background_image = DEFAULT_LEVEL_PATH + folder + "/bg.png"  # Level background image file
+    structure = os.path.join(level_path, folder, "structure.json")  # Level structure file
+    background_image = os.path.join(level_path, folder, "bg.png")  # Level background image file
     has_red = False  # If we added a red robot
     has_blue = False  # If we added a blue robot
     has_green = False  # If we added a green robot
@@ -98,30 +118,17 @@ def load_level(folder):
             # Step 1: Create the level
             level = Level(size[0], size[1], background_image)
 
-            # Step 2: Load map data
-            for y in range(size[1]):
-                for x in range(size[0]):
-                    if matrix[y][x] == 0:  # Path
-                        level.tiles[y][x].set_path()
-                    elif matrix[y][x] == 1:  # Mid-height wall
-                        level.tiles[y][x].set_mid_wall()
-
-            # Step 3: Define entity creation mapping
-            entity_classes = {
-                "Blue": lambda e: Blue(e["x"], e["y"], e.get("direction", "N")),
-                "Red": lambda e: Red(e["x"], e["y"], e.get("direction", "N")),
-                "Green": lambda e: Green(e["x"], e["y"], e.get("direction", "N")),
-                "ChargePad": lambda e: ChargePad(e["x"], e["y"], 0),
-                "Collectable": lambda e: Collectable(e["x"], e["y"], e.get("height", 0)),
-                "Trap": lambda e: Trap(e["x"], e["y"], 0),
-                "CrateDel": lambda e: CrateDel(e["x"], e["y"], 0),
-                "CrateGen": lambda e: CrateGen(e["x"], e["y"], 0, e.get("crate_count", 0), e.get("crate_type", "big")),
-                "Crate": lambda e: Crate(e["x"], e["y"], 0, small=e.get("small", False)),
-                "InputTer": lambda e: InputTer(e["x"], e["y"], 0, e.get("ter_one"), e.get("ter_two"), e.get("operation")),
-                "OutputTer": lambda e: OutputTer(e["x"], e["y"], e["color"], 0),
-            }
-
-            # Step 4: Load entities
+            # Step 2: Load map data (0 = path, 1 = mid-height wall, 2 = wall)
+            if not level.set_terrain(matrix):
+                logging.error("Level matrix does not match the level size.")
+                error_handler.push_error(
+                    "Loading Error",
+                    f"Level matrix does not match the level size {size}.\nCheck level creation manual.",
+                    ErrorLevel.ERROR
+                )
+                return None
+
+            # Step 3: Load entities
             for height, entity_list in entities.items():
                 for entity in entity_list:
                     entity_type = entity["type"]
@@ -140,7 +147,7 @@ def load_level(folder):
 
                     # Create the entity if the type is valid
                     valid_operations = ["+", "-", "*", "/"]
-                    if entity_type in entity_classes:
+                    if entity_type in ENTITY_CLASSES:
                         # Don't create an input terminal if the operation is not valid
                         if entity_type == "InputTer" and entity.get("operation") not in valid_operations:
                             logging.error(f"Invalid operation for InputTer: {entity.get('operation')}")
@@ -151,7 +158,7 @@ def load_level(folder):
                             )
                             return None
 
-                        obj = entity_classes[entity_type](entity)  # Create the entity using the mapping
+                        obj = ENTITY_CLASSES[entity_type](entity)  # Create the entity using the mapping
                         obj.height = numerical_height  # Change the height to the numerical value
 
                         match entity_type:
@@ -235,12 +242,12 @@ def load_level(folder):
                         logging.error(f"Unknown entity type: {entity_type}")
 
 
-            # Step 5: Add the camera at the center of the level
+            # Step 4: Add the camera at the center of the level
             cam_x = size[0] // 2
             cam_y = size[1] // 2
-            level.tiles[cam_y][cam_x].entities["camera"] = Camera(cam_x, cam_y, 3)
+            level.add_entity(Camera(cam_x, cam_y, 3))
 
-            # Step 6: Additional checks
+            # Step 5: Additional checks
             if not has_blue and not has_green and not has_red:  # Ensure at least one robot is present
                 logging.error("No robots were added to the level.")
                 error_handler.push_error(
@@ -306,19 +313,18 @@ def load_level(folder):
                 )
                 return None
 
-            for y in range(size[1]):  # Check all entities are on expected heights
-                for x in range(size[0]):
-                    tile = level.tiles[y][x]
-                    for height, entity in tile.entities.items():
-                        if entity is not None:
-                            if type(entity) not in expected_heights[height]:
-                                logging.error(f"Entity {entity} is on the wrong height.")
-                                error_handler.push_error(
-                                    "Loading Error",
-                                    f"Entity {entity} is on the wrong height: {height}.",
-                                    ErrorLevel.ERROR
-                                )
-                                return None
+            for numerical_height, height in enumerate(LAYERS):  # Check all entities are on expected heights
+                for entity_id in np.unique(level.grid.occupancy[numerical_height]):
+                    entity = level.grid.entities[entity_id]
+                    if entity is not None:
+                        if type(entity) not in expected_heights[height]:
+                            logging.error(f"Entity {entity} is on the wrong height.")
+                            error_handler.push_error(
+                                "Loading Error",
+                                f"Entity {entity} is on the wrong height: {height}.",
+                                ErrorLevel.ERROR
+                            )
+                            return None
             return level
 
     except json.JSONDecodeError as e:
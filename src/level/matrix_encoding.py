@@ -0,0 +1,150 @@
+"""
+Matrix encoding module.
+Compact encodings for the "matrix" of structure.json, for large (generated) levels where nested lists of codes
+make huge files and slow JSON parses. An encoded matrix is an object instead of a list of rows:
+
+    Run-length rows: {"encoding": "rle", "rows": [[code, count, code, count, ...], ...]}
+        Each row is a flat list of (terrain code, run length) pairs.
+    Bit planes: {"encoding": "bitplanes", "path": "<base64>", "mid_wall": "<base64>"}
+        One bit per tile for each of the path and mid-height wall codes (tiles in neither plane are walls).
+        Each row is packed on whole bytes (most significant bit first) and the rows are concatenated.
+
+Encoded matrices are decoded in blocks of rows, which are written straight into the grid (see LevelGrid.set_terrain_rows),
+so the whole matrix is never held as Python lists.
+
+Methods:
+    encode_matrix(matrix, encoding="rle"): Encodes a terrain matrix in a compact encoding.
+    iter_matrix_rows(matrix, width, height, block_rows=BLOCK_ROWS): Decodes an encoded matrix in blocks of rows.
+"""
+
+import base64
+import numpy as np
+from src.level.grid import PATH, MID_WALL, WALL
+
+ENCODINGS = ("rle", "bitplanes")
+BLOCK_ROWS = 256  # Rows decoded at a time
+
+
+def encode_matrix(matrix, encoding="rle"):
+    """
+    Encodes a terrain matrix in a compact encoding.
+
+    Args:
+        matrix (list or numpy.ndarray): Terrain codes, one row per y coordinate.
+        encoding (str, optional): One of ENCODINGS. Default is "rle".
+
+    Returns:
+        dict: The encoded matrix, ready to be saved as the "matrix" of structure.json.
+
+    Raises:
+        ValueError: If the encoding is not known.
+    """
+    terrain = np.asarray(matrix, dtype=np.uint8)
+    match encoding:
+        case "rle":
+            rows = []
+            for row in terrain:
+                starts = np.flatnonzero(np.diff(row, prepend=np.int16(-1)))  # First tile of each run
+                counts = np.diff(starts, append=len(row))
+                rows.append(np.column_stack((row[starts], counts)).ravel().tolist())
+            return {"encoding": "rle", "rows": rows}
+        case "bitplanes":
+            return {
+                "encoding": "bitplanes",
+                "path": base64.b64encode(np.packbits(terrain == PATH, axis=1).tobytes()).decode("ascii"),
+                "mid_wall": base64.b64encode(np.packbits(terrain == MID_WALL, axis=1).tobytes()).decode("ascii"),
+            }
+        case _:
+            raise ValueError(f"unknown matrix encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def iter_matrix_rows(matrix, width, height, block_rows=BLOCK_ROWS):
+    """
+    Decodes an encoded matrix in blocks of rows.
+
+    Args:
+        matrix (dict): Encoded matrix.
+        width (int): Width of the level in tiles.
+        height (int): Height of the level in tiles.
+        block_rows (int, optional): Rows per block. Default is BLOCK_ROWS.
+
+    Yields:
+        tuple: (y, rows) with the first row of the block and a (rows, width) uint8 array of terrain codes.
+
+    Raises:
+        ValueError: If the encoding is not known or the data does not match the level size.
+    """
+    match matrix.get("encoding"):
+        case "rle":
+            yield from _iter_rle_rows(matrix, width, height, block_rows)
+        case "bitplanes":
+            yield from _iter_bitplane_rows(matrix, width, height, block_rows)
+        case encoding:
+            raise ValueError(f"unknown matrix encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def _iter_rle_rows(matrix, width, height, block_rows):
+    """
+    Decodes run-length rows in blocks (see iter_matrix_rows).
+    """
+    rows = matrix.get("rows")
+    if not isinstance(rows, list) or len(rows) != height:
+        raise ValueError(f"expected {height} run-length rows")
+    for y in range(0, height, block_rows):
+        block = np.empty((min(block_rows, height - y), width), dtype=np.uint8)
+        for i, runs in enumerate(rows[y:y + block_rows]):
+            try:
+                runs = np.asarray(runs, dtype=np.int64)
+            except (TypeError, ValueError):
+                raise ValueError(f"row {y + i} is not a list of (code, count) pairs")
+            if runs.ndim != 1 or len(runs) % 2 or (runs[1::2] < 0).any() or runs[1::2].sum() != width:
+                raise ValueError(f"row {y + i} does not have {width} tiles")
+            codes = np.where((runs[0::2] >= PATH) & (runs[0::2] <= WALL), runs[0::2], WALL)  # Unknown codes are walls
+            block[i] = np.repeat(codes, runs[1::2])
+        yield y, block
+
+
+def _iter_bitplane_rows(matrix, width, height, block_rows):
+    """
+    Decodes bit planes in blocks (see iter_matrix_rows). Only the base64 characters of each block are decoded.
+    """
+    row_bytes = (width + 7) // 8
+    planes = []
+    for name in ("path", "mid_wall"):
+        plane = matrix.get(name)
+        if not isinstance(plane, str) or len(plane) != (height * row_bytes + 2) // 3 * 4:
+            raise ValueError(f"bit plane {name!r} does not match the level size")
+        planes.append(plane)
+
+    for y in range(0, height, block_rows):
+        rows = min(block_rows, height - y)
+        path, mid_wall = (_decode_plane_rows(plane, y, rows, row_bytes, width) for plane in planes)
+        if (path & mid_wall).any():
+            raise ValueError(f"tiles marked as both path and mid-height wall in rows {y} to {y + rows - 1}")
+        block = np.full((rows, width), WALL, dtype=np.uint8)
+        block[path] = PATH
+        block[mid_wall] = MID_WALL
+        yield y, block
+
+
+def _decode_plane_rows(plane, y, rows, row_bytes, width):
+    """
+    Decodes the bits of some rows of a base64 bit plane, decoding only the characters of those rows.
+
+    Args:
+        plane (str): Base64 bit plane.
+        y (int): First row to decode.
+        rows (int): Number of rows to decode.
+        row_bytes (int): Bytes per packed row.
+        width (int): Width of the level in tiles.
+
+    Returns:
+        numpy.ndarray: (rows, width) boolean array with the bits of the rows.
+    """
+    start, end = y * row_bytes, (y + rows) * row_bytes  # Bytes of the rows
+    aligned = start // 3 * 3  # Base64 encodes groups of 3 bytes in 4 characters
+    data = base64.b64decode(plane[aligned // 3 * 4:(end + 2) // 3 * 4], validate=True)[start - aligned:end - aligned]
+    if len(data) != end - start:
+        raise ValueError(f"bit plane is truncated at row {y}")
+    packed = np.frombuffer(data, dtype=np.uint8).reshape(rows, row_bytes)
+    return np.unpackbits(packed, axis=1, count=width).astype(bool)
@@ -0,0 +1,52 @@
+"""
+Level snapshot module.
+A snapshot is an immutable copy of the drawable state of a level (entity positions and states, camera) taken at the end
+of a simulation step. When the simulation runs on a worker thread, the screen draws the latest published snapshot
+instead of reading the live level while it is being updated.
+
+Classes:
+    LevelSnapshot: Immutable drawable state of a level.
+
+Methods:
+    take_snapshot(level, version): Copies the drawable state of a level.
+"""
+
+import copy
+from collections import namedtuple
+import numpy as np
+
+LevelSnapshot = namedtuple("LevelSnapshot", ["version", "level", "occupancy", "entities", "camera"])
+LevelSnapshot.__doc__ = """
+Immutable drawable state of a level.
+
+Attributes:
+    version (int): GameManager state version the snapshot was taken at.
+    level (Level): Level the snapshot was taken from (for its size and terrain, which never change).
+    occupancy (numpy.ndarray): Read-only copy of the (4, height, width) entity id array of the grid.
+    entities (tuple): Copies of the entities on the grid, indexed by their id (None for the ids not on the grid).
+    camera (tuple): (x, y) position of the camera, or None if there is no camera.
+"""
+
+
+def take_snapshot(level, version):
+    """
+    Copies the drawable state of a level. Only the entities on the grid are copied (shallow copies, as the
+    screen only reads their own attributes).
+
+    Args:
+        level (Level): Level to copy.
+        version (int): GameManager state version of the level.
+
+    Returns:
+        LevelSnapshot: The snapshot.
+    """
+    occupancy = level.grid.occupancy.copy()
+    occupancy.flags.writeable = False
+
+    entities = level.grid.entities
+    on_grid = np.zeros(len(entities), dtype=bool)
+    on_grid[occupancy.ravel()] = True
+    on_grid[0] = False  # Empty cells
+    copies = tuple(copy.copy(entities[i]) if present else None for i, present in enumerate(on_grid.tolist()))
+
+    return LevelSnapshot(version, level, occupancy, copies, level.get_camera_position())
@@ -2,9 +2,104 @@
 
 import logging
 import pygame
+from src.level.grid import PATH, MID_WALL, LAYERS
 from src.render.missing_image import missing_texture_pygame
 
 
+class TileEntities:
+    """
+    Entities on the different heights of a tile. Behaves like the dictionary it replaces
+    (tile.entities['ground'], .get(), .items()...) but uses fixed slots, which takes a fraction of the memory.
+
+    Attributes:
+        tile (Entity): Entity on the tile (Not the same as ground, this defines what the floor is made of)
+        ground (Entity): Entity on the ground
+        air (Entity): Entity in the air
+        camera (Entity): Entity on the camera
+
+    Example:
+        entities = TileEntities()
+        entities['ground'] = crate
+    """
+    __slots__ = ('tile', 'ground', 'air', 'camera')
+
+    def __init__(self):
+        """
+        Initializes all the heights as empty.
+        """
+        self.tile = None
+        self.ground = None
+        self.air = None
+        self.camera = None
+
+
+    def __getitem__(self, height):
+        """
+        Gets the entity at a height, raising KeyError for unknown heights (same as a dictionary).
+        """
+        if height not in self.__slots__:  # Methods ('get', 'items'...) are attributes too, but not heights
+            raise KeyError(height)
+        return getattr(self, height)
+
+
+    def __setitem__(self, height, entity):
+        """
+        Sets the entity at a height, raising KeyError for unknown heights.
+        """
+        if height not in self.__slots__:
+            raise KeyError(height)
+        setattr(self, height, entity)
+
+
+    def __contains__(self, height):
+        """
+        Checks if a height exists.
+        """
+        return height in self.__slots__
+
+
+    def __iter__(self):
+        """
+        Iterates over the height names.
+        """
+        return iter(self.__slots__)
+
+
+    def get(self, height, default=None):
+        """
+        Gets the entity at a height, or the default value if the height does not exist.
+
+        Args:
+            height (str): Height to read ('tile', 'ground', 'air', 'camera').
+            default (optional): Value returned for unknown heights. Default is None.
+
+        Returns:
+            Entity: The entity at that height (None if empty).
+        """
+        return getattr(self, height, default) if height in self.__slots__ else default
+
+
+    def keys(self):
+        """
+        Gets the height names.
+        """
+        return self.__slots__
+
+
+    def values(self):
+        """
+        Gets the entities of every height, in height order.
+        """
+        return [self.tile, self.ground, self.air, self.camera]
+
+
+    def items(self):
+        """
+        Gets (height, entity) pairs, in height order.
+        """
+        return [('tile', self.tile), ('ground', self.ground), ('air', self.air), ('camera', self.camera)]
+
+
 class Tile:
     """
     Tile class, representing a single tile in the level. It can contain up to 3 entities on different heights.
@@ -12,7 +107,7 @@ class Tile:
     However, the wall can also be classified as a "mid-height wall", which allows air entities to pass through it.
 
     Atributes:
-        entities (dict): Dictionary containing entities on the tile at different heights.
+        entities (TileEntities): Dict-like container with the entities on the tile at different heights.
             - 'tile': Entity on the tile (Not the same as ground, this defines what the floor is made of)
             - 'ground': Entity on the ground
             - 'air': Entity in the air
@@ -35,6 +130,8 @@ class Tile:
     Example:
         tile = Tile(0, 0, 'path/to/image.png')
     """
+    __slots__ = ('entities', 'x', 'y', 'is_path', 'is_mid_wall', 'image')  # Fixed attribute set, avoids a __dict__ per tile
+
     def __init__(self, x, y, image):
         """
         Initializes a Tile instance.
@@ -44,12 +141,7 @@ class Tile:
             y (int): Y position of the tile in the level.
             image (str or pygame.Surface): Path to the tile image or a pygame Surface object.
         """
-        self.entities = {
-            'tile': None,  # Entity on the tile (Not the same as ground, this defines what the floor is made of)
-            'ground': None,  # Entity on the ground
-            'air': None,  # Entity in the air
-            'camera': None  # Entity on the camera
-        }
+        self.entities = TileEntities()  # Entities on the tile, ground, air and camera heights
 
         self.x = x  # X Position of the tile in the level
         self.y = y  # Y Position of the tile in the level
@@ -210,4 +302,271 @@ class Tile:
             success = True
         else:
             logging.warning("Cannot remove entity from tile: No entity at given height")
-        return success
\ No newline at end of file
+        return success
+
+class CellEntities:
+    """
+    Entities on the different heights of a level cell, read from and written to the level grid.
+    Same interface as TileEntities (cell.entities['ground'], .get(), .items()...), but nothing is stored per cell.
+
+    Attributes:
+        grid (LevelGrid): Grid holding the entities of the level.
+        x (int): X position of the cell.
+        y (int): Y position of the cell.
+
+    Example:
+        level.tiles[y][x].entities['ground'] = crate
+    """
+    __slots__ = ('grid', 'x', 'y')
+
+    def __init__(self, grid, x, y):
+        """
+        Initializes the view of a cell.
+
+        Args:
+            grid (LevelGrid): Grid holding the entities of the level.
+            x (int): X position of the cell.
+            y (int): Y position of the cell.
+        """
+        self.grid = grid
+        self.x = x
+        self.y = y
+
+
+    def __getitem__(self, height):
+        """
+        Gets the entity at a height, raising KeyError for unknown heights (same as a dictionary).
+        """
+        if height not in LAYERS:
+            raise KeyError(height)
+        return self.grid.entity_at(self.x, self.y, LAYERS.index(height))
+
+
+    def __setitem__(self, height, entity):
+        """
+        Sets the entity at a height (None empties it), raising KeyError for unknown heights.
+        """
+        if height not in LAYERS:
+            raise KeyError(height)
+        if entity is None:
+            self.grid.clear(self.x, self.y, LAYERS.index(height))
+        else:
+            self.grid.place(entity, self.x, self.y, LAYERS.index(height))
+
+
+    def __contains__(self, height):
+        """
+        Checks if a height exists.
+        """
+        return height in LAYERS
+
+
+    def __iter__(self):
+        """
+        Iterates over the height names.
+        """
+        return iter(LAYERS)
+
+
+    def get(self, height, default=None):
+        """
+        Gets the entity at a height, or the default value if the height does not exist.
+
+        Args:
+            height (str): Height to read ('tile', 'ground', 'air', 'camera').
+            default (optional): Value returned for unknown heights. Default is None.
+
+        Returns:
+            Entity: The entity at that height (None if empty).
+        """
+        return self[height] if height in LAYERS else default
+
+
+    def keys(self):
+        """
+        Gets the height names.
+        """
+        return LAYERS
+
+
+    def values(self):
+        """
+        Gets the entities of every height, in height order.
+        """
+        return [self[height] for height in LAYERS]
+
+
+    def items(self):
+        """
+        Gets (height, entity) pairs, in height order.
+        """
+        return [(height, self[height]) for height in LAYERS]
+
+
+class TileView:
+    """
+    Tile of a level, derived on access from the level grid (terrain and entities) and the image matrix.
+    Has the same attributes as Tile, so levels do not have to keep a Tile object per cell (a million of them on
+    a 1000x1000 level). The terrain is read-only, it is loaded in bulk with Level.set_terrain().
+
+    Attributes:
+        grid (LevelGrid): Grid holding the terrain and the entities of the level.
+        img_mtx (list): Image matrix of the level.
+        x (int): X position of the tile in the level.
+        y (int): Y position of the tile in the level.
+        entities (CellEntities): Dict-like view of the entities on the tile at different heights.
+        image (pygame.Surface): Image representing the tile.
+        is_path (bool): Whether this tile is a path or not.
+        is_mid_wall (bool): Whether this tile is a mid-height wall or not.
+
+    Example:
+        tile = level.tiles[y][x]
+    """
+    __slots__ = ('grid', 'img_mtx', 'x', 'y')
+
+    def __init__(self, grid, img_mtx, x, y):
+        """
+        Initializes the view of a tile.
+
+        Args:
+            grid (LevelGrid): Grid holding the terrain and the entities of the level.
+            img_mtx (list): Image matrix of the level.
+            x (int): X position of the tile in the level.
+            y (int): Y position of the tile in the level.
+        """
+        self.grid = grid
+        self.img_mtx = img_mtx
+        self.x = x
+        self.y = y
+
+
+    __str__ = Tile.__str__  # Same icons as a Tile
+
+
+    @property
+    def entities(self):
+        """
+        Dict-like view of the entities on the tile.
+        """
+        return CellEntities(self.grid, self.x, self.y)
+
+
+    @property
+    def image(self):
+        """
+        Image representing the tile.
+        """
+        return self.img_mtx[self.y][self.x]
+
+
+    @property
+    def is_path(self):
+        """
+        Whether this tile is a path or not.
+        """
+        return bool(self.grid.terrain[self.y, self.x] == PATH)
+
+
+    @property
+    def is_mid_wall(self):
+        """
+        Whether this tile is a mid-height wall or not.
+        """
+        return bool(self.grid.terrain[self.y, self.x] == MID_WALL)
+
+
+class TileMatrix:
+    """
+    2D matrix of the tiles of a level (level.tiles[y][x]), creating each TileView when it is accessed.
+
+    Attributes:
+        grid (LevelGrid): Grid holding the terrain and the entities of the level.
+        img_mtx (list): Image matrix of the level.
+
+    Example:
+        tiles = TileMatrix(level.grid, level.img_mtx)
+        tile = tiles[y][x]
+    """
+    __slots__ = ('grid', 'img_mtx')
+
+    def __init__(self, grid, img_mtx):
+        """
+        Initializes the matrix.
+
+        Args:
+            grid (LevelGrid): Grid holding the terrain and the entities of the level.
+            img_mtx (list): Image matrix of the level.
+        """
+        self.grid = grid
+        self.img_mtx = img_mtx
+
+
+    def __len__(self):
+        """
+        Gets the number of rows (height of the level).
+        """
+        return self.grid.height
+
+
+    def __getitem__(self, y):
+        """
+        Gets a row of tiles, raising IndexError outside the level.
+        """
+        if not 0 <= y < self.grid.height:
+            raise IndexError(y)
+        return TileRow(self.grid, self.img_mtx, y)
+
+
+    def __iter__(self):
+        """
+        Iterates over the rows of tiles.
+        """
+        return (TileRow(self.grid, self.img_mtx, y) for y in range(self.grid.height))
+
+
+class TileRow:
+    """
+    Row of the tiles of a level (level.tiles[y]), creating each TileView when it is accessed.
+
+    Attributes:
+        grid (LevelGrid): Grid holding the terrain and the entities of the level.
+        img_mtx (list): Image matrix of the level.
+        y (int): Y position of the row in the level.
+    """
+    __slots__ = ('grid', 'img_mtx', 'y')
+
+    def __init__(self, grid, img_mtx, y):
+        """
+        Initializes the row.
+
+        Args:
+            grid (LevelGrid): Grid holding the terrain and the entities of the level.
+            img_mtx (list): Image matrix of the level.
+            y (int): Y position of the row in the level.
+        """
+        self.grid = grid
+        self.img_mtx = img_mtx
+        self.y = y
+
+
+    def __len__(self):
+        """
+        Gets the number of tiles (width of the level).
+        """
+        return self.grid.width
+
+
+    def __getitem__(self, x):
+        """
+        Gets a tile of the row, raising IndexError outside the level.
+        """
+        if not 0 <= x < self.grid.width:
+            raise IndexError(x)
+        return TileView(self.grid, self.img_mtx, x, self.y)
+
+
+    def __iter__(self):
+        """
+        Iterates over the tiles of the row.
+        """
+        return (TileView(self.grid, self.img_mtx, x, self.y) for x in range(self.grid.width))
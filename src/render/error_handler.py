@@ -4,23 +4,36 @@ This module provides a singleton class to handle error messages and display them
 It manages a queue of error messages and displays them in a panel with an icon, title, and message.
 It uses singleton to configure a global error handler instance.
 
+Repeated errors are coalesced, every error title (source) is rate limited and the queue is bounded,
+so a failing script can not flood the UI. In headless mode errors are only collected as records.
+
 Classes:
     ErrorLevel (Enum): Enum to represent the severity level of an error.
+    ErrorRecord (namedtuple): Error collected in headless mode.
     ErrorHandler: Singleton class to handle error messages and display them using pygame_gui.
 
 Objects:
     error_handler (ErrorHandler): Global instance of the ErrorHandler class.
 """
 
+import time
+import threading
 import pygame
 import pygame_gui
 import logging
+from collections import deque, namedtuple
 from enum import Enum, auto
 from typing import Optional, Tuple
 from src.render.missing_image import missing_texture_pygame
 from src.render.sound_manager import sound_manager
 
 ICON_FOLDER = "res/sprites/"
+MAX_QUEUED_ERRORS = 20  # Errors waiting to be shown, the oldest ones are dropped
+MAX_RECORDS = 1000  # Records kept in headless mode
+RATE_LIMIT_COUNT = 5  # Errors accepted per title (source) in each rate limit window
+RATE_LIMIT_WINDOW = 1.0  # Rate limit window, in seconds
+
+ErrorRecord = namedtuple("ErrorRecord", ["title", "message", "level", "count"])  # count: times it was pushed in a row
 
 
 class ErrorLevel(Enum):
@@ -50,12 +63,22 @@ class ErrorHandler:
     Attributes:
         ui_manager (pygame_gui.UIManager): The UI manager instance for rendering the error panel.
         current_panel (Optional[pygame_gui.elements.UIPanel]): The currently active error panel.
-        error_queue (list): A queue to store error messages to be displayed.
+        current_error (tuple): (title, message, level) of the error being shown.
+        error_queue (deque): A queue to store error messages to be displayed.
+        repeats (dict): (title, message, level) of every queued error -> times it was pushed.
+        rate_windows (dict): Title -> [window start, errors accepted in the window].
+        suppressed (int): Number of errors dropped by the rate limit, the queue bound or coalescing.
+        headless (bool): Whether errors are only collected in records, without any UI.
+        records (deque): Errors collected in headless mode.
+        thread_inbox (deque): Errors pushed from other threads (simulation thread), queued on the next update.
         icons (dict): A dictionary mapping error levels to their respective icons.
 
     Methods:
         set_ui_manager(manager: pygame_gui.UIManager): Set the UI manager for rendering.
+        set_headless(headless: bool): Enable or disable headless mode.
         push_error(title: str, message: str, level=ErrorLevel.ERROR): Queue an error with title, message, and severity level.
+        _rate_limited(title: str): Check the rate limit of an error title.
+        _record(title: str, message: str, level: ErrorLevel): Collect an error in headless mode.
         _process_queue(): Process the error queue and display the next error if no current panel is active.
         _show_error(title: str, message: str, level: ErrorLevel): Create the error panel with icon, title, and message.
         dismiss_current(): Manually dismiss the current error.
@@ -77,7 +100,14 @@ class ErrorHandler:
             cls._instance = super().__new__(cls)
             cls._instance.ui_manager = None
             cls._instance.current_panel = None
-            cls._instance.error_queue = []
+            cls._instance.current_error = None
+            cls._instance.error_queue = deque()
+            cls._instance.repeats = {}
+            cls._instance.rate_windows = {}
+            cls._instance.suppressed = 0
+            cls._instance.headless = False
+            cls._instance.records = deque(maxlen=MAX_RECORDS)
+            cls._instance.thread_inbox = deque()
 
             cls._instance.icons = {
                 ErrorLevel.INFO: None,
@@ -121,19 +151,86 @@ class ErrorHandler:
         self.ui_manager = manager
 
 
+    def set_headless(self, headless):
+        """
+        Enable or disable headless mode. In headless mode errors are only collected in records (for batch runs and tools).
+
+        Args:
+            headless (bool): Whether to run headless.
+        """
+        self.headless = headless
+
+
     def push_error(self, title, message, level=ErrorLevel.ERROR):
         """
         Queue an error with title, message, and severity level.
+        An error equal to one already queued or shown is coalesced into it, and errors over the rate limit of their title are dropped.
         
         Args:
             title (str): Title of the error message.
             message (str): Message content.
             level (ErrorLevel): Severity level of the error. Defaults to ErrorLevel.ERROR.
         """
-        self.error_queue.append((title, message, level))
+        if self.headless:
+            self._record(title, message, level)
+            return
+        if threading.current_thread() is not threading.main_thread():  # pygame_gui is only used from the main thread
+            self.thread_inbox.append((title, message, level))
+            return
+
+        error = (title, message, level)
+        if error in self.repeats:  # Already waiting, count it instead
+            self.repeats[error] += 1
+            return
+        if error == self.current_error or self._rate_limited(title):
+            self.suppressed += 1
+            logging.debug(f"Error suppressed: {title}")
+            return
+
+        if len(self.error_queue) >= MAX_QUEUED_ERRORS:  # Drop the oldest error
+            del self.repeats[self.error_queue.popleft()]
+            self.suppressed += 1
+        self.error_queue.append(error)
+        self.repeats[error] = 1
         self._process_queue()
 
 
+    def _rate_limited(self, title):
+        """
+        Check the rate limit of an error title, counting this error if it is accepted.
+
+        Args:
+            title (str): Title of the error message (its source).
+
+        Returns:
+            bool: True if the error must be dropped.
+        """
+        now = time.monotonic()
+        window = self.rate_windows.get(title)
+        if window is None or now - window[0] >= RATE_LIMIT_WINDOW:
+            self.rate_windows[title] = [now, 1]
+            return False
+        if window[1] >= RATE_LIMIT_COUNT:
+            return True
+        window[1] += 1
+        return False
+
+
+    def _record(self, title, message, level):
+        """
+        Collect an error in headless mode, coalescing it with the last record if it is the same error.
+
+        Args:
+            title (str): Title of the error message.
+            message (str): Message content.
+            level (ErrorLevel): Severity level of the error.
+        """
+        if self.records and self.records[-1][:3] == (title, message, level):
+            self.records[-1] = self.records[-1]._replace(count=self.records[-1].count + 1)
+        else:
+            self.records.append(ErrorRecord(title, message, level, 1))
+
+
     def _process_queue(self):
         """
         Process the error queue and display the next error if no current panel is active.
@@ -141,7 +238,10 @@ class ErrorHandler:
         If there are errors in the queue, it will display the next error panel.
         """
         if not self.current_panel and self.error_queue and self.ui_manager:
-            title, message, level = self.error_queue.pop(0)
+            title, message, level = self.current_error = self.error_queue.popleft()
+            count = self.repeats.pop(self.current_error)
+            if count > 1:
+                title = f"{title} (x{count})"
             self._show_error(title, message, level)
             match level:
                 case ErrorLevel.INFO:
@@ -263,6 +363,7 @@ class ErrorHandler:
         if self.current_panel:
             self.current_panel.kill()
             self.current_panel = None
+        self.current_error = None
         self._process_queue()
 
 
@@ -270,9 +371,9 @@ class ErrorHandler:
         """
         Manually dismiss all errors
         """
-        while self.current_panel:
-            self.dismiss_current()
-        self.error_queue.clear()
+        self.error_queue.clear()  # Clear first, so the queued errors are not shown one by one
+        self.repeats.clear()
+        self.dismiss_current()
 
 
     def update(self, time_delta, events):
@@ -283,6 +384,9 @@ class ErrorHandler:
             time_delta (float): Time since the last update.
             events (list): List of pygame events to process.
         """
+        while self.thread_inbox:
+            self.push_error(*self.thread_inbox.popleft())
+
         if self.current_panel:
             # Auto dismiss logic
             if any(id.endswith("_info") or id.endswith("_warning") for id in self.current_panel.object_ids):
@@ -0,0 +1,95 @@
+"""
+Frame timer module.
+Measures the time spent in each phase of the frame pipeline (events, simulation, UI update, render, present)
+and logs the averages periodically.
+
+Classes:
+    FrameTimer: Accumulates the time of each frame phase and reports the averages.
+"""
+
+import time
+import logging
+
+FRAME_PHASES = ("events", "simulation", "ui_update", "render", "present")  # In pipeline order
+REPORT_INTERVAL = 10.0  # Seconds between timing reports
+
+
+class FrameTimer:
+    """
+    Accumulates the time of each frame phase and logs the average per frame every report interval.
+
+    Attributes:
+        phases (tuple): Names of the phases, in pipeline order.
+        totals (dict): Phase name -> accumulated seconds since the last report.
+        frames (int): Frames since the last report.
+        report_interval (float): Seconds between reports.
+
+    Methods:
+        start_frame(): Starts timing a new frame.
+        mark(phase): Adds the time since the previous mark to a phase.
+        end_frame(): Ends the frame, logging the averages if the report interval passed.
+        averages(): Gets the average milliseconds per frame of each phase.
+
+    Example:
+        timer = FrameTimer()
+        timer.start_frame()
+        timer.mark("events")
+        timer.end_frame()
+    """
+    def __init__(self, phases=FRAME_PHASES, report_interval=REPORT_INTERVAL):
+        """
+        Initializes the timer.
+
+        Args:
+            phases (tuple, optional): Names of the phases, in pipeline order. Default is FRAME_PHASES.
+            report_interval (float, optional): Seconds between reports. Default is REPORT_INTERVAL.
+        """
+        self.phases = phases
+        self.totals = dict.fromkeys(phases, 0.0)
+        self.frames = 0
+        self.report_interval = report_interval
+        self._last_mark = time.perf_counter()
+        self._last_report = self._last_mark
+
+
+    def start_frame(self):
+        """
+        Starts timing a new frame (time before this call, such as waiting for the frame rate, is not counted).
+        """
+        self._last_mark = time.perf_counter()
+
+
+    def mark(self, phase):
+        """
+        Adds the time since the previous mark (or the start of the frame) to a phase.
+
+        Args:
+            phase (str): Name of the phase that just finished.
+        """
+        now = time.perf_counter()
+        self.totals[phase] += now - self._last_mark
+        self._last_mark = now
+
+
+    def end_frame(self):
+        """
+        Ends the frame, logging the averages and starting a new report if the report interval passed.
+        """
+        self.frames += 1
+        if self._last_mark - self._last_report >= self.report_interval:
+            timings = ", ".join(f"{phase} {ms:.2f}" for phase, ms in self.averages().items())
+            logging.debug(f"Frame timings (ms/frame over {self.frames} frames): {timings}")
+            self.totals = dict.fromkeys(self.phases, 0.0)
+            self.frames = 0
+            self._last_report = self._last_mark
+
+
+    def averages(self):
+        """
+        Gets the average milliseconds per frame of each phase since the last report.
+
+        Returns:
+            dict: Phase name -> average milliseconds per frame.
+        """
+        frames = max(self.frames, 1)
+        return {phase: total * 1000 / frames for phase, total in self.totals.items()}
@@ -13,16 +13,72 @@ import logging
 import os
 import json
 import time
+import numpy as np
 from src.render.missing_image import missing_texture_pygame
-from src.render.render_sprite import load_sprite
+from src.render.render_sprite import sprite_cache
+from src.render.sprite_atlas import load_atlas
+from src.render.terrain_layer import TerrainLayer
+from src.render.invalidation import invalidation
 from src.render.error_handler import error_handler, ErrorLevel
 from src.render.sound_manager import sound_manager
+from src.level.level_pack import get_packed_dialogue
+from src.storage.score_store import score_store
+from src.storage.settings import settings
 
-PLAYER_FOLDER = "data/player"
-OPTIONS_FILE = "data/options.json"
 SPRITE_FOLDER = "res/sprites"
+MISSING_SPRITE_COLORS = ('#FF0000FF', '#1AFF00FF', '#00EEFFFF', '#FFFFFFFF')  # Fallback colors for each layer
 HELP_FILE = "data/language_help.html"
 
+_content_cache = {}  # Path -> (modification time, loaded content), shared by every game screen
+_help_panels = {}  # UI manager -> (window size, panel, text box, close button) of the language help, shared by every game screen
+
+
+def load_cached(path, loader):
+    """
+    Load a file through a loader function, reusing the content loaded by any game screen while the file is unchanged.
+
+    Args:
+        path (str): Path of the file.
+        loader (function): Function loading the content from the path.
+
+    Returns:
+        object: The loaded content, or None if the file does not exist.
+    """
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _content_cache.get(path)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+    content = loader(path)
+    _content_cache[path] = (modified, content)
+    return content
+
+
+def _read_text(path):
+    """
+    Read a text file (help HTML).
+    """
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def _read_json(path):
+    """
+    Read a JSON file (level dialogue).
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _load_image(path):
+    """
+    Load an image with per-pixel alpha (instructor image).
+    """
+    return pygame.image.load(path).convert_alpha()
+
+
 class GameScreen:
     """
     The main game screen where the player can interact with the level, edit scripts, and control robots.
@@ -45,16 +101,25 @@ class GameScreen:
         showing_help (bool): Whether the language help popup is currently displayed.
         dialogue_typing_active (bool): Whether the dialogue is currently being typed out.
         dialogue_typing_sound_timer (float): Timer for the typing sound effect.
-        instructor_image_surface (pygame.Surface): The surface for the instructor image.
+        score_popup (pygame_gui.elements.UIPanel): Score submission popup, built on first use (None until then).
+        dialogue_panel (pygame_gui.elements.UIPanel): Instructions dialogue panel, built on first use (None until then).
+        language_help_panel (pygame_gui.elements.UIPanel): Language help panel, built on first use (None until then).
+        root (pygame_gui.core.UIContainer): Container of every UI element of the scene.
         explanation_messages (dict): The messages for the level instructions.
         current_message_index (int): The index of the current message in the dialogue sequence.
         tiles_x (int): The number of tiles that fit horizontally in the viewport.
         tiles_y (int): The number of tiles that fit vertically in the viewport.
         tile_size (int): The size of each tile in pixels.
+        terrain_layer (TerrainLayer): Pre-rendered terrain of the current level.
+        sprite_atlas (SpriteAtlas): Atlas of the level sprites at the current tile size.
+        drawn_state_version (int): GameManager state version the objectives were last refreshed and redrawn for.
 
     Methods:
         __init__(screen, manager, change_scene, game_manager, level_name, level_folder): Initializes the game screen with the given parameters.
-        create_ui(): Creates the UI elements for the game screen.
+        create_ui(): Creates the sidebar of the game screen (the overlays are built on first use).
+        create_score_popup(): Creates the score submission popup.
+        create_dialogue_panel(): Creates the instructions dialogue panel.
+        create_language_help_panel(help_content): Creates the language help panel.
         get_player_name(): Retrieves the player's name from the options file.
         handle_events(event): Handles user input events such as button presses and key presses.
         show_language_help(): Displays a popup with language reference help.
@@ -63,11 +128,14 @@ class GameScreen:
         hide_instructions(): Hides the instruction dialogue.
         update_code_input(): Updates the code input field with the current script for the selected robot.
         update(time_delta): Updates the game state and UI based on the time delta since the last frame.
+        get_grid_position(): Gets the screen position of the level viewport.
         render(): Renders the game screen and UI elements.
         update_objectives(): Updates the objective list based on the current level's objectives.
         show_score_popup(score): Displays a popup with the score submission interface after completing a level.
         hide_score_popup(): Hides the score submission popup.
         save_score_to_leaderboard(score): Saves the player's score to the leaderboard for this level.
+        _sprite_name(entity): Gets the sprite file name of an entity based on its state.
+        _entity_sprite(entity, height): Gets the surface and area to draw an entity with.
         render_level(grid_x, grid_y): Renders the game level tiles and entities within the viewport.
 
     Example:
@@ -102,6 +170,9 @@ class GameScreen:
         self.showing_help = False
         self.dialogue_typing_active = False
         self.dialogue_typing_sound_timer = 0.0
+        self.terrain_layer = None  # Pre-rendered terrain, built on the first render
+        self.sprite_atlas = None  # Atlas of the level sprites, loaded on the first render
+        self.drawn_state_version = None  # Level state version the objectives were last refreshed for
 
         try:
             self.language_help_icon_surface = pygame.image.load(os.path.join(SPRITE_FOLDER, "lang_help.png")).convert_alpha()
@@ -109,12 +180,6 @@ class GameScreen:
             logging.error("Icon not found. Using fallback texture")
             self.language_help_icon_surface = missing_texture_pygame(size_x=16, size_y=16)
 
-        try:
-            self.instructor_image_surface = pygame.image.load(os.path.join(SPRITE_FOLDER, "instructor.png")).convert_alpha()
-        except:
-            logging.error("Instructor image not found. Using fallback texture")
-            self.instructor_image_surface = missing_texture_pygame(size_x=128, size_y=128)
-
         if not self.game_manager.current_level:  # Fallback in case level_select transitions without loading the level
             logging.warning(f"Preload failed for level '{level_name}'. Attempting to load it now.")
             self.game_manager.load_level(level_name)
@@ -133,25 +198,26 @@ class GameScreen:
 
     def create_ui(self):
         """
-        Creates the UI elements for the game screen.
-        Initializes the layout based on the screen size.
+        Creates the sidebar UI elements for the game screen.
+        Initializes the layout based on the screen size. The overlays (score popup, dialogue, language help)
+        are only built when they are first shown.
         """
         self.dialogue_typing_active = False
         self.dialogue_typing_sound_timer = 0.0
+        self.drawn_state_version = None  # Fill the new objective list and redraw on the next update
 
         width, height = self.screen.get_size()
         sidebar_width = int(width * 0.35)
-        popup_width = min(500, width - 100)
-        popup_height = min(300, height - 100)
-        panel_width = min(650, width - 100)
-        panel_height = min(350, height - 100)
-        lang_panel_width = min(800, width - 100)
-        lang_panel_height = min(600, height - 100)
+        self.root = pygame_gui.core.UIContainer(
+            relative_rect=pygame.Rect((0, 0), (width, height)),
+            manager=self.manager
+        )
 
         # ============= UI Panel (Left Side Menu) =============
         self.ui_panel = pygame_gui.elements.UIPanel(
             relative_rect=pygame.Rect((0, 0), (sidebar_width, height)),
             manager=self.manager,
+            container=self.root,
             object_id="sidebar_panel"
         )
 
@@ -230,6 +296,30 @@ class GameScreen:
         self.language_help_button.disabled_image = scaled_icon
         self.language_help_button.rebuild()  # Rebuild the button to apply the new image
 
+        # Overlays, built on first use
+        self.score_popup = None
+        self.dialogue_panel = None
+        self.language_help_panel = None
+        self.submit_button = None
+        self.close_help_button = None
+        self.next_button = None
+        self.skip_button = None
+        self.dialogue_text = None
+
+        self.calculate_viewport()  # Calculate the viewport size (Radious of tiles rendered)
+        self.game_manager.current_level.get_camera_position()
+        self.game_manager.update_selected_robot()
+        self.update_code_input()
+
+
+    def create_score_popup(self):
+        """
+        Creates the score submission popup, centered on the screen (visible if the score overlay is).
+        """
+        width, height = self.screen.get_size()
+        popup_width = min(500, width - 100)
+        popup_height = min(300, height - 100)
+
         # ============= Popup panel =============
         self.score_popup = pygame_gui.elements.UIPanel(
             relative_rect=pygame.Rect(
@@ -237,6 +327,7 @@ class GameScreen:
                 (popup_width, popup_height)
             ),
             manager=self.manager,
+            container=self.root,
             visible=self.score_overlay_visible,
             object_id="score_popup",
             starting_height=9999,  # Always on top
@@ -297,6 +388,20 @@ class GameScreen:
             object_id="good_button"
         )
 
+
+    def create_dialogue_panel(self):
+        """
+        Creates the instructions dialogue panel (hidden), centered on the screen.
+        """
+        width, height = self.screen.get_size()
+        panel_width = min(650, width - 100)
+        panel_height = min(350, height - 100)
+
+        instructor_image_surface = load_cached(os.path.join(SPRITE_FOLDER, "instructor.png"), _load_image)
+        if instructor_image_surface is None:
+            logging.error("Instructor image not found. Using fallback texture")
+            instructor_image_surface = missing_texture_pygame(size_x=128, size_y=128)
+
         # ============= Level help panel =============
         self.dialogue_panel = pygame_gui.elements.UIPanel(
             relative_rect=pygame.Rect(
@@ -304,6 +409,7 @@ class GameScreen:
                 (panel_width, panel_height)
             ),
             manager=self.manager,
+            container=self.root,
             visible=False,
             object_id="dialogue_panel",
             starting_height=9999
@@ -312,7 +418,7 @@ class GameScreen:
         # Instructor image area (left side)
         self.instructor_image = pygame_gui.elements.UIImage(
             relative_rect=pygame.Rect(20, 20, 128, 128),
-            image_surface=self.instructor_image_surface,
+            image_surface=instructor_image_surface,
             manager=self.manager,
             container=self.dialogue_panel,
             visible=False
@@ -358,6 +464,26 @@ class GameScreen:
             visible=False
         )
 
+
+    def create_language_help_panel(self, help_content):
+        """
+        Creates the language help panel (hidden), centered on the screen.
+        The panel is not part of the scene: it is kept (hidden) for the next game screens while the window size does not
+        change, so the help HTML is only parsed and laid out again when the window is resized or the file changes.
+
+        Args:
+            help_content (str): HTML content of the help text box.
+        """
+        width, height = self.screen.get_size()
+        shared = _help_panels.get(self.manager)
+        if shared is not None:
+            if shared[0] == (width, height):  # Same layout, reuse the parsed text box
+                _, self.language_help_panel, self.language_help_text, self.close_help_button = shared
+                return
+            shared[1].kill()
+        lang_panel_width = min(800, width - 100)
+        lang_panel_height = min(600, height - 100)
+
         # ============ Language help panel =============
         self.language_help_panel = pygame_gui.elements.UIPanel(
             relative_rect=pygame.Rect(
@@ -373,7 +499,7 @@ class GameScreen:
         # Text box for HTML content
         self.language_help_text = pygame_gui.elements.UITextBox(
             relative_rect=pygame.Rect(20, 20, lang_panel_width - 55, lang_panel_height - 80),
-            html_text="Loading help...",
+            html_text=help_content,
             manager=self.manager,
             container=self.language_help_panel,
             object_id="help_textbox",
@@ -389,11 +515,7 @@ class GameScreen:
             object_id="neutral_button",
             visible=False
         )
-
-        self.calculate_viewport()  # Calculate the viewport size (Radious of tiles rendered)
-        self.game_manager.current_level.get_camera_position()
-        self.game_manager.update_selected_robot()
-        self.update_code_input()
+        _help_panels[self.manager] = ((width, height), self.language_help_panel, self.language_help_text, self.close_help_button)
 
 
     def calculate_viewport(self):
@@ -423,21 +545,9 @@ class GameScreen:
         Get the player's name from the options file.
 
         Returns:
-            str: The player's name, or "Anonymous" if not found or invalid.
+            str: The player's name ("Anonymous" if the options file has none).
         """
-        try:
-            with open(OPTIONS_FILE, 'r') as f:
-                data = json.load(f)
-                player_name = data["last_player"]
-                if not player_name or not isinstance(player_name, str):
-                    raise ValueError("Invalid player name in options file.")
-                return player_name
-        except (FileNotFoundError, json.JSONDecodeError):
-            logging.warning("Options file not found or corrupted. Using default name.")
-            return "Anonymous"
-        except Exception as e:
-            logging.error(f"Unexpected error reading options file: {e}")
-            return "Anonymous"
+        return settings.get("last_player")  # Served from memory, validated when the options file is loaded
 
 
     def handle_events(self, event):
@@ -454,7 +564,7 @@ class GameScreen:
             case pygame.QUIT:
                 self.game_manager.save_script(self.code_input.get_text(), self.player_name)
             case pygame_gui.UI_TEXT_EFFECT_FINISHED:
-                 if event.ui_element == self.dialogue_text:
+                 if self.dialogue_text is not None and event.ui_element == self.dialogue_text:
                     self.dialogue_typing_active = False
                     self.dialogue_typing_sound_timer = 0.0
             case pygame_gui.UI_BUTTON_PRESSED:
@@ -529,7 +639,7 @@ class GameScreen:
                             case pygame.K_RIGHT | pygame.K_d:
                                 self.game_manager.move_camera("right")
                             case pygame.K_F1:
-                                if (not self.language_help_panel.visible 
+                                if ((self.language_help_panel is None or not self.language_help_panel.visible)
                                     and not self.showing_help 
                                     and not self.game_manager.is_running 
                                     and not self.score_overlay_visible):
@@ -562,15 +672,16 @@ class GameScreen:
         """
         Show language reference help in a popup window.
         """
-        # Load help content from file
-        try:
-            with open(HELP_FILE, 'r') as f:
-                help_content = f.read()
-            self.language_help_text.set_text(help_content)
-        except FileNotFoundError:
-            fallback_text = "The help file \"data/language_help.html\" is missing."
-            self.language_help_text.set_text(fallback_text)
+        # Load help content from file (shared by every game screen while the file is unchanged)
+        help_content = load_cached(HELP_FILE, _read_text)
+        if help_content is None:
+            help_content = "The help file \"data/language_help.html\" is missing."
             logging.warning("Help file not found")
+
+        if self.language_help_panel is None:
+            self.create_language_help_panel(help_content)
+        if self.language_help_text.html_text != help_content:  # Only parse the HTML again if the file changed
+            self.language_help_text.set_text(help_content)
         
         # Show the panel
         self.language_help_panel.show()
@@ -593,14 +704,18 @@ class GameScreen:
         """
         try:
             sound_manager.play("dialogue")
-            explanation_file = os.path.join("data", "level", self.level_name, "dialogue.json")
-            if not os.path.exists(explanation_file):
+            explanation_messages = get_packed_dialogue(self.level_name)
+            if explanation_messages is None:  # Not packed, read the dialogue file
+                explanation_file = os.path.join("data", "level", self.level_name, "dialogue.json")
+                explanation_messages = load_cached(explanation_file, _read_json)
+            if explanation_messages is None:
                 self.help_available = False
                 self.instructions_button.disable()
                 return
-                
-            with open(explanation_file, 'r') as f:
-                self.explanation_messages = json.load(f)
+            self.explanation_messages = explanation_messages
+
+            if self.dialogue_panel is None:
+                self.create_dialogue_panel()
                 
             # Show the UI elements
             self.dialogue_panel.show()
@@ -654,6 +769,8 @@ class GameScreen:
         """
         Hide the instruction dialogue.
         """
+        if self.dialogue_panel is None:
+            return
         self.dialogue_panel.hide()
         self.instructor_image.hide()
         self.dialogue_text.hide()
@@ -692,12 +809,24 @@ class GameScreen:
             time_delta (float): The time in seconds since the last update.
         """
         if self.dialogue_typing_active:
+            invalidation.invalidate()  # The dialogue text is being typed out
             self.dialogue_typing_sound_timer += time_delta
             if self.dialogue_typing_sound_timer >= 0.1:  # every 200ms
                 sound_manager.play("talk")
                 self.dialogue_typing_sound_timer = 0.0
 
-        self.manager.update(time_delta)
+        # Refresh the objectives and redraw the viewport and the sidebar when the level state changed
+        if self.drawn_state_version != self.game_manager.state_version:
+            self.drawn_state_version = self.game_manager.state_version
+            self.update_objectives()
+            grid_x, grid_y = self.get_grid_position()
+            border_thickness = 3
+            invalidation.invalidate(pygame.Rect(
+                grid_x - border_thickness, grid_y - border_thickness,
+                self.tiles_x * self.tile_size + 2 * border_thickness, self.tiles_y * self.tile_size + 2 * border_thickness
+            ))
+            invalidation.invalidate(self.ui_panel.get_relative_rect())
+
         # Update the code ui
         if self.game_manager.needs_ui_update:
             self.update_code_input()
@@ -709,6 +838,7 @@ class GameScreen:
 
             score = self.game_manager.calculate_score()
             self.show_score_popup(score)
+            invalidation.invalidate()
             sound_manager.play("finish_level")
             self.game_manager.is_running = False  # Stop the game
 
@@ -717,7 +847,7 @@ class GameScreen:
             self.language_help_button.disable()
             self.play_button.disable()
             self.instructions_button.disable()
-        elif self.language_help_panel.visible:  # Language help is active
+        elif self.language_help_panel is not None and self.language_help_panel.visible:  # Language help is active
             self.play_button.disable()
             self.reset_button.disable()
             self.instructions_button.disable()
@@ -730,25 +860,32 @@ class GameScreen:
                 self.instructions_button.disable()
         
 
+    def get_grid_position(self):
+        """
+        Get the screen position of the level viewport (the grid), centered in the space right of the sidebar.
+
+        Returns:
+            tuple: (x, y) of the top-left corner of the grid.
+        """
+        sidebar_width = self.ui_panel.get_relative_rect().width
+        grid_x = sidebar_width + ((self.screen.get_width() - sidebar_width - self.tiles_x * self.tile_size) // 2)
+        grid_y = (self.screen.get_height() - self.tiles_y * self.tile_size) // 2
+        return grid_x, grid_y
+
+
     def render(self):
         """
-        Render the game screen.
+        Render the level viewport. The main loop clears the screen before and draws the UI after.
         """
         if not self.game_manager.current_level:
             self.change_scene("level_select")
             logging.error("No level loaded, returning to level select")
             return
 
-        self.screen.fill((0, 0, 0))
-        self.update_objectives()
-
         # Get the grid boundaries
-        sidebar_width = self.ui_panel.get_relative_rect().width
         grid_width = self.tiles_x * self.tile_size
         grid_height = self.tiles_y * self.tile_size
-
-        grid_x = sidebar_width + ((self.screen.get_width() - sidebar_width - grid_width) // 2)
-        grid_y = (self.screen.get_height() - grid_height) // 2
+        grid_x, grid_y = self.get_grid_position()
 
         # Draw a border around the grid
         border_color = (255, 255, 255)  # White border
@@ -756,7 +893,6 @@ class GameScreen:
         pygame.draw.rect(self.screen, border_color, (grid_x - border_thickness, grid_y - border_thickness, grid_width + 2 * border_thickness, grid_height + 2 * border_thickness), border_thickness)
 
         self.render_level(grid_x, grid_y)  # Pass adjusted position
-        self.manager.draw_ui(self.screen)
 
 
     def update_objectives(self):
@@ -830,6 +966,8 @@ class GameScreen:
         error_handler.dismiss_all()  # Close all error popups
         self.score_overlay_visible = True
         self.last_score = score
+        if self.score_popup is None:
+            self.create_score_popup()
         self.score_popup.show()
         self.score_title.show()
         self.score_title_under.show()
@@ -858,6 +996,8 @@ class GameScreen:
         Hide the score popup.
         """
         self.score_overlay_visible = False
+        if self.score_popup is None:
+            return
         self.score_popup.hide()
         self.score_title.hide()
         self.score_title_under.hide()
@@ -873,203 +1013,177 @@ class GameScreen:
 
     def save_score_to_leaderboard(self, score):
         """
-        Save score to the level's leaderboard with robust error handling.
+        Save score to the level's leaderboard and update the player's highest level, in the score store
+        (written in the background, see score_store).
 
         Args:
             score (int): The score to save.
         """
-        leaderboard_file = os.path.join("data", "level", self.level_name, "leaderboard.json")
-        leaderboard_dir = os.path.dirname(leaderboard_file)
-        
-        try:
-            # Ensure directory exists
-            os.makedirs(leaderboard_dir, exist_ok=True)
-            
-            # Initialize empty leaderboard
-            leaderboard = []
-            
-            # Try to load existing leaderboard if file exists
-            if os.path.exists(leaderboard_file):
-                try:
-                    with open(leaderboard_file, 'r') as f:
-                        file_content = f.read().strip()
-                        if file_content:  # Only parse if file isn't empty
-                            leaderboard = json.loads(file_content)
-                            # Validate it's a list
-                            if not isinstance(leaderboard, list):
-                                logging.warning("Leaderboard file corrupted - not a list, resetting")
-                                leaderboard = []
-                except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                    logging.warning(f"Leaderboard file corrupted - resetting (error: {e})")
-                    leaderboard = []
-                except Exception as e:
-                    logging.error(f"Unexpected error reading leaderboard: {e}")
-                    leaderboard = []
-
-            percentage_collectables = int(self.game_manager.completed_objectives["collectables"] / self.game_manager.current_level.objectives["collectables"] * 100 if self.game_manager.current_level.objectives["collectables"] > 0 else 0)
-            
-            # Add new entry with timestamp
-            leaderboard.append({
-                "name": self.player_name,
-                "score": score,
-                "steps_taken": self.game_manager.steps_taken,
-                "collectables": percentage_collectables,
-                "timestamp": int(time.time())  # Using Unix timestamp
-            })
-            
-            # Sort by score (ascending - lower is better) then by timestamp (older first)
-            leaderboard.sort(key=lambda x: (x["score"], x["timestamp"]))
+        percentage_collectables = int(self.game_manager.completed_objectives["collectables"] / self.game_manager.current_level.objectives["collectables"] * 100 if self.game_manager.current_level.objectives["collectables"] > 0 else 0)
+
+        # New entry with timestamp
+        entry = {
+            "name": self.player_name,
+            "score": score,
+            "steps_taken": self.game_manager.steps_taken,
+            "collectables": percentage_collectables,
+            "timestamp": int(time.time())  # Using Unix timestamp
+        }
+        score_store.submit_score(self.level_name, entry, int(self.level_number))
+
             
-            # Save back with atomic write pattern
-            temp_file = leaderboard_file + ".tmp"
-            try:
-                with open(temp_file, 'w') as f:
-                    json.dump(leaderboard, f, indent=4)
-                
-                if os.path.exists(leaderboard_file):
-                    os.replace(temp_file, leaderboard_file)
+    def _sprite_name(self, entity):
+        """
+        Get the sprite file name of an entity, based on its type and state.
+
+        Args:
+            entity (Entity): Entity to draw.
+
+        Returns:
+            str: Name of the sprite file.
+        """
+        entity_name = entity.__class__.__name__.lower()
+        match entity_name:
+            case "crate":
+                if entity.small:
+                    sprite_name = f"{entity_name}_small.png"
                 else:
-                    os.rename(temp_file, leaderboard_file)
-                    
-            except Exception as e:
-                logging.error(f"Failed to write leaderboard file: {e}")
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-
-            # Update the player highest level on it's file
-            player_file = os.path.join(PLAYER_FOLDER, f"{self.player_name}.json")
-            try:
-                if os.path.exists(player_file):
-                    with open(player_file, 'r') as f:
-                        player_data = json.load(f)
-                    player_data["highest_level"] = max(player_data.get("highest_level", 0), int(self.level_number))
+                    sprite_name = f"{entity_name}.png"
+            case "crategen":
+                if entity.crate_type == "small":
+                    sprite_name = f"{entity_name}_small"
+                else:
+                    sprite_name = f"{entity_name}"
+                if entity.crate_count <= 0:
+                    sprite_name += "_empty.png"
+                else:
+                    if entity.active:
+                        sprite_name += "_on.png"
+                    else:
+                        sprite_name += ".png"
+            case "cratedel":
+                if entity.active:
+                    sprite_name = f"{entity_name}_on.png"
                 else:
-                    player_data = {"highest_level": int(level_number)}
+                    sprite_name = f"{entity_name}.png"
+            case "trap":
+                if entity.active:
+                    sprite_name = f"{entity_name}_on.png"
+                else:
+                    sprite_name = f"{entity_name}.png"
+            case "red":
+                if entity.crate == None:
+                    sprite_name = f"{entity_name}.png"
+                elif entity.crate.small == "small":
+                    sprite_name = f"{entity_name}_small.png"
+                else:
+                    sprite_name = f"{entity_name}_big.png"
+            case "green":
+                if entity.crate == None:
+                    sprite_name = f"{entity_name}.png"
+                else:
+                    sprite_name = f"{entity_name}_small.png"
+            case "inputter":
+                if not entity.activated:
+                    match entity.operation:
+                        case "+":
+                            sprite_name = f"{entity_name}_add.png"
+                        case "-":
+                            sprite_name = f"{entity_name}_sub.png"
+                        case "*":
+                            sprite_name = f"{entity_name}_mul.png"
+                        case "/":
+                            sprite_name = f"{entity_name}_div.png"
+                else:
+                    sprite_name = f"{entity_name}_done.png"
+            case "collectable":
+                if entity.height == 1:
+                    sprite_name = f"{entity_name}.png"
+                else:
+                    sprite_name = f"{entity_name}_air.png"
+            case _:
+                sprite_name = f"{entity.__class__.__name__.lower()}.png"
+        return sprite_name
 
-                with open(player_file, 'w') as f:
-                    json.dump(player_data, f, indent=4)
-            except Exception as e:
-                logging.error(f"Failed to update player file: {e}")
-                
-        except Exception as e:
-            logging.error(f"Critical error saving leaderboard: {e}")
-            try:
-                with open(leaderboard_file, 'w') as f:
-                    json.dump([], f)
-            except Exception as e2:
-                logging.critical(f"Failed to create empty leaderboard file: {e2}")
 
-            
     def render_level(self, grid_x, grid_y):
         """
         Render the current level tiles and entities within the viewport.
+        The terrain comes from the pre-rendered chunks of the terrain layer, and the entities from the sprite atlas.
+        When the simulation runs on its own thread, the entities are read from the latest published snapshot.
 
         Args:
             grid_x (int): The x-coordinate of the grid's top-left corner.
             grid_y (int): The y-coordinate of the grid's top-left corner.
         """      
-        camera_x, camera_y = self.game_manager.current_level.get_camera_position()
+        # Latest snapshot if the simulation runs on its thread, the live level otherwise
+        level = self.game_manager.current_level
+        snapshot = self.game_manager.snapshot
+        if snapshot is not None and snapshot.level is level:
+            occupancy, entities, (camera_x, camera_y) = snapshot.occupancy, snapshot.entities, snapshot.camera
+        else:
+            occupancy, entities = level.grid.occupancy, level.grid.entities
+            camera_x, camera_y = level.get_camera_position()
 
         half_x = self.tiles_x // 2  # tiles_x is the number of tiles that fit in the viewport's x-axis
         half_y = self.tiles_y // 2  # tiles_y is the number of tiles that fit in the viewport's y-axis
+        first_x = camera_x - half_x  # Level coordinates of the top-left tile of the viewport
+        first_y = camera_y - half_y
+        view_x = 2 * half_x + 1
+        view_y = 2 * half_y + 1
+
+        # Void tiles (out of the level)
+        if first_x < 0 or first_y < 0 or first_x + view_x > level.width or first_y + view_y > level.height:
+            self.screen.fill((0, 0, 0), (grid_x, grid_y, view_x * self.tile_size, view_y * self.tile_size))
+
+        # Sprite atlas, loaded once per tile size
+        if self.sprite_atlas is None or self.sprite_atlas.tile_size != self.tile_size:
+            self.sprite_atlas = load_atlas(self.tile_size)
+
+        # Terrain and static tile entities, pre-rendered once per level and tile size
+        if self.terrain_layer is None or self.terrain_layer.level is not level or self.terrain_layer.tile_size != self.tile_size:
+            self.terrain_layer = TerrainLayer(level, self.tile_size, entity_sprite=lambda entity: self._entity_sprite(entity, 0))
+        self.terrain_layer.draw(self.screen, first_x, first_y, view_x, view_y, grid_x, grid_y)
+
+        # Entities in view, layer by layer (tile, ground, air, camera), each layer drawn with a single blits call
+        start_x = max(first_x, 0)
+        start_y = max(first_y, 0)
+        in_view = occupancy[:, start_y:first_y + view_y, start_x:first_x + view_x]
+        static_in_view = self.terrain_layer.static_mask[start_y:first_y + view_y, start_x:first_x + view_x]
+
+        for height in range(len(MISSING_SPRITE_COLORS)):
+            layer = in_view[height] if height else np.where(static_in_view, 0, in_view[height])  # Static ones are in the terrain
+            ys, xs = np.nonzero(layer)
+            blit_sequence = []
+            for y, x in zip(ys.tolist(), xs.tolist()):
+                sprite, region = self._entity_sprite(entities[layer[y, x]], height)
+                screen_x = grid_x + (start_x + x - first_x) * self.tile_size
+                screen_y = grid_y + (start_y + y - first_y) * self.tile_size
+                blit_sequence.append((sprite, (screen_x, screen_y), region) if region is not None else (sprite, (screen_x, screen_y)))
+            if blit_sequence:
+                self.screen.blits(blit_sequence, doreturn=False)
+
+
+    def _entity_sprite(self, entity, height):
+        """
+        Get the sprite to draw an entity with, from the sprite atlas or, for recolored terminals and sprites missing
+        from the atlas, from the sprite cache.
 
-        for y in range(-half_y, half_y + 1):
-            for x in range(-half_x, half_x + 1):
-                tile_x = camera_x + x
-                tile_y = camera_y + y
-
-                screen_x = grid_x + (x + half_x) * self.tile_size
-                screen_y = grid_y + (y + half_y) * self.tile_size
-
-                if (0 <= tile_x < self.game_manager.current_level.width and 0 <= tile_y < self.game_manager.current_level.height):
-                    tile = self.game_manager.current_level.tiles[tile_y][tile_x]
-
-                    tile_sprite = pygame.transform.scale(tile.image, (self.tile_size, self.tile_size))
-                    self.screen.blit(tile_sprite, (screen_x, screen_y))
-
-                    missing_sprite_colors = {
-                        "tile": '#FF0000FF',
-                        "ground": '#1AFF00FF', 
-                        "air": '#00EEFFFF',
-                        "camera": '#FFFFFFFF'
-                    }
-
-                    for height, color in missing_sprite_colors.items():
-                        entity = tile.entities.get(height)
-                        if entity:
-                            entity_name = entity.__class__.__name__.lower()
-                            match entity_name:
-                                case "crate":
-                                    if entity.small:
-                                        sprite_name = f"{entity_name}_small.png"
-                                    else:
-                                        sprite_name = f"{entity_name}.png"
-                                case "crategen":
-                                    if entity.crate_type == "small":
-                                        sprite_name = f"{entity_name}_small"
-                                    else:
-                                        sprite_name = f"{entity_name}"
-                                    if entity.crate_count <= 0:
-                                        sprite_name += "_empty.png"
-                                    else:
-                                        if entity.active:
-                                            sprite_name += "_on.png"
-                                        else:
-                                            sprite_name += ".png"
-                                case "cratedel":
-                                    if entity.active:
-                                        sprite_name = f"{entity_name}_on.png"
-                                    else:
-                                        sprite_name = f"{entity_name}.png"
-                                case "trap":
-                                    if entity.active:
-                                        sprite_name = f"{entity_name}_on.png"
-                                    else:
-                                        sprite_name = f"{entity_name}.png"
-                                case "red":
-                                    if entity.crate == None:
-                                        sprite_name = f"{entity_name}.png"
-                                    elif entity.crate.small == "small":
-                                        sprite_name = f"{entity_name}_small.png"
-                                    else:
-                                        sprite_name = f"{entity_name}_big.png"
-                                case "green":
-                                    if entity.crate == None:
-                                        sprite_name = f"{entity_name}.png"
-                                    else:
-                                        sprite_name = f"{entity_name}_small.png"
-                                case "inputter":
-                                    if not entity.activated:
-                                        match entity.operation:
-                                            case "+":
-                                                sprite_name = f"{entity_name}_add.png"
-                                            case "-":
-                                                sprite_name = f"{entity_name}_sub.png"
-                                            case "*":
-                                                sprite_name = f"{entity_name}_mul.png"
-                                            case "/":
-                                                sprite_name = f"{entity_name}_div.png"
-                                    else:
-                                        sprite_name = f"{entity_name}_done.png"
-                                case "collectable":
-                                    if entity.height == 1:
-                                        sprite_name = f"{entity_name}.png"
-                                    else:
-                                        sprite_name = f"{entity_name}_air.png"
-                                case _:
-                                    sprite_name = f"{entity.__class__.__name__.lower()}.png"
-
-                            sprite = load_sprite(sprite_name, self.tile_size, color_on=color, color_off='#010001', entity=entity)
-                            # N = Up, E = Right, S = Down, W = Left
-                            rotation = {"N": 0, "E": 270, "S": 180, "W": 90}.get(entity.direction, 0)
-                            sprite = pygame.transform.rotate(sprite, rotation)
-                            self.screen.blit(sprite, (screen_x, screen_y))
-
-                else:  # Void tiles
-                    pygame.draw.rect(self.screen, (0, 0, 0), (screen_x, screen_y, self.tile_size - 1, self.tile_size - 1))
-                    #pygame.draw.rect(self.screen, '#E6DCDA', (screen_x, screen_y, self.tile_size, self.tile_size))
+        Args:
+            entity (Entity): Entity to draw.
+            height (int): Numerical height of the layer the entity is on (picks the fallback color).
+
+        Returns:
+            tuple: (surface, area), area being None if the whole surface is the sprite.
+        """
+        # N = Up, E = Right, S = Down, W = Left
+        rotation = {"N": 0, "E": 270, "S": 180, "W": 90}.get(entity.direction, 0)
+        sprite_name = self._sprite_name(entity)
+        region = self.sprite_atlas.region(sprite_name, rotation)
+        if region is not None:
+            return self.sprite_atlas.surface, region
+        sprite = sprite_cache.get(sprite_name, self.tile_size, rotation, color_on=MISSING_SPRITE_COLORS[height], color_off='#010001', entity=entity)
+        return sprite, None
 
 
     def resize(self):
@@ -1080,7 +1194,10 @@ class GameScreen:
         help_was_shown = self.showing_help
         current_message_idx = getattr(self, 'current_message_index', 0)
         self.game_manager.save_script(last_script, self.player_name)  # Save the script to a file
-        self.manager.clear_and_reset()
+        self.root.kill()
+        if self.language_help_panel is not None:  # Shared with other game screens, it is hidden instead
+            self.language_help_panel.hide()
+        sprite_cache.clear()  # Sprites are rebuilt for the new layout
         self.calculate_viewport()
         self.create_ui()
         self.game_manager.update_selected_robot()
@@ -1114,4 +1231,6 @@ class GameScreen:
             last_script = self.code_input.get_text()
             self.game_manager.save_script(last_script, self.player_name)
         self.game_manager.is_running = False
-        self.manager.clear_and_reset()
+        self.root.kill()
+        if self.language_help_panel is not None:  # Shared with other game screens, it is hidden instead
+            self.language_help_panel.hide()
@@ -0,0 +1,87 @@
+"""
+Invalidation module.
+Keeps track of the screen regions that changed since the last presented frame, so the main loop only redraws
+and presents those regions, and skips frames in which nothing changed.
+It uses singleton to configure a global invalidation instance.
+
+Classes:
+    Invalidation: Singleton class collecting the regions of the screen that must be redrawn.
+
+Objects:
+    invalidation (Invalidation): Global instance of the Invalidation class.
+"""
+
+import pygame
+
+
+class Invalidation:
+    """
+    Singleton class collecting the regions of the screen that must be redrawn in the next frame.
+
+    Attributes:
+        full (bool): Whether the whole screen must be redrawn.
+        rects (list): Regions (pygame.Rect) to redraw, when the whole screen is not invalidated.
+
+    Methods:
+        invalidate(rect=None): Marks a region (or the whole screen) to be redrawn.
+        pending(): Checks if anything must be redrawn.
+        take(): Gets and clears the regions to redraw.
+
+    Example:
+        invalidation.invalidate(pygame.Rect(0, 0, 100, 100))
+    """
+    _instance = None
+
+    def __new__(cls):
+        """
+        Singleton instance creation method.
+        Ensures that only one instance of Invalidation exists throughout the application.
+
+        Returns:
+            Invalidation: The singleton instance of the Invalidation class.
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.full = True  # The first frame is always drawn
+            cls._instance.rects = []
+        return cls._instance
+
+
+    def invalidate(self, rect=None):
+        """
+        Marks a region of the screen to be redrawn.
+
+        Args:
+            rect (pygame.Rect, optional): Region to redraw. The whole screen if None. Default is None.
+        """
+        if rect is None:
+            self.full = True
+        elif not self.full:
+            self.rects.append(pygame.Rect(rect))
+
+
+    def pending(self):
+        """
+        Checks if anything must be redrawn.
+
+        Returns:
+            bool: True if there is a region to redraw.
+        """
+        return self.full or bool(self.rects)
+
+
+    def take(self):
+        """
+        Gets and clears the regions to redraw.
+
+        Returns:
+            list: Regions to redraw, or None if the whole screen must be redrawn.
+        """
+        rects = None if self.full else self.rects
+        self.full = False
+        self.rects = []
+        return rects
+
+
+# Global instance
+invalidation = Invalidation()
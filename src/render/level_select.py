@@ -2,6 +2,8 @@
 Level select renderer.
 This module provides a renderer for the level selection scene in a game.
 It displays a grid of levels with buttons, a sidebar for leaderboard info, and allows players to select levels to play.
+The grid is virtualized: only the buttons of the rows in view exist, and they are reused as the grid scrolls.
+Large level collections are split in pages of PAGE_SIZE level numbers.
 
 Classes:
     LevelSelect: Renderer for the level selection scene.
@@ -11,14 +13,19 @@ import pygame
 import pygame_gui
 import logging
 import os
-import json
 from src.render.sound_manager import sound_manager
+from src.level.level_cache import level_cache
+from src.level.level_index import level_index
+from src.storage.score_store import score_store
+from src.storage.settings import settings
+from src.render.invalidation import invalidation
 
 LEVEL_FOLDER = "data/level/"
-PLAYER_FOLDER = "data/player/"
-OPTIONS_FILE = "data/options.json"
+LEADERBOARD_SIZE = 10  # Best scores shown in the sidebar
 PADDING = 20  # Space between buttons
 COLUMNS = 10  # Number of columns in the grid
+PAGE_SIZE = 100  # Level numbers per page of the grid
+SCROLLBAR_WIDTH = 20  # Width of the grid scroll bar
 
 
 class LevelSelect:
@@ -31,21 +38,38 @@ class LevelSelect:
         manager (pygame_gui.UIManager): UI manager for handling UI elements.
         change_scene (function): Function to change scenes.
         game_manager (GameManager): Instance of the game manager for loading levels.
-        buttons (list): List of level buttons.
+        buttons (list): (button, level folder name) of the level buttons in view.
+        button_pool (list): Level buttons of the grid, reused as it scrolls.
+        page (int): Page of levels shown (levels PAGE_SIZE * page + 1 to PAGE_SIZE * (page + 1)).
+        pages (list): Pages with levels.
+        page_levels (list): Level folder names of the page shown, in grid order.
+        scroll_bar (pygame_gui.elements.UIVerticalScrollBar): Scroll bar of the grid (None if the page fits).
         selected_level (str): Currently selected level folder name.
-        level_data (dict): Dictionary storing level names and leaderboard info.
-        player_level (int): Player's highest level from JSON file.
+        level_data (dict): Level index entries (number and name) of the valid levels.
+        player_level (int): Player's highest level from the score store.
+        root (pygame_gui.core.UIContainer): Container of every UI element of the scene (hidden while the scene is suspended).
+        layout_size (tuple): Screen size the UI was laid out for.
 
     Methods:
+        scan_levels(): Gets the valid levels from the level index.
+        refresh_levels(): Refreshes the player level, the selected leaderboard and the installed levels.
         create_ui(): Initializes the UI elements for level selection.
+        create_grid(): Creates the level grid of the current page and its button pool.
+        layout_grid(): Assigns the pooled buttons to the levels in view.
+        set_page(page): Shows another page of levels.
+        scroll_grid(rows): Scrolls the level grid.
+        get_page(level_number): Gets the page of a level.
+        get_grid_size(grid_width): Determines the number of columns and the button size of the grid.
+        get_content_height(columns, button_size): Gets the height of the whole grid of the current page.
         handle_events(event): Handles user interactions with the UI.
         select_level(folder): Highlights the selected level and updates the sidebar with leaderboard info.
-        load_player_level(): Loads the player's highest level from a JSON file.
-        load_leaderboard(filepath): Loads leaderboard data from a JSON file.
-        is_valid_level(folder_name): Checks if a folder name follows the correct format and contains necessary files.
-        update(time_delta): Updates the UI manager.
+        preload_levels(): Preloads the selected and next unlocked levels in the background.
+        load_player_level(): Loads the player's highest level from the score store.
+        update(time_delta): Moves the level buttons if the grid was scrolled.
         render(): Draws the UI elements on the screen.
         resize(): Recreates UI elements on window resize.
+        suspend(): Hides the scene, keeping its UI elements alive.
+        resume(): Shows the scene again, refreshing its data.
         destroy(): Clears UI elements when exiting the scene.
 
     Example:
@@ -68,109 +92,110 @@ class LevelSelect:
         self.game_manager = game_manager
         self.buttons = []
         self.selected_level = None
-        self.level_data = {}  # Stores level name & leaderboard info
-        self.player_level = self.load_player_level()  # Load player level from JSON (Last level played)
+        self.page = None  # Page of levels shown (chosen on the first layout)
+        self.level_data = {}  # Stores level number & name
+        self.player_level = self.load_player_level()  # Load player level from the score store (Last level played)
         
+        self.scan_levels()
         self.create_ui()
+        self.preload_levels()
 
 
-    def create_ui(self):
+    def scan_levels(self):
         """
-        Scans levels and positions buttons in a scrollable grid layout that adapts to screen size.
-        Initializes the UI elements for level selection, including buttons, labels, and sidebars.
+        Gets the valid levels from the level index (sorted by level number).
+        Only the level files that changed since the index was saved are read.
         """
-        self.manager.clear_and_reset()
-        self.buttons.clear()
+        level_index.refresh()
+        self.level_data = level_index.levels()
+
 
+    def refresh_levels(self):
+        """
+        Refreshes the data that can change while the scene is hidden: the player level (and so the unlocked levels),
+        the leaderboard of the selected level and the installed levels (the grid is rebuilt if levels were added or removed).
+        """
+        self.player_level = self.load_player_level()
+        if level_index.refresh():
+            folders = list(self.level_data)
+            self.level_data = level_index.levels()
+            if list(self.level_data) != folders:  # Levels were added or removed
+                self.root.kill()
+                self.create_ui()
+
+        self.layout_grid()  # Unlocked levels
+        if self.selected_level in self.level_data:
+            self.select_level(self.selected_level)
+        else:
+            self.selected_level = None
+
+
+    def create_ui(self):
+        """
+        Positions the scanned levels in a scrollable, paged grid layout that adapts to screen size.
+        Initializes the UI elements for level selection, including buttons, labels, and sidebars,
+        inside the root container of the scene.
+        """
         # Screen and layout sizing
         width, height = self.screen.get_size()
+        self.layout_size = (width, height)
+        self.root = pygame_gui.core.UIContainer(
+            relative_rect=pygame.Rect((0, 0), (width, height)),
+            manager=self.manager
+        )
         sidebar_width = int(width * 0.25)
         grid_width = width - sidebar_width - PADDING
         panel_height = height - 100
 
-        # Determine optimal button size and column count dynamically
-        min_button_size = 80
-        max_button_size = 150
-        for columns in range(20, 0, -1):
-            btn_candidate = (grid_width - (columns + 1) * PADDING) // columns
-            if min_button_size <= btn_candidate <= max_button_size:
-                COLUMNS = columns
-                button_size = btn_candidate
-                break
-        else:
-            COLUMNS = 1
-            button_size = min_button_size
-
         # Title
         self.title_label = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((sidebar_width, 20), (grid_width, 40)),
             text="Select a Level",
             manager=self.manager,
+            container=self.root,
             object_id="title"
         )
 
-        # Scrollable grid panel
-        self.level_panel = pygame_gui.elements.UIPanel(
-            relative_rect=pygame.Rect((sidebar_width + 15, 70), (grid_width, panel_height)),
-            starting_height=1,
-            manager=self.manager,
-            object_id="level_panel",
-        )
-        container = self.level_panel.get_container()
-
-        # Grid layout logic
-        x_start, y_start = PADDING, PADDING
-        x, y = x_start, y_start
-        col_count = 0
-
-        def extract_level_number(folder_name):
-            try:
-                number_str, _ = folder_name.split("_", 1)
-                return int(number_str)
-            except ValueError:
-                return float('inf')  # Push invalid folders to the end
-
-
-        for folder in sorted(os.listdir(LEVEL_FOLDER), key=extract_level_number):
-            # Skip non-directory items
-            if not os.path.isdir(os.path.join(LEVEL_FOLDER, folder)):
-                continue
-
-            if not self.is_valid_level(folder):
-                continue
-
-            level_number, level_name = folder.split("_", 1)
-            leaderboard_path = os.path.join(LEVEL_FOLDER, folder, "leaderboard.json")
-            leaderboard = self.load_leaderboard(leaderboard_path)
-            self.level_data[folder] = {"name": level_name, "leaderboard": leaderboard}
-
-            button = pygame_gui.elements.UIButton(
-                relative_rect=pygame.Rect((x, y), (button_size, button_size)),
-                text=f"{level_number}",
+        # Pages of levels, by level number range (only shown if there is more than one)
+        self.pages = sorted({self.get_page(level_info["number"]) for level_info in self.level_data.values()})
+        if self.page not in self.pages:
+            unlocked = self.get_page(self.player_level + 1)
+            self.page = unlocked if unlocked in self.pages else (self.pages[0] if self.pages else 0)
+        self.page_label = None
+        if len(self.pages) > 1:
+            page_x = sidebar_width + 15 + grid_width - 240
+            self.prev_page_button = pygame_gui.elements.UIButton(
+                relative_rect=pygame.Rect((page_x, 25), (40, 30)),
+                text="<",
                 manager=self.manager,
-                container=container,
+                container=self.root,
+                object_id="level_button"
+            )
+            self.page_label = pygame_gui.elements.UILabel(
+                relative_rect=pygame.Rect((page_x + 45, 25), (150, 30)),
+                text="",
+                manager=self.manager,
+                container=self.root,
+                object_id="label"
+            )
+            self.next_page_button = pygame_gui.elements.UIButton(
+                relative_rect=pygame.Rect((page_x + 200, 25), (40, 30)),
+                text=">",
+                manager=self.manager,
+                container=self.root,
                 object_id="level_button"
             )
 
-            if self.player_level + 1 < int(level_number):
-                button.disable()
-            else:
-                button.enable()
-
-            self.buttons.append((button, folder))
-
-            col_count += 1
-            x += button_size + PADDING
-            if col_count >= COLUMNS:
-                col_count = 0
-                x = x_start
-                y += button_size + PADDING
+        # Level grid
+        self.grid_rect = pygame.Rect((sidebar_width + 15, 70), (grid_width, panel_height))
+        self.create_grid()
 
         # Sidebar
         self.sidebar_panel = pygame_gui.elements.UIPanel(
             relative_rect=pygame.Rect((10, 40), (sidebar_width, height - 50)),
             starting_height=1.0,
             manager=self.manager,
+            container=self.root,
             object_id="sidebar_panel"
         )
 
@@ -215,43 +240,185 @@ class LevelSelect:
             container=self.sidebar_panel
         )
 
+
+    def create_grid(self):
+        """
+        Creates the level grid panel of the current page. Only the buttons needed to fill the visible rows are created
+        (the button pool); scrolling moves them and assigns them the levels of the rows that come into view.
+        """
+        self.page_levels = [
+            folder for folder, level_info in self.level_data.items() if self.get_page(level_info["number"]) == self.page
+        ]
+        if self.page_label:
+            first = self.page * PAGE_SIZE + 1
+            self.page_label.set_text(f"Levels {first}-{first + PAGE_SIZE - 1}")
+            index = self.pages.index(self.page)
+            self.prev_page_button.enable() if index > 0 else self.prev_page_button.disable()
+            self.next_page_button.enable() if index < len(self.pages) - 1 else self.next_page_button.disable()
+
+        self.level_panel = pygame_gui.elements.UIPanel(
+            relative_rect=self.grid_rect,
+            starting_height=1,
+            manager=self.manager,
+            container=self.root,
+            object_id="level_panel",
+        )
+        container = self.level_panel.get_container()
+        visible_width, visible_height = container.get_relative_rect().size
+
+        # Determine optimal button size and column count dynamically (leaving room for the scroll bar if needed)
+        self.columns, self.button_size = self.get_grid_size(self.grid_rect.width)
+        if self.get_content_height(self.columns, self.button_size) > visible_height:
+            self.columns, self.button_size = self.get_grid_size(self.grid_rect.width - SCROLLBAR_WIDTH)
+        self.content_height = self.get_content_height(self.columns, self.button_size)
+
+        self.scroll_bar = None
+        if self.content_height > visible_height:
+            self.scroll_bar = pygame_gui.elements.UIVerticalScrollBar(
+                relative_rect=pygame.Rect((visible_width - SCROLLBAR_WIDTH, 0), (SCROLLBAR_WIDTH, visible_height)),
+                visible_percentage=visible_height / self.content_height,
+                manager=self.manager,
+                container=container
+            )
+
+        # Button pool: enough buttons for every row that can be (partly) visible at once
+        step = self.button_size + PADDING
+        visible_rows = -(-visible_height // step) + 1
+        self.button_pool = []
+        for _ in range(min(len(self.page_levels), visible_rows * self.columns)):
+            button = pygame_gui.elements.UIButton(
+                relative_rect=pygame.Rect((0, 0), (self.button_size, self.button_size)),
+                text="",
+                manager=self.manager,
+                container=container,
+                object_id="level_button"
+            )
+            self.button_pool.append(button)
+        self.layout_grid()
+
+
+    def layout_grid(self):
+        """
+        Assigns the pooled buttons to the levels of the rows in view (at the current scroll position),
+        moving them to their place in the grid and hiding the buttons left over.
+        """
+        step = self.button_size + PADDING
+        offset = round(self.scroll_bar.start_percentage * self.content_height) if self.scroll_bar else 0
+        first_index = offset // step * self.columns  # First level of the first row in view
+
+        self.buttons = []
+        for i, button in enumerate(self.button_pool):
+            index = first_index + i
+            if index >= len(self.page_levels):
+                button.hide()
+                continue
+            folder = self.page_levels[index]
+            level_number = self.level_data[folder]["number"]
+            row, column = divmod(index, self.columns)
+            button.set_relative_position((PADDING + column * step, PADDING + row * step - offset))
+            if button.text != f"{level_number}":
+                button.set_text(f"{level_number}")
+
+            if self.player_level + 1 < level_number:
+                button.disable()
+            else:
+                button.enable()
+            button.show()
+            self.buttons.append((button, folder))
+
+        self.scroll_offset = offset
+        invalidation.invalidate(self.level_panel.rect)
+
+
+    def set_page(self, page):
+        """
+        Shows another page of levels, rebuilding only the level grid.
+
+        Args:
+            page (int): Page to show (an entry of pages).
+        """
+        self.page = page
+        self.level_panel.kill()
+        self.create_grid()
+
+
+    def scroll_grid(self, rows):
+        """
+        Scrolls the level grid.
+
+        Args:
+            rows (int): Rows to scroll (negative scrolls up).
+        """
+        if self.scroll_bar:
+            step = (self.button_size + PADDING) / self.content_height
+            self.scroll_bar.set_scroll_from_start_percentage(self.scroll_bar.start_percentage + rows * step)
+
+
+    @staticmethod
+    def get_page(level_number):
+        """
+        Gets the page of a level (pages hold PAGE_SIZE consecutive level numbers).
+
+        Args:
+            level_number (int): Level number.
+
+        Returns:
+            int: Page number, starting at 0.
+        """
+        return max(level_number - 1, 0) // PAGE_SIZE
+
+
+    @staticmethod
+    def get_grid_size(grid_width):
+        """
+        Determines the number of columns and the button size that best fill the grid width.
+
+        Args:
+            grid_width (int): Width available for the grid.
+
+        Returns:
+            tuple: (columns, button_size).
+        """
+        min_button_size = 80
+        max_button_size = 150
+        for columns in range(20, 0, -1):
+            btn_candidate = (grid_width - (columns + 1) * PADDING) // columns
+            if min_button_size <= btn_candidate <= max_button_size:
+                return columns, btn_candidate
+        return 1, min_button_size
+
+
+    def get_content_height(self, columns, button_size):
+        """
+        Gets the height of the whole grid of the current page.
+
+        Args:
+            columns (int): Number of columns in the grid.
+            button_size (int): Size of the buttons.
+
+        Returns:
+            int: Height of the grid, including its padding.
+        """
+        rows = -(-len(self.page_levels) // columns)
+        return PADDING + rows * (button_size + PADDING)
+
     
     def load_player_level(self):
         """
-        Loads player highest level from JSON. Creates file if missing.
+        Loads player highest level from the score store. Creates the player progress if missing.
 
         Returns:
             int: Player's highest level.
         """
-        player_name = "Anonymous"  # Default player name
+        player_name = settings.get("last_player")  # Served from memory
         player_level = 1  # Default level
 
-        # Load last player name from options file
-        if os.path.exists(OPTIONS_FILE):
-            try:
-                with open(OPTIONS_FILE, "r") as file:
-                    options = json.load(file)
-                    player_name = options.get("last_player", "Anonymous")
-            except json.JSONDecodeError:
-                logging.error(f"Invalid JSON in {OPTIONS_FILE}")
-
-        # Ensure player folder exists
-        os.makedirs(PLAYER_FOLDER, exist_ok=True)
-
-        player_file = os.path.join(PLAYER_FOLDER, f"{player_name}.json")
-
-        # Load or create player file
-        if os.path.exists(player_file):
-            try:
-                with open(player_file, "r") as file:
-                    player_data = json.load(file)
-                    player_level = player_data.get("highest_level", 1)
-            except json.JSONDecodeError:
-                logging.error(f"Invalid JSON in {player_file}")
+        # Load or create the player progress (kept in memory, including the scores being saved)
+        highest_level = score_store.get_highest_level(player_name)
+        if highest_level is not None:
+            player_level = highest_level
         else:
-            # Create the file with default level
-            with open(player_file, "w") as file:
-                json.dump({"highest_level": 0}, file)
+            score_store.ensure_player(player_name)
 
         return player_level
 
@@ -269,6 +436,9 @@ class LevelSelect:
                 for button, folder in self.buttons:
                     if event.ui_element == button:
                         self.select_level(folder)
+                if self.page_label and event.ui_element in (self.prev_page_button, self.next_page_button):
+                    index = self.pages.index(self.page) + (1 if event.ui_element == self.next_page_button else -1)
+                    self.set_page(self.pages[index])
                 match event.ui_element:
                     case self.play_button if self.selected_level:
                         self.game_manager.load_level(self.selected_level)  # Preload level
@@ -276,6 +446,9 @@ class LevelSelect:
                             self.change_scene("game", self.selected_level, os.path.join(LEVEL_FOLDER, self.selected_level))
                     case self.back_button:
                         self.change_scene("menu")
+            case pygame.MOUSEWHEEL if self.scroll_bar and self.level_panel.rect.collidepoint(pygame.mouse.get_pos()):
+                if not any(element.hovered for element in self.scroll_bar.get_focus_set()):  # The scroll bar scrolls itself
+                    self.scroll_grid(-event.y)
             case pygame.QUIT:
                 self.change_scene(None)
             case _:
@@ -295,8 +468,8 @@ class LevelSelect:
         self.level_label.set_active_effect(pygame_gui.TEXT_EFFECT_TYPING_APPEAR)
         self.play_button.enable()
         
-        # Load the leaderboard data from level_data
-        leaderboard = level_info["leaderboard"]
+        # Load the best scores from the score store
+        leaderboard = score_store.top_scores(folder, LEADERBOARD_SIZE)
 
         
         if leaderboard:  # If there's data
@@ -305,84 +478,75 @@ class LevelSelect:
             for entry in leaderboard:
                 i += 1
                 leaderboard_html += f"{i}.{entry['name']}<br>{entry['steps_taken']} Steps<br>{entry['collectables']}% Drives<br>Score: {entry['score']}<br><br>"
+            scores = score_store.count_scores(folder) if i == LEADERBOARD_SIZE else i
+            if scores > i:  # Only the best scores are shown
+                leaderboard_html += f"...and {scores - i} more scores."
         else:
             leaderboard_html = "No leaderboard data available."
 
         self.leaderboard_textbox.set_text(leaderboard_html)
+        self.preload_levels()
 
 
-    def load_leaderboard(self, filepath):
+    def preload_levels(self):
         """
-        Loads leaderboard data from JSON.
-        
-        Args:
-            filepath (str): Path to the leaderboard file.
-        
-        Returns:
-            list: A list of dictionaries with leaderboard data. (Empty if file not found or invalid)
-        """
-        if os.path.exists(filepath):
-            with open(filepath, "r") as file:
-                try:
-                    return json.load(file)  # Load entire JSON file as a list
-                except json.JSONDecodeError:
-                    logging.error(f"Invalid JSON in {filepath}")
-                    return []  # Return empty list if there's a parsing error
-        else:
-            logging.debug(f"Leaderboard not found: {filepath}")
-            return []  # Return empty list instead of a string
-
-            return output
-    
-
-    def is_valid_level(self, folder_name):
+        Preloads the selected level and the next unlocked level into the level cache on a background thread,
+        so Play starts without loading them.
         """
-        Checks if the folder name follows the correct format (X_Name) where X is a number.
-        
-        Args:
-            folder_name (str): Name of the folder to validate.
-
-        Returns:
-            bool: True if valid, False otherwise.
-        """
-        # Check if the folder name has exactly one underscore and the part before it is a number
-        parts = folder_name.split("_")
-        if len(parts) != 2 or not parts[0].isdigit():
-            return False
-        
-        # Check if a structure.json file is present in the folder
-        structure_path = os.path.join(LEVEL_FOLDER, folder_name, "structure.json")
-        if not os.path.exists(structure_path):
-            logging.debug(f"Missing structure.json in {folder_name}")
-            return False
-        
-        return True
+        next_unlocked = next(
+            (folder for folder, level_info in self.level_data.items() if level_info["number"] == self.player_level + 1),
+            None
+        )
+        level_cache.preload([self.selected_level, next_unlocked])
 
 
     def update(self, time_delta):
         """
-        Updates the UI manager.
+        Updates the scene: moves the level buttons if the grid was scrolled.
+        The UI manager is updated once per frame by the main loop.
         
         Args:
             time_delta (float): Time since the last update in seconds.
         """
-        self.manager.update(time_delta)
+        if self.scroll_bar and round(self.scroll_bar.start_percentage * self.content_height) != self.scroll_offset:
+            self.layout_grid()
 
 
     def render(self):
         """
-        Draws the UI elements.
+        Draws the scene content. The scene is made only of UI elements, which the main loop draws.
         """
-        self.screen.fill((0, 0, 0))
-        self.manager.draw_ui(self.screen)
 
 
     def resize(self):
         """
-        Recreates UI elements on window resize.
+        Recreates UI elements on window resize (without scanning the levels again).
         """
-        self.manager.clear_and_reset()
+        self.root.kill()
         self.create_ui()
+        if self.selected_level in self.level_data:
+            self.select_level(self.selected_level)
+
+
+    def suspend(self):
+        """
+        Hides the scene, keeping its UI elements and scanned levels alive to resume it later.
+        """
+        self.root.hide()
+
+
+    def resume(self):
+        """
+        Shows the scene again, refreshing the player level and the selected leaderboard,
+        and rebuilding its layout if the window was resized while it was hidden.
+        """
+        if self.layout_size != self.screen.get_size():
+            self.root.kill()
+            self.create_ui()
+        else:
+            self.root.show()
+        self.refresh_levels()
+        self.preload_levels()
     
 
     def destroy(self):
@@ -390,4 +554,4 @@ class LevelSelect:
         Clears UI elements.
         """
         logging.debug("Destroying level select scene")
-        self.manager.clear_and_reset()
+        self.root.kill()
@@ -3,17 +3,15 @@
 import pygame
 import pygame_gui
 import logging
-import json
 import os
 import time
 from string import ascii_letters, digits
-from pathlib import Path
 from src.render.missing_image import missing_texture_pygame
 from src.render.sound_manager import sound_manager
+from src.storage.score_store import score_store
+from src.storage.settings import settings
 
 SPRITE_FOLDER = "res/sprites/"
-PLAYER_FOLDER = "data/player/"
-DATA_FILE = "data/options.json"
 
 
 class MainMenu:
@@ -28,6 +26,8 @@ class MainMenu:
         change_scene (function): Function to change the current scene.
         name_changing (bool): Flag to indicate if the player is changing their name.
         player_name (str): The name of the player loaded from options file.
+        root (pygame_gui.core.UIContainer): Container of every UI element of the scene (hidden while the scene is suspended).
+        layout_size (tuple): Screen size the UI was laid out for.
 
     Methods:
         __init__(screen, manager, change_scene): Initializes the main menu scene.
@@ -40,7 +40,9 @@ class MainMenu:
         update(time_delta): Updates the UI manager, therefore refreshing the screen.
         render(): Renders the UI elements on the screen.
         resize(): Recreates UI elements on window resize to achieve responsive design.
-        destroy(): Destroys the UI manager and its elements.
+        suspend(): Hides the scene, keeping its UI elements alive.
+        resume(): Shows the scene again, relaying it out if the window was resized.
+        destroy(): Destroys the UI elements of the scene.
 
     Example:
         main_menu = MainMenu(screen, manager, change_scene_function)
@@ -56,7 +58,6 @@ class MainMenu:
             change_scene (function): Function to change the current scene.
         """
         os.makedirs(SPRITE_FOLDER, exist_ok=True)
-        os.makedirs(PLAYER_FOLDER, exist_ok=True)
 
         self.screen = screen
         self.manager = manager
@@ -90,15 +91,21 @@ class MainMenu:
 
     def create_ui(self):
         """
-        Creates and positions UI elements dynamically.
+        Creates and positions UI elements dynamically, inside the root container of the scene.
         """
         width, height = self.screen.get_size()
+        self.layout_size = (width, height)
+        self.root = pygame_gui.core.UIContainer(
+            relative_rect=pygame.Rect((0, 0), (width, height)),
+            manager=self.manager
+        )
 
         # Title label
         self.title = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((width * 0.25, height * 0.1), (width * 0.5, height * 0.1)),
             text="Syntax Depot",
             manager=self.manager,
+            container=self.root,
             object_id="title",  
         )
 
@@ -107,6 +114,7 @@ class MainMenu:
             relative_rect=pygame.Rect((width * 0.25, height * 0.3), (width * 0.5, height * 0.1)),
             text=f"Welcome back, {self.player_name}!",
             manager=self.manager,
+            container=self.root,
             object_id="subtitle"
         )
 
@@ -114,6 +122,7 @@ class MainMenu:
         self.name_input = pygame_gui.elements.UITextEntryLine(
             relative_rect=pygame.Rect((width * 0.35, height * 0.3), (width * 0.3, height * 0.07)),
             manager=self.manager,
+            container=self.root,
             object_id="name_input",
         )
         self.name_input.hide()
@@ -124,6 +133,7 @@ class MainMenu:
             relative_rect=pygame.Rect((width * 0.32, height * 0.4), (width * 0.36, height * 0.07)),
             text="This isn't you? Click here",
             manager=self.manager,
+            container=self.root,
             object_id="good_button"
         )
 
@@ -132,6 +142,7 @@ class MainMenu:
             relative_rect=pygame.Rect((width * 0.35, height * 0.65), (width * 0.3, height * 0.1)),
             text="Play",
             manager=self.manager,
+            container=self.root,
             object_id="good_button"
         )
 
@@ -140,6 +151,7 @@ class MainMenu:
             relative_rect=pygame.Rect((width * 0.35, height * 0.8), (width * 0.3, height * 0.1)),
             text="Exit",
             manager=self.manager,
+            container=self.root,
             object_id="bad_button"
         )
 
@@ -148,6 +160,7 @@ class MainMenu:
             relative_rect=pygame.Rect((width - 50, height - 50), (40, 40)),
             text="",
             manager=self.manager,
+            container=self.root,
             object_id="neutral_button"
         )
         
@@ -160,6 +173,7 @@ class MainMenu:
             relative_rect=pygame.Rect((width - 100, height - 50), (40, 40)),
             text="",
             manager=self.manager,
+            container=self.root,
             object_id="neutral_button"
         )
 
@@ -171,6 +185,7 @@ class MainMenu:
             relative_rect=pygame.Rect((10, height - 50), (width * 0.25, 40)),
             text="Reset Player Data",
             manager=self.manager,
+            container=self.root,
             object_id="bad_button"
         )
 
@@ -189,20 +204,7 @@ class MainMenu:
         self.mute_button.selected_image = scaled_icon
         self.mute_button.rebuild()
 
-        try:
-            options_path = Path(DATA_FILE)
-            data = {}
-            if options_path.exists():
-                with open(options_path, 'r') as f:
-                    data = json.load(f)
-            
-            data["mute"] = int(sound_manager.muted)
-            options_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(options_path, 'w') as f:
-                json.dump(data, f)
-        except (json.JSONDecodeError, IOError) as e:
-            logging.error(f"Error saving options: {e}")
+        settings.set("mute", int(sound_manager.muted))  # Saved in the background
 
 
     def update_mute_music_button_image(self):
@@ -221,20 +223,7 @@ class MainMenu:
         self.mute_music_button.selected_image = scaled_icon
         self.mute_music_button.rebuild()
 
-        try:
-            options_path = Path(DATA_FILE)
-            data = {}
-            if options_path.exists():
-                with open(options_path, 'r') as f:
-                    data = json.load(f)
-            
-            data["mute_music"] = int(sound_manager.music_muted)
-            options_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(options_path, 'w') as f:
-                json.dump(data, f)
-        except (json.JSONDecodeError, IOError) as e:
-            logging.error(f"Error saving options: {e}")
+        settings.set("mute_music", int(sound_manager.music_muted))  # Saved in the background
 
 
     def handle_events(self, event):
@@ -252,10 +241,7 @@ class MainMenu:
                         time.sleep(0.2)
                         self.change_scene(None)
                     case element if element is self.play_button:  # Move to level select and create player data if it doesn't exist
-                        player_data_path = os.path.join(PLAYER_FOLDER, f"{self.player_name}.json")
-                        if not os.path.exists(player_data_path):
-                            with open(player_data_path, 'w') as f:
-                                json.dump({"highest_level": 0}, f)
+                        score_store.ensure_player(self.player_name)
                         self.change_scene("level_select")
                     case element if element is self.name_change_button:  # Toggle name change mode
                         self.toggle_name_change()
@@ -278,17 +264,9 @@ class MainMenu:
         Load the last player name from options file
         
         Returns:
-            str: The last player name or "Player" if not found or error occurs.
+            str: The last player name ("Anonymous" if the options file has none).
         """
-        try:
-            options_path = Path(DATA_FILE)
-            if options_path.exists():
-                with open(options_path, 'r') as f:
-                    data = json.load(f)
-                    return data.get("last_player", "Player")
-        except (json.JSONDecodeError, IOError) as e:
-            logging.error(f"Error loading options: {e}")
-        return "Player"
+        return settings.get("last_player")  # Served from memory, validated when the options file is loaded
 
 
     def toggle_name_change(self):
@@ -325,70 +303,67 @@ class MainMenu:
 
     def save_player_name(self, name):
         """
-        Save the player name to options file.
+        Save the player name to options file (written in the background, see settings).
         
         Args:
             name (str): The player name to save.
         """
-        try:
-            options_path = Path(DATA_FILE)
-            data = {}
-            if options_path.exists():
-                with open(options_path, 'r') as f:
-                    data = json.load(f)
-            
-            data["last_player"] = name
-            options_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(options_path, 'w') as f:
-                json.dump(data, f)
-        except (json.JSONDecodeError, IOError) as e:
-            logging.error(f"Error saving options: {e}")
+        settings.set("last_player", name)
 
 
     def reset_player_data(self):
         """
         Resets player data to default values.
         """
-        try:
-            # Look in the player folder for any files named "player_name.json"
-            file = f"{self.player_name}.json"
-            if os.path.exists(os.path.join(PLAYER_FOLDER, file)):  # Check if the file exists
-                os.remove(os.path.join(PLAYER_FOLDER, file))
-            # Recreate the default player file. highest_level = 1
-            with open(os.path.join(PLAYER_FOLDER, f"{self.player_name}.json"), 'w') as f:
-                json.dump({"highest_level": 0}, f)
-        except (json.JSONDecodeError, IOError) as e:
-            logging.error(f"Error resetting player data: {e}")
+        score_store.reset_player(self.player_name)  # No level completed
 
 
     def update(self, time_delta):
         """
-        Updates the UI manager, therefore refreshing the screen.
+        Updates the scene. The UI manager is updated once per frame by the main loop.
         """
-        self.manager.update(time_delta)
 
 
     def render(self):
         """
-        Renders the UI elements on the screen.
+        Renders the scene content. The menu is made only of UI elements, which the main loop draws.
         """
-        self.screen.fill((0, 0, 0))  # Black background
-        self.manager.draw_ui(self.screen)
 
 
     def resize(self):
         """
         Recreates UI elements on window resize to achieve responsive design.
         """
-        self.manager.clear_and_reset()  # Clear UI and recreate
+        self.root.kill()  # Clear the UI of this scene and recreate it
         self.create_ui()
 
 
+    def suspend(self):
+        """
+        Hides the scene, keeping its UI elements alive to resume it later.
+        """
+        self.root.hide()
+
+
+    def resume(self):
+        """
+        Shows the scene again, rebuilding its layout if the window was resized while it was hidden.
+        """
+        if self.layout_size != self.screen.get_size():
+            self.resize()
+            return
+        self.root.show()
+        # Showing the root shows every element, hide again the ones of the mode the menu is not in
+        if self.name_changing:
+            self.welcome_label.hide()
+        else:
+            self.name_input.hide()
+
+
     def destroy(self):
         """
-        Destroys the UI manager and its elements.
+        Destroys the UI elements of the scene.
         """
         logging.debug("Destroying main menu scene")
-        self.manager.clear_and_reset()
+        self.root.kill()
         
\ No newline at end of file
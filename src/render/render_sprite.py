@@ -1,18 +1,95 @@
 """
 Sprite loading and rendering module.
-This module provides functionality to load and render the sprites. 
+This module provides functionality to load and render the sprites.
+Sprites drawn every frame should be taken from the sprite cache, so they are only loaded, recolored, scaled and rotated once.
+
+Classes:
+    SpriteCache: Cache of scaled and rotated sprites, with least recently used eviction.
 
 Methods:
+    sprite_colors(sprite_name, entity=None): Gets the colors a sprite is recolored with.
     load_sprite(sprite_name, tile_size, color_on='#ff00dc', color_off='#010001', entity=None): Loads a sprite from the given name. If the file is missing, uses a fallback texture.
+
+Objects:
+    sprite_cache (SpriteCache): Global instance of the SpriteCache class.
 """
 
 
 import os
 import pygame
 import logging
+import numpy as np
+from collections import OrderedDict
 from src.render.missing_image import missing_texture_pygame
 
 SPRITES_FOLDER = "res/sprites/"  # Default sprite directory
+SPRITE_CACHE_SIZE = 256  # Scaled and rotated sprites kept in the cache
+YELLOW_MARKER = (255, 216, 0)  # Terminal sprite pixels painted with the first terminal color
+BLUE_MARKER = (0, 38, 255)  # Inputter sprite pixels painted with the second terminal color
+
+
+def sprite_colors(sprite_name, entity=None):
+    """
+    Gets the colors a sprite is recolored with (terminals take the colors of the entity).
+
+    Args:
+        sprite_name (str): Name of the sprite file (e.g., "outputter.png").
+        entity (Entity, optional): Entity the sprite is drawn for. Default is None.
+
+    Returns:
+        tuple: Colors of the sprite, empty if it is not recolored.
+    """
+    if "inputter" in sprite_name:
+        return (entity.input_ter_one, entity.input_ter_two)
+    if "outputter" in sprite_name:
+        return (entity.color,)
+    return ()
+
+
+def _recolor(sprite, replacements):
+    """
+    Replaces marker colors of a sprite in place, working on NumPy views of its pixels.
+    Matches are found on the original pixels first, so a replaced color is never replaced again.
+
+    Args:
+        sprite (pygame.Surface): Sprite with per-pixel alpha (convert_alpha()).
+        replacements (list): List of (marker RGB tuple, new color) pairs. The new color is anything pygame.Color accepts.
+    """
+    rgb = pygame.surfarray.pixels3d(sprite)
+    alpha = pygame.surfarray.pixels_alpha(sprite)
+    masks = [np.all(rgb == marker, axis=-1) for marker, _ in replacements]
+    for mask, (_, new_color) in zip(masks, replacements):
+        new_color = pygame.Color(new_color)
+        rgb[mask] = (new_color.r, new_color.g, new_color.b)
+        alpha[mask] = new_color.a
+    del rgb, alpha  # Unlock the sprite
+
+
+def _load_image(sprite_name, colors):
+    """
+    Loads a sprite at its original size, replacing the marker colors of terminal sprites.
+
+    Args:
+        sprite_name (str): Name of the sprite file.
+        colors (tuple): Colors from sprite_colors().
+
+    Returns:
+        pygame.Surface: The loaded sprite.
+    """
+    sprite_path = os.path.join(SPRITES_FOLDER, sprite_name)
+
+    if "inputter" in sprite_name:
+        sprite = pygame.image.load(sprite_path).convert_alpha()
+        _recolor(sprite, [(YELLOW_MARKER, colors[0]), (BLUE_MARKER, colors[1])])
+
+    elif "outputter" in sprite_name:
+        sprite = pygame.image.load(sprite_path).convert_alpha()
+        _recolor(sprite, [(YELLOW_MARKER, colors[0])])
+
+    else :
+        sprite = pygame.image.load(sprite_path)
+    return sprite
+
 
 def load_sprite(sprite_name, tile_size, color_on='#ff00dc', color_off='#010001', entity=None):
     """
@@ -26,52 +103,93 @@ def load_sprite(sprite_name, tile_size, color_on='#ff00dc', color_off='#010001',
         pygame.Surface: The loaded sprite or a fallback texture.
     """
     size=(tile_size, tile_size)
-    sprite_path = os.path.join(SPRITES_FOLDER, sprite_name)
 
     try:
-        if "inputter" in sprite_name:
-            sprite = pygame.image.load(sprite_path).convert_alpha()
-
-            new_color_1 = pygame.Color(entity.input_ter_one)
-            new_color_2 = pygame.Color(entity.input_ter_two)
-
-            replace_color_1 = (255, 216, 0)  # Yellow
-            replace_color_2 = (0, 38, 255)  # Blue
-
-            sprite = sprite.convert_alpha()
-            pixels = pygame.PixelArray(sprite)
-
-            # Replace colors
-            for x in range(sprite.get_width()):
-                for y in range(sprite.get_height()):
-                    current_color = sprite.unmap_rgb(pixels[x, y])[:3]
-                    if current_color == replace_color_1:
-                        pixels[x, y] = new_color_1
-                    elif current_color == replace_color_2:
-                        pixels[x, y] = new_color_2
-
-            del pixels
-
-        elif "outputter" in sprite_name:
-            sprite = pygame.image.load(sprite_path).convert_alpha()
-            new_color = pygame.Color(entity.color)
-            replace_color = (255, 216, 0)
-            
-            sprite = sprite.convert_alpha()
-            pixels = pygame.PixelArray(sprite)
-
-            for x in range(sprite.get_width()):
-                for y in range(sprite.get_height()):
-                    current_color = sprite.unmap_rgb(pixels[x, y])[:3]
-                    if current_color == replace_color:
-                        pixels[x, y] = new_color
-
-        else :
-            sprite = pygame.image.load(sprite_path)
-        
+        sprite = _load_image(sprite_name, sprite_colors(sprite_name, entity))
         sprite = pygame.transform.scale(sprite, size)
         return sprite
     except Exception as e:
         print(f"Error loading sprite: {e}")
         return missing_texture_pygame(tile_size, tile_size, color_on, color_off)
 
+
+class SpriteCache:
+    """
+    Cache of the sprites drawn on the level, keyed by (sprite name, tile size, colors, rotation).
+    Sprites are loaded (and recolored) from disk once at their original size, then scaled and rotated once per key.
+    The least recently used sprites are evicted when the cache is full.
+
+    Attributes:
+        max_size (int): Maximum number of scaled sprites kept.
+        sprites (OrderedDict): (sprite name, tile size, colors, rotation) -> scaled and rotated sprite, oldest first.
+        images (dict): (sprite name, colors) -> sprite at its original size.
+
+    Methods:
+        get(sprite_name, tile_size, rotation=0, color_on='#ff00dc', color_off='#010001', entity=None): Gets a sprite, building it if needed.
+        clear(): Removes the scaled sprites (e.g. after a resize).
+
+    Example:
+        sprite = sprite_cache.get("red.png", 64, rotation=90)
+    """
+    def __init__(self, max_size=SPRITE_CACHE_SIZE):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_size (int, optional): Maximum number of scaled sprites kept. Default is SPRITE_CACHE_SIZE.
+        """
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+        self.images = {}
+
+
+    def get(self, sprite_name, tile_size, rotation=0, color_on='#ff00dc', color_off='#010001', entity=None):
+        """
+        Gets a sprite scaled to the tile size and rotated, building it if it is not cached.
+        If the file is missing, uses a fallback texture.
+
+        Args:
+            sprite_name (str): Name of the sprite file (e.g., "red.png").
+            tile_size (int): Size of the tile in pixels.
+            rotation (int, optional): Rotation in degrees (counterclockwise). Default is 0.
+            color_on (str, optional): First color of the fallback texture. Default is '#ff00dc'.
+            color_off (str, optional): Second color of the fallback texture. Default is '#010001'.
+            entity (Entity, optional): Entity the sprite is drawn for (terminal colors). Default is None.
+
+        Returns:
+            pygame.Surface: The sprite.
+        """
+        colors = sprite_colors(sprite_name, entity)
+        key = (sprite_name, tile_size, colors, rotation)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+
+        image = self.images.get((sprite_name, colors))
+        if image is None:
+            try:
+                image = _load_image(sprite_name, colors)
+                if pygame.display.get_surface() is not None:
+                    image = image.convert_alpha()  # Same pixel format as the screen, for faster blits
+                self.images[(sprite_name, colors)] = image
+            except Exception as e:
+                logging.error(f"Error loading sprite {sprite_name}: {e}")
+                image = missing_texture_pygame(tile_size, tile_size, color_on, color_off)
+
+        sprite = pygame.transform.rotate(pygame.transform.scale(image, (tile_size, tile_size)), rotation)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+        return sprite
+
+
+    def clear(self):
+        """
+        Removes the scaled sprites. The original size images are kept, as they do not depend on the tile size.
+        """
+        self.sprites.clear()
+
+
+# Global instance
+sprite_cache = SpriteCache()
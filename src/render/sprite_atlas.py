@@ -0,0 +1,202 @@
+"""
+Sprite atlas module.
+Packs the level sprites of res/sprites, already scaled to a tile size and rotated in the four directions, into a single
+atlas image per tile size, together with a manifest mapping each sprite (entity state) and rotation to its rect in the atlas.
+Atlases are cached on disk under a hash of their content, so they are only rebuilt when a sprite changes, and
+can be built offline with tools/build_atlas.py.
+
+Classes:
+    SpriteAtlas: Atlas image and manifest of one tile size.
+
+Methods:
+    atlas_hash(tile_size, sprites_folder=SPRITES_FOLDER): Gets the content hash of the atlas of a tile size.
+    build_atlas(tile_size, sprites_folder=SPRITES_FOLDER): Builds the atlas of a tile size from the sprite files.
+    load_atlas(tile_size, sprites_folder=SPRITES_FOLDER, cache_folder=ATLAS_FOLDER): Loads the atlas of a tile size from the disk cache, building it if needed.
+"""
+
+import os
+import json
+import logging
+import hashlib
+import pygame
+from src.render.render_sprite import SPRITES_FOLDER
+
+ATLAS_FOLDER = "data/cache/atlas/"  # Disk cache of the built atlases
+ATLAS_VERSION = 1  # Bump when the atlas layout changes, to invalidate the cached atlases
+ATLAS_COLUMNS = 8  # Cells per atlas row
+ROTATIONS = (0, 90, 180, 270)  # Rotation of each direction (N, W, S, E)
+
+# Sprites drawn on the level. Terminal sprites are not packed, as they are recolored for each entity.
+ATLAS_SPRITES = (
+    "blue.png", "camera.png", "chargepad.png", "collectable.png", "collectable_air.png",
+    "crate.png", "crate_small.png", "cratedel.png", "cratedel_on.png",
+    "crategen.png", "crategen_empty.png", "crategen_on.png",
+    "crategen_small.png", "crategen_small_empty.png", "crategen_small_on.png",
+    "green.png", "green_small.png", "red.png", "red_big.png", "red_small.png", "trap.png", "trap_on.png",
+)
+
+
+class SpriteAtlas:
+    """
+    Atlas image of the level sprites at one tile size, with the rect of each sprite and rotation.
+
+    Attributes:
+        tile_size (int): Size of each sprite in pixels.
+        surface (pygame.Surface): Atlas image.
+        rects (dict): (sprite name, rotation) -> pygame.Rect of the sprite in the atlas.
+
+    Methods:
+        region(sprite_name, rotation=0): Gets the rect of a sprite in the atlas.
+        manifest(): Gets the manifest of the atlas, as saved to disk.
+
+    Example:
+        atlas = load_atlas(64)
+        screen.blit(atlas.surface, (0, 0), atlas.region("red.png", 90))
+    """
+    def __init__(self, tile_size, surface, manifest):
+        """
+        Initializes the atlas.
+
+        Args:
+            tile_size (int): Size of each sprite in pixels.
+            surface (pygame.Surface): Atlas image.
+            manifest (dict): Sprite name -> {rotation (str): [x, y, width, height]}.
+        """
+        self.tile_size = tile_size
+        self.surface = surface
+        self.rects = {
+            (sprite_name, int(rotation)): pygame.Rect(rect)
+            for sprite_name, rotations in manifest.items()
+            for rotation, rect in rotations.items()
+        }
+
+
+    def region(self, sprite_name, rotation=0):
+        """
+        Gets the rect of a sprite in the atlas.
+
+        Args:
+            sprite_name (str): Name of the sprite file (e.g., "red.png").
+            rotation (int, optional): Rotation in degrees (counterclockwise). Default is 0.
+
+        Returns:
+            pygame.Rect: Rect of the sprite, or None if it is not in the atlas.
+        """
+        return self.rects.get((sprite_name, rotation))
+
+
+    def manifest(self):
+        """
+        Gets the manifest of the atlas, as saved to disk.
+
+        Returns:
+            dict: Sprite name -> {rotation (str): [x, y, width, height]}.
+        """
+        manifest = {}
+        for (sprite_name, rotation), rect in self.rects.items():
+            manifest.setdefault(sprite_name, {})[str(rotation)] = list(rect)
+        return manifest
+
+
+def atlas_hash(tile_size, sprites_folder=SPRITES_FOLDER):
+    """
+    Gets the content hash of the atlas of a tile size, from the layout version and the bytes of the packed sprites.
+
+    Args:
+        tile_size (int): Size of each sprite in pixels.
+        sprites_folder (str, optional): Folder of the sprite files. Default is SPRITES_FOLDER.
+
+    Returns:
+        str: Hexadecimal SHA-256 hash.
+    """
+    digest = hashlib.sha256(f"{ATLAS_VERSION}:{tile_size}:{ATLAS_COLUMNS}:{ROTATIONS}".encode())
+    for sprite_name in ATLAS_SPRITES:
+        digest.update(sprite_name.encode())
+        try:
+            with open(os.path.join(sprites_folder, sprite_name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"missing")  # Missing sprites are left out of the atlas
+    return digest.hexdigest()
+
+
+def build_atlas(tile_size, sprites_folder=SPRITES_FOLDER):
+    """
+    Builds the atlas of a tile size from the sprite files. Sprites that cannot be loaded are left out,
+    so they fall back to the sprite cache (and its missing texture) when drawn.
+
+    Args:
+        tile_size (int): Size of each sprite in pixels.
+        sprites_folder (str, optional): Folder of the sprite files. Default is SPRITES_FOLDER.
+
+    Returns:
+        SpriteAtlas: The atlas.
+    """
+    sprites = []
+    for sprite_name in ATLAS_SPRITES:
+        try:
+            image = pygame.image.load(os.path.join(sprites_folder, sprite_name))
+        except (OSError, pygame.error) as e:
+            logging.error(f"Error loading sprite {sprite_name} for the atlas: {e}")
+            continue
+        sprites.append((sprite_name, pygame.transform.scale(image, (tile_size, tile_size))))
+
+    cells = len(sprites) * len(ROTATIONS)
+    rows = max((cells + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS, 1)
+    surface = pygame.Surface((ATLAS_COLUMNS * tile_size, rows * tile_size), pygame.SRCALPHA)  # Fully transparent
+    manifest = {}
+    cell = 0
+    for sprite_name, sprite in sprites:
+        # Max blending over the transparent atlas copies per-pixel alpha sprites as they are, while a plain blit
+        # copies opaque (palette) sprites skipping their colorkey
+        flags = pygame.BLEND_RGBA_MAX if sprite.get_flags() & pygame.SRCALPHA else 0
+        for rotation in ROTATIONS:
+            position = ((cell % ATLAS_COLUMNS) * tile_size, (cell // ATLAS_COLUMNS) * tile_size)
+            surface.blit(pygame.transform.rotate(sprite, rotation), position, special_flags=flags)
+            manifest.setdefault(sprite_name, {})[str(rotation)] = [position[0], position[1], tile_size, tile_size]
+            cell += 1
+    return SpriteAtlas(tile_size, surface, manifest)
+
+
+def load_atlas(tile_size, sprites_folder=SPRITES_FOLDER, cache_folder=ATLAS_FOLDER):
+    """
+    Loads the atlas of a tile size from the disk cache. If there is no cached atlas for the current content hash,
+    it is built and saved to the cache (a failed save only logs a warning).
+
+    Args:
+        tile_size (int): Size of each sprite in pixels.
+        sprites_folder (str, optional): Folder of the sprite files. Default is SPRITES_FOLDER.
+        cache_folder (str, optional): Folder of the cached atlases. Default is ATLAS_FOLDER.
+
+    Returns:
+        SpriteAtlas: The atlas.
+    """
+    content_hash = atlas_hash(tile_size, sprites_folder)
+    base_path = os.path.join(cache_folder, f"atlas_{tile_size}_{content_hash[:16]}")
+
+    try:
+        with open(f"{base_path}.json", "r") as f:
+            manifest = json.load(f)
+        if manifest.get("hash") == content_hash:
+            surface = pygame.image.load(f"{base_path}.png")
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()  # Same pixel format as the screen, for faster blits
+            return SpriteAtlas(tile_size, surface, manifest["sprites"])
+        logging.warning(f"Cached atlas {base_path} does not match its content hash. Rebuilding it.")
+    except FileNotFoundError:
+        logging.debug(f"No cached atlas for tile size {tile_size}. Building it.")
+    except (json.JSONDecodeError, KeyError, OSError, pygame.error) as e:
+        logging.warning(f"Cached atlas {base_path} is corrupted: {e}. Rebuilding it.")
+
+    atlas = build_atlas(tile_size, sprites_folder)
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        pygame.image.save(atlas.surface, f"{base_path}.png")
+        with open(f"{base_path}.json", "w") as f:
+            json.dump({"hash": content_hash, "tile_size": tile_size, "sprites": atlas.manifest()}, f)
+    except (OSError, pygame.error) as e:
+        logging.warning(f"Could not save the atlas to the cache: {e}")
+
+    if pygame.display.get_surface() is not None:
+        atlas.surface = atlas.surface.convert_alpha()
+    return atlas
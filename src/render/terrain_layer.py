@@ -0,0 +1,147 @@
+"""
+Terrain layer module.
+The terrain (background image and walls) never changes while a level is played, so it is drawn once per tile size
+into chunk surfaces of CHUNK_TILES x CHUNK_TILES tiles, and each frame only blits the parts of the chunks in view.
+Tile entities that never move nor change their sprite (STATIC_KINDS) are drawn into the chunks too, so they are not
+drawn again every frame.
+
+Classes:
+    TerrainLayer: Pre-rendered terrain of a level, split in chunks.
+"""
+
+import pygame
+import numpy as np
+
+CHUNK_TILES = 16  # Width and height of a chunk, in tiles
+STATIC_KINDS = ("chargepad",)  # Tile entities drawn with the terrain (traps and crate generators/deletors change sprite)
+
+
+class TerrainLayer:
+    """
+    Pre-rendered terrain of a level at one tile size, split in square chunks that are built the first time they are seen.
+
+    Attributes:
+        level (Level): Level the terrain belongs to.
+        tile_size (int): Size of each tile in pixels.
+        chunk_tiles (int): Width and height of a chunk, in tiles.
+        chunks (dict): (chunk x, chunk y) -> pygame.Surface with the terrain of the chunk.
+        scaled_images (dict): id of a tile image -> the image scaled to the tile size (the level keeps the images alive).
+        entity_sprite (function): Gets the (surface, area) to draw a static entity with (None to draw no entities).
+        static_mask (numpy.ndarray): (height, width) boolean mask of the tiles whose tile entity is drawn into the chunks.
+
+    Methods:
+        _build_chunk(chunk_x, chunk_y): Draws the tiles of a chunk into a new surface.
+        draw(screen, first_x, first_y, tiles_x, tiles_y, screen_x, screen_y): Draws the terrain of a range of tiles.
+
+    Example:
+        terrain = TerrainLayer(level, 64, entity_sprite=lambda entity: (sprite, None))
+        terrain.draw(screen, 0, 0, 9, 9, 100, 20)
+    """
+    def __init__(self, level, tile_size, entity_sprite=None, chunk_tiles=CHUNK_TILES):
+        """
+        Initializes the terrain layer, without building any chunk yet.
+
+        Args:
+            level (Level): Level the terrain belongs to.
+            tile_size (int): Size of each tile in pixels.
+            entity_sprite (function, optional): Gets the (surface, area) to draw a static tile entity with, area being
+                None to draw the whole surface. Default is None (static entities are not drawn into the chunks).
+            chunk_tiles (int, optional): Width and height of a chunk, in tiles. Default is CHUNK_TILES.
+        """
+        self.level = level
+        self.tile_size = tile_size
+        self.chunk_tiles = chunk_tiles
+        self.chunks = {}
+        self.scaled_images = {}
+        self.entity_sprite = entity_sprite
+
+        self.static_mask = np.zeros((level.height, level.width), dtype=bool)
+        if entity_sprite is not None:
+            for kind in STATIC_KINDS:
+                self.static_mask |= level.grid.kind_mask(kind, 0)
+
+
+    def _build_chunk(self, chunk_x, chunk_y):
+        """
+        Draws the tiles of a chunk, and then its static tile entities, into a new surface
+        (chunks on the right and bottom edges may be smaller).
+
+        Args:
+            chunk_x (int): X coordinate of the chunk, in chunks.
+            chunk_y (int): Y coordinate of the chunk, in chunks.
+
+        Returns:
+            pygame.Surface: The chunk.
+        """
+        first_x = chunk_x * self.chunk_tiles
+        first_y = chunk_y * self.chunk_tiles
+        last_x = min(first_x + self.chunk_tiles, self.level.width)
+        last_y = min(first_y + self.chunk_tiles, self.level.height)
+
+        chunk = pygame.Surface(((last_x - first_x) * self.tile_size, (last_y - first_y) * self.tile_size))  # Black, as the screen
+        for y in range(first_y, last_y):
+            for x in range(first_x, last_x):
+                image = self.level.img_mtx[y][x]
+                tile_sprite = self.scaled_images.get(id(image))  # Repeated tiles share their image, scale it once
+                if tile_sprite is None:
+                    if image.get_size() == (self.tile_size, self.tile_size):
+                        tile_sprite = image
+                    else:
+                        tile_sprite = pygame.transform.scale(image, (self.tile_size, self.tile_size))
+                    self.scaled_images[id(image)] = tile_sprite
+                chunk.blit(tile_sprite, ((x - first_x) * self.tile_size, (y - first_y) * self.tile_size))
+
+        ys, xs = np.nonzero(self.static_mask[first_y:last_y, first_x:last_x])
+        for y, x in zip(ys.tolist(), xs.tolist()):
+            entity = self.level.grid.entity_at(first_x + x, first_y + y, 0)
+            if entity is not None:  # Anonymous entities (see LevelGrid.place_many) have nothing to draw
+                sprite, area = self.entity_sprite(entity)
+                chunk.blit(sprite, (x * self.tile_size, y * self.tile_size), area)
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()  # Same pixel format as the screen, for faster blits
+        return chunk
+
+
+    def draw(self, screen, first_x, first_y, tiles_x, tiles_y, screen_x, screen_y):
+        """
+        Draws the terrain of a range of tiles. Tiles out of the level are left untouched.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            first_x (int): X coordinate of the first tile of the range (can be out of the level).
+            first_y (int): Y coordinate of the first tile of the range (can be out of the level).
+            tiles_x (int): Number of tiles of the range in the x-axis.
+            tiles_y (int): Number of tiles of the range in the y-axis.
+            screen_x (int): Screen x coordinate of the first tile.
+            screen_y (int): Screen y coordinate of the first tile.
+        """
+        # Range of tiles inside the level
+        start_x = max(first_x, 0)
+        start_y = max(first_y, 0)
+        end_x = min(first_x + tiles_x, self.level.width)
+        end_y = min(first_y + tiles_y, self.level.height)
+        if start_x >= end_x or start_y >= end_y:
+            return
+
+        for chunk_y in range(start_y // self.chunk_tiles, (end_y - 1) // self.chunk_tiles + 1):
+            for chunk_x in range(start_x // self.chunk_tiles, (end_x - 1) // self.chunk_tiles + 1):
+                chunk = self.chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    chunk = self.chunks[(chunk_x, chunk_y)] = self._build_chunk(chunk_x, chunk_y)
+
+                # Part of the chunk inside the range, in tiles
+                chunk_first_x = chunk_x * self.chunk_tiles
+                chunk_first_y = chunk_y * self.chunk_tiles
+                part_x = max(start_x, chunk_first_x)
+                part_y = max(start_y, chunk_first_y)
+                part_end_x = min(end_x, chunk_first_x + self.chunk_tiles)
+                part_end_y = min(end_y, chunk_first_y + self.chunk_tiles)
+
+                area = pygame.Rect(
+                    (part_x - chunk_first_x) * self.tile_size,
+                    (part_y - chunk_first_y) * self.tile_size,
+                    (part_end_x - part_x) * self.tile_size,
+                    (part_end_y - part_y) * self.tile_size
+                )
+                position = (screen_x + (part_x - first_x) * self.tile_size, screen_y + (part_y - first_y) * self.tile_size)
+                screen.blit(chunk, position, area)
@@ -7,20 +7,45 @@ Classes:
     GameManager: Manages the game state, including loading levels, handling robot scripts, and updating the game world. 
 """
 
-import os
 import pygame
 import logging
-from src.level.load_level import load_level
+import threading
+import functools
+from src.level.level_cache import level_cache
+from src.storage.script_store import script_store
+from src.level.grid import LAYERS
+from src.level.snapshot import take_snapshot
 from src.script.parser import parse_code
 from src.script.ast_nodes import *
 from src.script.interpreter import CoroutineInterpreter
+from src.script.simulation_thread import SimulationThread
 from src.entities.crate import Crate
 from src.render.error_handler import error_handler, ErrorLevel
 from src.render.sound_manager import sound_manager
 
-LEVEL_FOLDER = "data/level/"  # Folder where the levels are stored
-PLAYER_SCRIPTS = "script/"
 TRAP_DELAY_DEFAULT = 1  # Default delay for traps (in ticks)
+TICK_SEQUENTIAL = "sequential"  # Each robot runs its action in turn, in script order
+TICK_INTENTS = "intents"  # Robots emit intents, the level resolves them together (see Level.resolve_intents())
+TICK_MODES = (TICK_SEQUENTIAL, TICK_INTENTS)
+FRAMES_PER_STEP = 30  # Frames between simulation steps when the simulation runs in the main loop
+
+
+def synchronized(method):
+    """
+    Decorator running a GameManager method while holding its lock, so the simulation thread
+    never steps the level while the UI loads, resets or changes it.
+
+    Args:
+        method (function): Method to wrap.
+
+    Returns:
+        function: The wrapped method.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class GameManager:
@@ -35,11 +60,17 @@ class GameManager:
         camera_robot (str): The robot that the camera is over.
         trap_delay (int): Delay for traps.
         coroutines (dict): Dictionary of coroutines for each robot.
+        tick_mode (str): How robot actions are run each tick (TICK_SEQUENTIAL or TICK_INTENTS).
+        pending_intents (dict): Robot -> ActionIntent waiting to be resolved on the next tick (intent mode).
         finished_robots (list): List of robots that have finished their scripts.
         success (bool): Whether the level was completed successfully.
         steps_taken (int): Number of steps taken in the level.
         completed (bool): Whether the level was completed.
         needs_ui_update (bool): Flag to indicate if the code UI needs to be updated.
+        state_version (int): Increased every time the level state changes (for the screen to know when to redraw it).
+        lock (threading.RLock): Held while the level state changes (simulation steps and UI actions).
+        simulation_thread (SimulationThread): Worker thread running the simulation, or None if it runs in the main loop.
+        snapshot (LevelSnapshot): Latest published level snapshot (only kept while the simulation thread runs).
 
     Methods:
         remove_from_list(entity): Removes an entity from the entity list.
@@ -55,15 +86,26 @@ class GameManager:
         compile_scripts(player_name): Compiles scripts for all robots in the level.
         check_completion(): Checks if the level is completed based on objectives and robot statuses.
         calculate_score(): Calculates the score based on completed objectives and steps taken.
-        tick(): Updates the game state, including robot movements and objective checks.
+        tick(): Counts frames, running a simulation step every FRAMES_PER_STEP frames.
+        step(): Runs one simulation step, including robot movements and objective checks.
+        start_simulation_thread(steps_per_second): Runs the simulation on a worker thread instead of the main loop.
+        stop_simulation_thread(): Stops the simulation thread, returning the simulation to the main loop.
 
     Example:
-        game_manager = GameManager()
+        game_manager = GameManager(tick_mode=TICK_INTENTS)
     """
-    def __init__(self):
+    def __init__(self, tick_mode=TICK_SEQUENTIAL):
         """
         Initializes the GameManager with default values.
+
+        Args:
+            tick_mode (str, optional): How robot actions are run each tick. TICK_SEQUENTIAL runs them in script order
+                (the first action when the game starts); TICK_INTENTS resolves them together on the next step, so every
+                action runs one step later than in sequential mode. Default is TICK_SEQUENTIAL.
         """
+        if tick_mode not in TICK_MODES:
+            logging.error(f"Unknown tick mode {tick_mode!r}, using {TICK_SEQUENTIAL!r}.")
+            tick_mode = TICK_SEQUENTIAL
         self.current_level = None
         self.level_folder = None
         self.is_running = False  # Whether the game is active (robots are moving)
@@ -71,11 +113,17 @@ class GameManager:
         self.camera_robot = None  # The robot that the camera is over
         self.trap_delay = TRAP_DELAY_DEFAULT  # Delay for traps
         self.coroutines = {}
+        self.tick_mode = tick_mode  # How robot actions are run each tick
+        self.pending_intents = {}  # Intents waiting for the next tick (intent mode)
         self.finished_robots = []  # List of finished robots
         self.success = True  # Whether the level was completed successfully (No errors or warnings happened)
         self.steps_taken = 0  # Number of steps taken in the level (for leaderboard purposes)
         self.completed = False  # Whether the level was completed
         self.needs_ui_update = False  # Flag to indicate if the code ui needs to be updated
+        self.state_version = 0  # Increased on every change of the level state
+        self.lock = threading.RLock()  # Held while the level state changes
+        self.simulation_thread = None  # Worker thread running the simulation (None = main loop)
+        self.snapshot = None  # Latest published level snapshot (simulation thread only)
 
         self.entity_list = {  # Store entities for easy updates
             'tile': [],
@@ -120,8 +168,8 @@ class GameManager:
 
     def update_entities(self):  # Scan the level for entities
         """
-        Updates the entity list.
-        WARNING: This method's overhead is massive. When making movements and changes, update the list instead of re-scanning.
+        Updates the entity list, reading the entity positions from the level grid.
+        WARNING: This method still scans the whole level. When making movements and changes, update the list instead of re-scanning.
         """
         if self.current_level:  # Reset the entity list
             self.entity_list = {
@@ -131,25 +179,26 @@ class GameManager:
                 'camera': []
             }
 
-            for x in range(self.current_level.width):
-                for y in range(self.current_level.height):
-                    tile = self.current_level.tiles[y][x]
-                    for key, entity in tile.entities.items():
-                        if entity:
-                            self.entity_list[key].append(entity)
+            grid = self.current_level.grid
+            for height, key in enumerate(LAYERS):
+                # Column order (x, then y), same order as the tiles were scanned before
+                for entity_id in grid.occupancy[height].T[grid.occupancy[height].T != 0]:
+                    self.entity_list[key].append(grid.entities[entity_id])
         else:
             logging.error("Cannot update entities without a level loaded")
 
 
+    @synchronized
     def load_level(self, level_folder):
         """
-        Loads a level from a folder.
+        Loads a level from a folder, as a copy of the pristine level kept by the level cache
+        (see src/level/level_cache.py), which loads it through the level pack if it is not cached.
         
         Args:
             level_folder (str): Folder name of the level.
         """
         logging.debug(f"Loading level: {level_folder}")
-        self.current_level = load_level(level_folder)
+        self.current_level = level_cache.get(level_folder)
 
         if self.current_level:
             logging.info(f"Level loaded")
@@ -169,13 +218,16 @@ class GameManager:
             self.trap_delay = TRAP_DELAY_DEFAULT  # Reset the trap delay
             self.finished_robots = []  # Reset the finished robots list
             self.coroutines = {}  # Reset the coroutines
+            self.pending_intents = {}  # Reset the pending intents
             self.success = True  # Reset the success flag
             self.steps_taken = 0  # Reset the steps taken
             self.completed = False  # Reset the completed flag
+            self._state_changed()
         else:
             logging.error(f"Failed to load level: {level_folder}")
 
 
+    @synchronized
     def start_game(self, player_name):
         """
         Starts the game, enabing robot movement.
@@ -187,11 +239,13 @@ class GameManager:
             self.is_running = True
             self.frame_count = 0
             self.compile_scripts(player_name)
+            self._state_changed()  # The first action runs when compiling
             sound_manager.play("play", fade_ms=500)
         else:
             logging.error("Cannot start game without a level loaded")
 
 
+    @synchronized
     def reset_level(self):
         """
         Resets the current level, resetting all entities to their original positions and pausing the game.
@@ -203,6 +257,7 @@ class GameManager:
         sound_manager.play("think", fade_ms=500)
 
 
+    @synchronized
     def exit_to_menu(self):
         """
         Exits the game to the main menu.
@@ -213,6 +268,7 @@ class GameManager:
         logging.info("Exited to menu")
 
 
+    @synchronized
     def move_camera(self, direction):
         """
         Moves the camera in a direction.
@@ -225,11 +281,13 @@ class GameManager:
             camera_obj = self.current_level.tiles[camera_y][camera_x]
             self.current_level.move_entity(camera_obj.entities['camera'], direction)
             self.update_selected_robot()
+            self._state_changed()
             sound_manager.play("camera")  # Play camera move sound
         else:
             logging.error("Cannot move camera without a level loaded")
 
 
+    @synchronized
     def update_selected_robot(self):
         """
         Updates the selected robot.
@@ -255,32 +313,23 @@ class GameManager:
 
     def save_script(self, script, player_name):
         """
-        Save the current script to a file.
+        Save the current script to the script store (as a new revision, written in the background).
         """
         message = "Simulation running...\n\nScript editing is disabled."
         if self.camera_robot and self.is_running == False and script != message:  # Save only if the game is not running
-            # Create scripts folder if it doesn't exist
-            if not os.path.exists(os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS)):
-                os.makedirs(os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS))
-            file = os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS, f"{self.camera_robot}_{player_name}.sds")
-            with open(file, "w") as f:
-                f.write(script)
+            script_store.save(self.level_folder, self.camera_robot, player_name, script)
 
     
     def load_script(self, player_name):
         """
-        Load a script from a file.
+        Load a script from the script store.
         """
         script = ""
         if self.camera_robot:
-            if not os.path.exists(os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS)):
-                os.makedirs(os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS))
-            file = os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS, f"{self.camera_robot}_{player_name}.sds")
-            if os.path.exists(file):
-                with open(file, "r") as f:
-                    script = f.read()
+            script = script_store.load(self.level_folder, self.camera_robot, player_name)  # Cached in memory
+            if script is not None:
                 script = script.strip()  # Remove leading and trailing whitespace
-            return script
+            return script or ""
         else:
             logging.error("Cannot load script without a robot selected")
             return ""
@@ -302,20 +351,18 @@ class GameManager:
                 present_robots.append(robot)
         
         for robot in present_robots:
-            if not os.path.exists(os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS)):
-                os.makedirs(os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS))
-            file = os.path.join(LEVEL_FOLDER, self.level_folder, PLAYER_SCRIPTS, f"{robot.__class__.__name__.lower()}_{player_name}.sds")
-            if os.path.exists(file):
-                with open(file, "r") as f:
-                    script = f.read()
+            script = script_store.load(self.level_folder, robot.__class__.__name__.lower(), player_name)  # Cached in memory
+            if script is not None:
                 script = script.strip()
                 robot.script = script
 
                 try:
                     tree = parse_code(robot.script)
-                    interpteter = CoroutineInterpreter(self.current_level, robot)
+                    interpteter = CoroutineInterpreter(self.current_level, robot, intents=self.tick_mode == TICK_INTENTS)
                     coroutine = interpteter.run(tree)
-                    next(coroutine)
+                    first_intent = next(coroutine)  # Runs the first action (or gets its intent in intent mode)
+                    if first_intent is not None:
+                        self.pending_intents[robot] = first_intent
                     self.coroutines[robot] = coroutine
                     logging.debug(f"Coroutine for {robot.__class__.__name__} created")
                 except SyntaxError as e:
@@ -433,148 +480,204 @@ class GameManager:
     def tick(self):
         """
         Updates the game state. 
-        This method is called every frame to update the game logic, including robot movements, trap toggling, and objective checks.
-        Only triggers a "tick" every 30 frames (1 second at 30 FPS) if the game is running.
+        This method is called every frame and runs a simulation step every FRAMES_PER_STEP frames (0.5 seconds at 60 FPS)
+        if the game is running. It does nothing while the simulation thread runs the steps.
         """
+        if self.simulation_thread is not None:
+            return
         if self.is_running:
             self.frame_count += 1
-            if self.frame_count % 30 == 0:  # 60 for Every second, 30 is normal
-                occupied_chargepads = 0
-                active_terminals = 0
-                present_collectables = 0
-
-
-                # Step 0: Update trap delay (if larger than 0, decrease it, if 0 or under, reset it) and toggle traps
-                if self.trap_delay > 0:
-                    self.trap_delay -= 1
-                elif self.trap_delay <= 0:
-                    self.trap_delay = TRAP_DELAY_DEFAULT
-                else:
-                    logging.error("Trap delay is negative. Resetting to default.")
-                    self.trap_delay = TRAP_DELAY_DEFAULT
-                
-                sound_played = False
-                for tile_entity in self.entity_list['tile']:
-                    # Step 0.1: Toggle traps
-                    if tile_entity.__class__.__name__.lower() == "trap":
-                        if self.trap_delay <= 0:  # If the trap delay is 0, toggle the trap
-                            tile_entity.active = not tile_entity.active
-                            if tile_entity.active and not sound_played:
-                                sound_played = True
-                                sound_manager.play("trap_activate")
-                        # Check if a robot is above the trap, if trap is active, fail the level and reset
-                        if tile_entity.active and self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground'] is not None:
-                            if self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground'].__class__.__name__.lower() in ["red", "blue"]:
-                                logging.error("Robot stepped on a trap. Level failed.")
-                                error_handler.push_error(
-                                    "Execution Error",
-                                    f"Robot stepped on an active trap. Level failed.",
-                                    ErrorLevel.ERROR
-                                )
-                                self.reset_level()
-                                break
-                
-                # Step 1: Advance robot scripts (green > blue > red)
-                for robot, coroutine in self.coroutines.items():
-                    try:
-                        next(coroutine)  # Advance coroutine
-                    except StopIteration:
-                        if robot not in self.finished_robots:
-                            self.finished_robots.append(robot)
-                            logging.info(f"{robot.__class__.__name__} has finished its script.")
-                            error_handler.push_error(
-                                "Script Finished",
-                                f"{robot.__class__.__name__} has finished its script.",
-                                ErrorLevel.INFO
-                            )
-                    except Exception as e:
+            if self.frame_count % FRAMES_PER_STEP == 0:
+                self.step()
+        else:
+            self.frame_count = 0
+
+
+    @synchronized
+    def step(self):
+        """
+        Runs one simulation step: traps, robot scripts, tile entities and objective checks.
+        """
+        occupied_chargepads = 0
+        active_terminals = 0
+        present_collectables = 0
+
+
+        # Step 0: Update trap delay (if larger than 0, decrease it, if 0 or under, reset it) and toggle traps
+        if self.trap_delay > 0:
+            self.trap_delay -= 1
+        elif self.trap_delay <= 0:
+            self.trap_delay = TRAP_DELAY_DEFAULT
+        else:
+            logging.error("Trap delay is negative. Resetting to default.")
+            self.trap_delay = TRAP_DELAY_DEFAULT
+        
+        sound_played = False
+        for tile_entity in self.entity_list['tile']:
+            # Step 0.1: Toggle traps
+            if tile_entity.__class__.__name__.lower() == "trap":
+                if self.trap_delay <= 0:  # If the trap delay is 0, toggle the trap
+                    tile_entity.active = not tile_entity.active
+                    if tile_entity.active and not sound_played:
+                        sound_played = True
+                        sound_manager.play("trap_activate")
+                # Check if a robot is above the trap, if trap is active, fail the level and reset
+                if tile_entity.active and self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground'] is not None:
+                    if self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground'].__class__.__name__.lower() in ["red", "blue"]:
+                        logging.error("Robot stepped on a trap. Level failed.")
                         error_handler.push_error(
-                            f"Script Error: {robot.__class__.__name__}",
-                            f"{e}",
+                            "Execution Error",
+                            f"Robot stepped on an active trap. Level failed.",
                             ErrorLevel.ERROR
                         )
-                        logging.error(f"Error while executing robot script for {robot}: {e}")
-                        self.success = False
-
-                # Step 2: Update tile entities
-                for tile_entity in self.entity_list['tile']:
-                    # Step 2.1: Check chargepads
-                    if tile_entity.__class__.__name__.lower() == "chargepad":
-                        # If a robot is above them
-                        entity_above = self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground']
-                        if entity_above:
-                            if entity_above.__class__.__name__.lower() in ["red", "blue"]:
-                                occupied_chargepads += 1
-
-                    # Step 2.2: Check crate generators
-                    if tile_entity.__class__.__name__.lower() == "crategen":
-                        # If nothing is above them
-                        if self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground'] is None:
-                            new_crate = None
-                            if tile_entity.active:  # If the crate generator is active
-                                match tile_entity.crate_type:
-                                    case "small":
-                                        new_crate = Crate(tile_entity.x, tile_entity.y, 1, True)
-                                    case "big":
-                                        new_crate = Crate(tile_entity.x, tile_entity.y, 1, False)
-                                    case _:
-                                        new_crate = None
-                                tile_entity.active = False  # Deactivate the crate generator
+                        self.reset_level()
+                        break
+        
+        # Step 1: Advance robot scripts (green > blue > red)
+        # In intent mode, the intents of the previous step are resolved together first,
+        # and each script then runs with its result until its next intent
+        intents, self.pending_intents = self.pending_intents, {}
+        results = self.current_level.resolve_intents(intents) if intents else {}
+        for robot, coroutine in self.coroutines.items():
+            try:
+                intent = coroutine.send(results.get(robot))  # Advance coroutine
+                if intent is not None:
+                    self.pending_intents[robot] = intent
+            except StopIteration:
+                if robot not in self.finished_robots:
+                    self.finished_robots.append(robot)
+                    logging.info(f"{robot.__class__.__name__} has finished its script.")
+                    error_handler.push_error(
+                        "Script Finished",
+                        f"{robot.__class__.__name__} has finished its script.",
+                        ErrorLevel.INFO
+                    )
+            except Exception as e:
+                error_handler.push_error(
+                    f"Script Error: {robot.__class__.__name__}",
+                    f"{e}",
+                    ErrorLevel.ERROR
+                )
+                logging.error(f"Error while executing robot script for {robot}: {e}")
+                self.success = False
+
+        # Step 2: Update tile entities
+        for tile_entity in self.entity_list['tile']:
+            # Step 2.1: Check chargepads
+            if tile_entity.__class__.__name__.lower() == "chargepad":
+                # If a robot is above them
+                entity_above = self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground']
+                if entity_above:
+                    if entity_above.__class__.__name__.lower() in ["red", "blue"]:
+                        occupied_chargepads += 1
+
+            # Step 2.2: Check crate generators
+            if tile_entity.__class__.__name__.lower() == "crategen":
+                # If nothing is above them
+                if self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground'] is None:
+                    new_crate = None
+                    if tile_entity.active:  # If the crate generator is active
+                        match tile_entity.crate_type:
+                            case "small":
+                                new_crate = Crate(tile_entity.x, tile_entity.y, 1, True)
+                            case "big":
+                                new_crate = Crate(tile_entity.x, tile_entity.y, 1, False)
+                            case _:
+                                new_crate = None
+                        tile_entity.active = False  # Deactivate the crate generator
+                    else:
+                        tile_entity.active = True  # Activate the crate generator
+                    if new_crate and tile_entity.crate_count > 0:
+                        self.current_level.add_entity(new_crate)
+                        self.entity_list['ground'].append(new_crate)  # Add the crate to the entity list
+                        tile_entity.crate_count -= 1
+                        sound_manager.play("crate_spawn")  # Play crate spawn sound
+            
+            # Step 2.3: Check crate deletors
+            if tile_entity.__class__.__name__.lower() == "cratedel":
+                # If a crate is above them
+                entity_above = self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground']
+                if entity_above:
+                    if entity_above.__class__.__name__.lower() == "crate":
+                        if tile_entity.active:  # If the crate deletor is active
+                            # Delete the crate
+                            self.current_level.remove_entity(entity_above)
+                            sound_manager.play("crate_delete")  # Play crate delete sound
+
+                            # Update the completed objectives
+                            if entity_above.small:
+                                self.completed_objectives["crates_small"] += 1
                             else:
-                                tile_entity.active = True  # Activate the crate generator
-                            if new_crate and tile_entity.crate_count > 0:
-                                self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground'] = new_crate
-                                self.entity_list['ground'].append(new_crate)  # Add the crate to the entity list
-                                tile_entity.crate_count -= 1
-                                sound_manager.play("crate_spawn")  # Play crate spawn sound
-                    
-                    # Step 2.3: Check crate deletors
-                    if tile_entity.__class__.__name__.lower() == "cratedel":
-                        # If a crate is above them
-                        entity_above = self.current_level.tiles[tile_entity.y][tile_entity.x].entities['ground']
-                        if entity_above:
-                            if entity_above.__class__.__name__.lower() == "crate":
-                                if tile_entity.active:  # If the crate deletor is active
-                                    # Delete the crate
-                                    self.current_level.remove_entity(entity_above)
-                                    sound_manager.play("crate_delete")  # Play crate delete sound
-
-                                    # Update the completed objectives
-                                    if entity_above.small:
-                                        self.completed_objectives["crates_small"] += 1
-                                    else:
-                                        self.completed_objectives["crates_large"] += 1
-                                    tile_entity.active = False  # Deactivate the crate deletor
-                                else:
-                                    tile_entity.active = True  # Activate the crate deletor
-
-                # Step 3: Update ground entities
-                for ground_entity in self.entity_list['ground']:
-                    # Step 3.1: Check terminals
-                    if ground_entity.__class__.__name__.lower() == "inputter" and ground_entity.activated:
-                        active_terminals += 1
-
-                    # Step 3.2: Check collectables
-                    if ground_entity.__class__.__name__.lower() == "collectable":
-                        present_collectables += 1
-
-                # Step 4: Update air entities
-                for air_entity in self.entity_list['air']:
-                    # Step 4.1: Check collectables
-                    if air_entity.__class__.__name__.lower() == "collectable":
-                        present_collectables += 1
-
-                # Step 5: Update objectives
-                self.completed_objectives["charge_pads"] = occupied_chargepads
-                self.completed_objectives["terminals"] = active_terminals
-                collectables_picked = self.current_level.objectives["collectables"] - present_collectables
-                self.completed_objectives["collectables"] = collectables_picked
-
-                # Step 6: Increase steps taken
-                self.steps_taken += 1
-
-                # Step 7: Check if all robots finished execution and completion
-                self.completed = self.check_completion()
+                                self.completed_objectives["crates_large"] += 1
+                            tile_entity.active = False  # Deactivate the crate deletor
+                        else:
+                            tile_entity.active = True  # Activate the crate deletor
 
-        else:
-            self.frame_count = 0
+        # Step 3: Update ground entities
+        for ground_entity in self.entity_list['ground']:
+            # Step 3.1: Check terminals
+            if ground_entity.__class__.__name__.lower() == "inputter" and ground_entity.activated:
+                active_terminals += 1
+
+            # Step 3.2: Check collectables
+            if ground_entity.__class__.__name__.lower() == "collectable":
+                present_collectables += 1
+
+        # Step 4: Update air entities
+        for air_entity in self.entity_list['air']:
+            # Step 4.1: Check collectables
+            if air_entity.__class__.__name__.lower() == "collectable":
+                present_collectables += 1
+
+        # Step 5: Update objectives
+        self.completed_objectives["charge_pads"] = occupied_chargepads
+        self.completed_objectives["terminals"] = active_terminals
+        collectables_picked = self.current_level.objectives["collectables"] - present_collectables
+        self.completed_objectives["collectables"] = collectables_picked
+
+        # Step 6: Increase steps taken
+        self.steps_taken += 1
+
+        # Step 7: Check if all robots finished execution and completion
+        self.completed = self.check_completion()
+        self._state_changed()
+
+
+
+    def _state_changed(self):
+        """
+        Marks a change of the level state, publishing a new snapshot if the simulation thread runs.
+        """
+        self.state_version += 1
+        if self.simulation_thread is not None and self.current_level:
+            self.snapshot = take_snapshot(self.current_level, self.state_version)  # Atomic swap for the render thread
+
+
+    def start_simulation_thread(self, steps_per_second=SimulationThread.DEFAULT_STEPS_PER_SECOND):
+        """
+        Runs the simulation on a worker thread instead of the main loop. The screen then draws the published snapshots.
+
+        Args:
+            steps_per_second (float, optional): Simulation steps per second. Default is SimulationThread.DEFAULT_STEPS_PER_SECOND.
+        """
+        if self.simulation_thread is not None:
+            self.simulation_thread.steps_per_second = steps_per_second
+            return
+        with self.lock:
+            self.simulation_thread = SimulationThread(self, steps_per_second)
+            if self.current_level:
+                self.snapshot = take_snapshot(self.current_level, self.state_version)
+        self.simulation_thread.start()
+
+
+    def stop_simulation_thread(self):
+        """
+        Stops the simulation thread, returning the simulation to the main loop.
+        """
+        if self.simulation_thread is None:
+            return
+        self.simulation_thread.stop()
+        self.simulation_thread.join()
+        with self.lock:
+            self.simulation_thread = None
+            self.snapshot = None
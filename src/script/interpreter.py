@@ -3,12 +3,46 @@ Coroutine Interpreter module.
 This module defines the CoroutineInterpreter class, which is responsible for executing the scripts.
 
 Classes:
+    ActionIntent: An action a robot wants to perform, yielded instead of executed in intent mode.
     CoroutineInterpreter: The main interpreter class for executing scripts in a coroutine-like manner.
 """
 
 from src.script.ast_nodes import *
 
 
+class ActionIntent:
+    """
+    Action a robot wants to perform this tick. In intent mode the interpreter yields one of these
+    instead of running the action, and the result of the action is sent back into the coroutine.
+
+    Attributes:
+        name (str): Name of the action (e.g. "move").
+        args (list): Evaluated arguments of the action.
+    """
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name, args):
+        """
+        Initializes the intent.
+
+        Args:
+            name (str): Name of the action.
+            args (list): Evaluated arguments of the action.
+        """
+        self.name = name
+        self.args = args
+
+
+    def __repr__(self):
+        """
+        String representation of the intent.
+
+        Returns:
+            str: String representation of the intent.
+        """
+        return f"ActionIntent({self.name!r}, {self.args!r})"
+
+
 class CoroutineInterpreter:
     """
     Coroutine Interpreter for executing a script in a coroutine-like manner.
@@ -19,9 +53,11 @@ class CoroutineInterpreter:
         level (Level): The level where actions should be executed.
         entity (Entity): The entity (or robot) that will perform the actions.
         env_stack (list): Stack of environments for local variables and function calls.
+        intents (bool): Whether actions are yielded as ActionIntent objects instead of being executed.
+        action_map (dict): Action name -> function running the action in the level for the entity.
 
     Methods:
-        __init__(self, level, entity): Initializes the CoroutineInterpreter.
+        __init__(self, level, entity, intents=False): Initializes the CoroutineInterpreter.
         push_env(): Pushes a new environment onto the stack.
         pop_env(): Pops the current environment from the stack.
         current_env(): Gets the current environment (top of the stack).
@@ -36,7 +72,7 @@ class CoroutineInterpreter:
         interpreter = CoroutineInterpreter(level, entity)
     """
 
-    def __init__(self, level, entity):
+    def __init__(self, level, entity, intents=False):
         """
         Initialize the CoroutineInterpreter.
         This interpreter is responsible for executing the script
@@ -47,10 +83,23 @@ class CoroutineInterpreter:
         Args:
             level (Level): The level where actions should be executed.
             entity (Entity): The entity (or robot) that will perform the actions
+            intents (bool, optional): Yield actions as ActionIntent objects instead of executing them. Defaults to False.
         """
         self.level = level  # Level where actions should be executed
         self.entity = entity  # Robot that will perform the execution
         self.env_stack = [{}]  # Scope stack: one dict per frame
+        self.intents = intents  # Yield actions for the level to resolve in batch instead of running them
+        # Action name -> level call for this robot, built once instead of on every action
+        self.action_map = {
+            "move": lambda args: level.move(entity),
+            "turn": lambda args: level.turn(entity, *args),
+            "see": lambda args: level.see(entity),
+            "pickup": lambda args: level.pickup(entity),
+            "drop": lambda args: level.drop(entity),
+            "read": lambda args: level.read(entity),
+            "write": lambda args: level.write(entity, *args),
+            "wait": lambda args: level.wait(entity),
+        }
 
 
     def push_env(self):
@@ -186,6 +235,8 @@ class CoroutineInterpreter:
                         # If we get a generator, run it to completion
                         if hasattr(yielded, '__iter__'):
                             result = yield from yielded
+                        elif isinstance(yielded, ActionIntent):
+                            result = yield yielded  # Pass the intent up, its result comes back from the level
                         else:
                             result = yielded
                 except StopIteration as e:
@@ -325,7 +376,9 @@ class CoroutineInterpreter:
         """
         Evaluate an action node.
         This method maps the action name to the corresponding
-        method in the level and executes it.
+        method in the level and executes it. In intent mode, every
+        action except see() is yielded as an ActionIntent instead,
+        and the result sent back by the game manager is returned.
 
         Args:
             node (Action): The action node to evaluate.
@@ -333,17 +386,6 @@ class CoroutineInterpreter:
         Returns:
             The yielded result of the action execution.
         """
-        action_map = {
-        "move": lambda args: self.level.move(self.entity),
-        "turn": lambda args: self.level.turn(self.entity, *args),
-        "see": lambda args: self.level.see(self.entity),
-        "pickup": lambda args: self.level.pickup(self.entity),
-        "drop": lambda args: self.level.drop(self.entity),
-        "read": lambda args: self.level.read(self.entity),
-        "write": lambda args: self.level.write(self.entity, *args),
-        "wait": lambda args: self.level.wait(self.entity)
-        }
-
         evaluated_args = []
         for arg in node.args:
             if isinstance(arg, Node):
@@ -351,10 +393,14 @@ class CoroutineInterpreter:
             else:
                 evaluated_args.append(arg)
 
-        if node.name not in action_map:
+        action = self.action_map.get(node.name)
+        if action is None:
             raise RuntimeError(f"Unknown action: {node.name}")
 
-        result = action_map[node.name](evaluated_args)
+        if self.intents and node.name != "see":
+            return (yield ActionIntent(node.name, evaluated_args))  # Pause until the level resolves the tick
+
+        result = action(evaluated_args)
         
         # Don't yield on see()
         if node.name != "see":
@@ -0,0 +1,85 @@
+"""
+Simulation thread module.
+Runs the simulation steps of a GameManager on a worker thread at a fixed rate, so slow steps do not drop frames
+and slow frames do not slow the simulation down. After each step the game manager publishes an immutable
+snapshot of the level (see src/level/snapshot.py), which the screen draws without touching the live level.
+
+Classes:
+    SimulationThread: Worker thread running the simulation steps of a game manager.
+"""
+
+import time
+import logging
+import threading
+
+
+class SimulationThread(threading.Thread):
+    """
+    Worker thread running the simulation steps of a game manager while the game is running.
+    The first step runs one step interval after the game starts, as in the main loop.
+
+    Attributes:
+        game_manager (GameManager): Game manager whose steps are run.
+        steps_per_second (float): Simulation steps per second (can be changed while running).
+        stop_event (threading.Event): Set to stop the thread.
+
+    Methods:
+        run(): Thread body, running steps while the game is running until stopped.
+        stop(): Asks the thread to stop.
+
+    Example:
+        game_manager.start_simulation_thread(steps_per_second=8)
+    """
+    DEFAULT_STEPS_PER_SECOND = 2.0  # Same rate as the main loop (a step every 30 frames at 60 FPS)
+    IDLE_WAIT = 0.01  # Seconds between checks while the game is not running
+
+    def __init__(self, game_manager, steps_per_second=DEFAULT_STEPS_PER_SECOND):
+        """
+        Initializes the thread (it is started with start()).
+
+        Args:
+            game_manager (GameManager): Game manager whose steps are run.
+            steps_per_second (float, optional): Simulation steps per second. Default is DEFAULT_STEPS_PER_SECOND.
+        """
+        super().__init__(name="simulation", daemon=True)
+        self.game_manager = game_manager
+        self.steps_per_second = steps_per_second
+        self.stop_event = threading.Event()
+
+
+    def run(self):
+        """
+        Thread body. Runs a step every 1 / steps_per_second seconds while the game is running and not completed.
+        If steps fall behind (a step slower than the interval), the schedule restarts instead of running a burst of steps.
+        """
+        next_step = None  # Time of the next step, None while the game is not running
+        while not self.stop_event.is_set():
+            manager = self.game_manager
+            if not manager.is_running or manager.completed:
+                next_step = None
+                self.stop_event.wait(self.IDLE_WAIT)
+                continue
+
+            interval = 1.0 / self.steps_per_second
+            now = time.perf_counter()
+            if next_step is None:
+                next_step = now + interval
+            if now < next_step:
+                self.stop_event.wait(min(next_step - now, self.IDLE_WAIT))
+                continue
+
+            try:
+                manager.step()
+            except Exception as e:
+                logging.error(f"Error in simulation step: {e}")
+            next_step += interval
+            now = time.perf_counter()
+            if next_step < now:  # Fell behind, restart the schedule
+                next_step = now + interval
+
+
+    def stop(self):
+        """
+        Asks the thread to stop. It finishes the step it is running, if any.
+        """
+        self.stop_event.set()
@@ -0,0 +1,77 @@
+"""
+Database module.
+Opens the SQLite databases of the game (see score_store and script_store) so they can be shared by several game
+instances on a network drive: they use a rollback journal (not WAL, which needs shared memory that network drives
+do not provide) and take their write lock at the start of every write transaction, so concurrent instances wait for
+each other instead of corrupting the database or failing halfway through a write.
+
+Classes:
+    Transaction: Write transaction context manager.
+
+Methods:
+    connect(db_file, schema, schema_version): Opens a database, creating its tables if needed.
+"""
+
+import os
+import sqlite3
+
+BUSY_TIMEOUT = 10.0  # Seconds to wait for another game instance holding the write lock
+
+
+def connect(db_file, schema, schema_version):
+    """
+    Opens a database, creating its tables if it is new or its schema version is older. The connection is in autocommit
+    mode (write transactions are started with Transaction) and can be shared by threads, guarded by a lock.
+
+    Args:
+        db_file (str): Database file (its folder is created if needed).
+        schema (str): SQL script creating the tables and indexes (with IF NOT EXISTS).
+        schema_version (int): Version of the schema, stored as the database user_version.
+
+    Returns:
+        sqlite3.Connection: The database connection.
+    """
+    os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+    connection = sqlite3.connect(
+        db_file,
+        timeout=BUSY_TIMEOUT,
+        isolation_level=None,  # Transactions are started explicitly (see Transaction)
+        check_same_thread=False  # Shared by the threads, guarded by a lock
+    )
+    connection.execute("PRAGMA journal_mode = DELETE")
+    if connection.execute("PRAGMA user_version").fetchone()[0] != schema_version:
+        connection.executescript(f"BEGIN IMMEDIATE; {schema} PRAGMA user_version = {schema_version}; COMMIT;")
+    return connection
+
+
+class Transaction:
+    """
+    Write transaction context manager. The database write lock is taken right away, so concurrent game instances
+    wait for each other (up to BUSY_TIMEOUT) instead of failing when they upgrade a read to a write. The transaction
+    is committed on success and rolled back on errors.
+
+    Example:
+        with Transaction(connection) as db:
+            db.execute("INSERT INTO players (name) VALUES (?)", ("Ana",))
+    """
+    def __init__(self, connection):
+        """
+        Initializes the transaction.
+
+        Args:
+            connection (sqlite3.Connection): Connection in autocommit mode (see connect).
+        """
+        self.connection = connection
+
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")  # Take the write lock now
+        return self.connection
+
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
+        return False
@@ -0,0 +1,190 @@
+"""
+Persistence module.
+Runs the writes of the game (scripts, options and scores) on a background thread, so saving never blocks a frame,
+even with the data folder on a slow network drive. Writes are coalesced: a file written again before its previous
+write ran is only written once, with the last content. Files are written atomically (to a temporary file, synced and
+then renamed over the old one), so a crash never leaves a half written file.
+
+The pending writes are flushed when the game exits.
+
+Classes:
+    PersistenceWorker: Background writer with write coalescing.
+
+Objects:
+    persistence (PersistenceWorker): Global persistence worker instance.
+"""
+
+import os
+import atexit
+import logging
+import threading
+import itertools
+from collections import OrderedDict
+
+
+def write_atomic(path, text):
+    """
+    Writes a text file atomically: the text is written and synced to a temporary file that then replaces the file.
+
+    Args:
+        path (str): Path to the file (its folder is created if needed).
+        text (str): Content of the file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_file = f"{path}.tmp"
+    try:
+        with open(temp_file, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, path)
+    except OSError:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        raise
+
+
+class PersistenceWorker:
+    """
+    Background writer. Each write is queued under a key (kind, name); a write queued under the key of a write not
+    started yet replaces it, keeping its place in the queue. Writes run in queue order, one at a time.
+
+    Attributes:
+        pending (OrderedDict): Key -> (function, data) of the writes not started yet, in queue order.
+        active (dict): Key -> (function, data) of the write running.
+        condition (threading.Condition): Guards the queue and signals its changes.
+
+    Methods:
+        write_text(path, text): Queues a text file write.
+        submit(kind, function, *args, key=None): Queues a call to a function.
+        flush(kind=None, timeout=None): Waits for the queued writes to finish.
+        shutdown(): Flushes the queue and stops the worker thread.
+
+    Example:
+        persistence.write_text("data/options.json", json.dumps(options))
+        persistence.submit("scores", save_score, "1_First Steps", entry)
+        persistence.flush()
+    """
+    def __init__(self):
+        """
+        Initializes an empty queue. The worker thread is started with the first write.
+        """
+        self.pending = OrderedDict()
+        self.active = {}
+        self.condition = threading.Condition()
+        self.thread = None  # Worker thread, started on demand
+        self.stopping = False
+        self._ids = itertools.count()  # Keys of the writes that are never coalesced
+
+
+    def write_text(self, path, text):
+        """
+        Queues a text file write. A pending write of the same file is replaced.
+
+        Args:
+            path (str): Path to the file.
+            text (str): Content of the file.
+        """
+        self._queue(("file", os.path.normpath(path)), write_atomic, text)
+
+
+    def submit(self, kind, function, *args, key=None):
+        """
+        Queues a call to a function (for writes that are not files, such as database writes).
+
+        Args:
+            kind (str): Kind of write, to flush them separately (see flush).
+            function (function): Function to call on the worker thread.
+            *args: Arguments of the function.
+            key (hashable, optional): Key of the write; a pending call with the same kind and key is replaced.
+                Default is None (never replaced).
+        """
+        self._queue((kind, next(self._ids) if key is None else key), lambda _, args: function(*args), args)
+
+
+    def flush(self, kind=None, timeout=None):
+        """
+        Waits for the queued writes to finish.
+
+        Args:
+            kind (str, optional): Only wait for the writes of this kind. Default is None (all writes).
+            timeout (float, optional): Maximum time to wait in seconds. Default is None (no limit).
+
+        Returns:
+            bool: True if the writes finished, False if the timeout expired.
+        """
+        def done():
+            return not any(kind is None or key[0] == kind for key in itertools.chain(self.pending, self.active))
+
+        with self.condition:
+            return self.condition.wait_for(done, timeout)
+
+
+    def shutdown(self):
+        """
+        Flushes the queue and stops the worker thread (it is started again by a later write).
+        """
+        self.flush()
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.stopping = False
+
+
+    def _queue(self, key, function, data):
+        """
+        Queues a write, coalescing it with a pending write with the same key.
+
+        Args:
+            key (tuple): (kind, name) key of the write.
+            function (function): Function doing the write, called with the name and the data.
+            data (object): Data of the write.
+        """
+        with self.condition:
+            self.pending[key] = (function, data)  # A replaced write keeps its place in the queue
+            self.condition.notify_all()
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+            try:
+                self.thread.start()
+                return
+            except RuntimeError:  # No new threads while the game exits (writes queued by exit functions)
+                self.thread = None
+        self._run(until_empty=True)  # Write in the calling thread instead
+
+
+    def _run(self, until_empty=False):
+        """
+        Worker thread body: runs the queued writes in order until the worker is stopped.
+
+        Args:
+            until_empty (bool, optional): Whether to return once the queue is empty instead of waiting for more
+                writes. Default is False.
+        """
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.stopping or until_empty)
+                if not self.pending:  # Stopping (or done) with an empty queue
+                    return
+                key, job = self.pending.popitem(last=False)
+                self.active[key] = job
+
+            function, data = job
+            try:
+                function(key[1], data)
+            except Exception as e:
+                logging.error(f"Failed to save {key[0]} {key[1]}: {e}")
+            finally:
+                with self.condition:
+                    del self.active[key]
+                    self.condition.notify_all()
+
+
+persistence = PersistenceWorker()
+atexit.register(persistence.shutdown)  # Pending writes are never lost on exit
@@ -0,0 +1,453 @@
+"""
+Score store module.
+Keeps the leaderboards of every level and the progress of every player in a single SQLite database, instead of one
+leaderboard.json file per level (read, sorted and written whole on every submission) and one JSON file per player.
+Scores are indexed by level and rank, so submitting a score and reading the best scores of a level stay fast with
+tens of thousands of scores.
+
+Scores and progress changes are written in the background (see persistence). The progress of the players is kept in
+memory as well, so the level select gets the highest level of a player, including the scores still being written,
+without waiting for the database.
+
+The existing leaderboard.json and player files are imported into the store when it is opened. Each file is imported
+again when it changes (for example leaderboards copied from other machines), skipping the scores already stored.
+
+The database can be shared by several game instances on a network drive (see src.storage.database).
+
+Classes:
+    ScoreStore: SQLite store of the leaderboards and the player progress.
+
+Objects:
+    score_store (ScoreStore): Global score store instance.
+"""
+
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from src.level.load_level import DEFAULT_LEVEL_PATH
+from src.storage.database import connect, Transaction
+from src.storage.persistence import persistence
+
+STORE_FILE = "data/scores.db"
+PLAYER_FOLDER = "data/player"
+SCHEMA_VERSION = 1  # Stored as the database user_version
+DEFAULT_TOP_SIZE = 10  # Scores returned by top_scores by default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    level TEXT NOT NULL,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    steps_taken INTEGER NOT NULL,
+    collectables INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    UNIQUE (level, name, timestamp)
+);
+CREATE INDEX IF NOT EXISTS scores_rank ON scores (level, score, timestamp);
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY,
+    highest_level INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+"""
+
+SCORE_FIELDS = ("name", "score", "steps_taken", "collectables", "timestamp")
+
+
+class ScoreStore:
+    """
+    SQLite store of the leaderboards (scores by level folder name) and the player progress (highest level by player
+    name). The database is opened, created and fed the JSON files to import on first use. Every method can be called
+    from any thread; errors are logged and the methods fall back to empty results.
+
+    The progress of a player is read from the database once per run and then kept up to date in memory by the
+    submissions of this game instance.
+
+    Attributes:
+        db_file (str): Database file.
+        level_path (str): Folder containing the level folders (with the leaderboard.json files to import).
+        player_folder (str): Folder containing the player files to import.
+        connection (sqlite3.Connection): Open database connection (None until first used).
+        lock (threading.RLock): Guards the connection.
+        progress (dict): Player name -> highest level, for the players read from the database in this run.
+        raised (dict): Player name -> highest level submitted, for the players not read yet.
+        progress_lock (threading.Lock): Guards the progress (never held while the database is used).
+
+    Methods:
+        submit_score(level, entry, level_number=None): Adds a score to a leaderboard and updates the player progress.
+        top_scores(level, limit=DEFAULT_TOP_SIZE): Gets the best scores of a level.
+        count_scores(level): Gets the number of scores of a level.
+        get_highest_level(name): Gets the highest level completed by a player.
+        ensure_player(name): Creates the progress of a player if it does not exist.
+        reset_player(name): Resets the progress of a player.
+        import_json(): Imports the new or changed leaderboard and player files.
+        close(): Closes the database connection.
+
+    Example:
+        score_store.submit_score("1_First Steps", {"name": "Ana", "score": 120, "steps_taken": 40, "collectables": 100}, 1)
+        for entry in score_store.top_scores("1_First Steps"):
+            print(entry["name"], entry["score"])
+    """
+    def __init__(self, db_file=STORE_FILE, level_path=DEFAULT_LEVEL_PATH, player_folder=PLAYER_FOLDER):
+        """
+        Initializes the store. The database is opened on first use.
+
+        Args:
+            db_file (str, optional): Database file. Default is STORE_FILE.
+            level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+            player_folder (str, optional): Folder containing the player files. Default is PLAYER_FOLDER.
+        """
+        self.db_file = db_file
+        self.level_path = level_path
+        self.player_folder = player_folder
+        self.connection = None
+        self.lock = threading.RLock()
+        self.progress = {}
+        self.raised = {}
+        self.progress_lock = threading.Lock()
+
+
+    def submit_score(self, level, entry, level_number=None):
+        """
+        Adds a score to the leaderboard of a level and raises the highest level of the player. The player progress is
+        updated in memory right away; the score and the progress are written in the background, in one transaction.
+
+        Args:
+            level (str): Level folder name.
+            entry (dict): Score entry (name, score, steps_taken, collectables and optionally timestamp).
+            level_number (int, optional): Number of the completed level, to update the player progress. Default is None.
+        """
+        entry = {"timestamp": int(time.time()), **entry}
+        if level_number is not None:
+            self._raise_progress(entry["name"], int(level_number))
+        persistence.submit("scores", self._write_score, level, entry, level_number)
+
+
+    def top_scores(self, level, limit=DEFAULT_TOP_SIZE):
+        """
+        Gets the best scores of a level (lowest score first, older first on ties).
+
+        Args:
+            level (str): Level folder name.
+            limit (int, optional): Maximum number of scores. Default is DEFAULT_TOP_SIZE.
+
+        Returns:
+            list: Score entries (name, score, steps_taken, collectables and timestamp), best first.
+        """
+        try:
+            with self.lock:
+                rows = self._connect().execute(
+                    f"SELECT {', '.join(SCORE_FIELDS)} FROM scores WHERE level = ? ORDER BY score, timestamp LIMIT ?",
+                    (level, limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to read leaderboard of {level}: {e}")
+            return []
+        return [dict(zip(SCORE_FIELDS, row)) for row in rows]
+
+
+    def count_scores(self, level):
+        """
+        Gets the number of scores of a level.
+
+        Args:
+            level (str): Level folder name.
+
+        Returns:
+            int: Number of scores.
+        """
+        try:
+            with self.lock:
+                return self._connect().execute("SELECT COUNT(*) FROM scores WHERE level = ?", (level,)).fetchone()[0]
+        except sqlite3.Error as e:
+            logging.error(f"Failed to count scores of {level}: {e}")
+            return 0
+
+
+    def get_highest_level(self, name):
+        """
+        Gets the highest level completed by a player, including the scores not written yet. Only the first call for
+        a player reads the database.
+
+        Args:
+            name (str): Player name.
+
+        Returns:
+            int: Highest level completed, or None if the player has no progress.
+        """
+        with self.progress_lock:
+            if name in self.progress:
+                return self.progress[name]
+        stored = self._read_highest_level(name)
+        with self.progress_lock:
+            if name not in self.progress:  # Not read or reset meanwhile
+                levels = [level for level in (stored, self.raised.pop(name, None)) if level is not None]
+                if not levels:
+                    return None
+                self.progress[name] = max(levels)
+            return self.progress[name]
+
+
+    def ensure_player(self, name):
+        """
+        Creates the progress of a player (no level completed) if it does not exist. Written in the background.
+
+        Args:
+            name (str): Player name.
+        """
+        self._raise_progress(name, 0)
+        persistence.submit("scores", self._write_player, name)
+
+
+    def reset_player(self, name):
+        """
+        Resets the progress of a player (no level completed). The scores of the player are kept. The progress is
+        reset in memory right away and written in the background.
+
+        Args:
+            name (str): Player name.
+        """
+        with self.progress_lock:
+            self.progress[name] = 0
+            self.raised.pop(name, None)
+        persistence.submit("scores", self._write_reset, name)
+
+
+    def import_json(self):
+        """
+        Imports the leaderboard.json files of the level folders and the player files that are new or changed since
+        they were last imported. Scores already in the store (same level, name and timestamp) are skipped, and the
+        highest level of a player is only ever raised.
+        """
+        sources = []
+        if os.path.isdir(self.level_path):
+            for folder in os.listdir(self.level_path):
+                sources.append((os.path.join(self.level_path, folder, "leaderboard.json"), folder))
+        if os.path.isdir(self.player_folder):
+            for file in os.listdir(self.player_folder):
+                if file.endswith(".json"):
+                    sources.append((os.path.join(self.player_folder, file), None))
+
+        with self.lock:
+            db = self._connect()
+            imported = dict(db.execute("SELECT source, mtime FROM imports"))
+            changed = []
+            for path, level in sources:
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                source = os.path.normpath(path)
+                if imported.get(source) != mtime:
+                    changed.append((path, level, source, mtime))
+            if not changed:
+                return
+
+            with self._transaction() as db:
+                for path, level, source, mtime in changed:
+                    data = self._read_json(path)
+                    if level is not None:
+                        self._import_leaderboard(db, level, data)
+                    elif isinstance(data, dict):
+                        name = os.path.splitext(os.path.basename(path))[0]
+                        db.execute("INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+                        if isinstance(data.get("highest_level"), int):
+                            self._raise_level(db, name, data["highest_level"])
+                    db.execute("INSERT OR REPLACE INTO imports (source, mtime) VALUES (?, ?)", (source, mtime))
+            logging.info(f"Imported {len(changed)} leaderboard and player files into {self.db_file}")
+
+
+    def close(self):
+        """
+        Closes the database connection (it is opened again if the store is used afterwards).
+        """
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+    def _write_score(self, level, entry, level_number):
+        """
+        Writes a score and raises the highest level of the player (worker thread body of submit_score).
+
+        Args:
+            level (str): Level folder name.
+            entry (dict): Score entry, with its timestamp.
+            level_number (int): Number of the completed level, or None.
+        """
+        try:
+            with self.lock, self._transaction() as db:
+                db.execute(
+                    "INSERT OR IGNORE INTO scores (level, name, score, steps_taken, collectables, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (level, *(entry[field] for field in SCORE_FIELDS))
+                )
+                if level_number is not None:
+                    self._raise_level(db, entry["name"], level_number)
+        except sqlite3.Error as e:
+            logging.error(f"Failed to save score for {level}: {e}")
+
+
+    def _read_highest_level(self, name):
+        """
+        Reads the highest level completed by a player from the database.
+
+        Args:
+            name (str): Player name.
+
+        Returns:
+            int: Highest level completed, or None if the player has no progress.
+        """
+        try:
+            with self.lock:
+                row = self._connect().execute("SELECT highest_level FROM players WHERE name = ?", (name,)).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to read progress of {name}: {e}")
+            return None
+        return row[0] if row else None
+
+
+    def _write_player(self, name):
+        """
+        Writes the progress of a player (no level completed) if it does not exist (worker thread body of ensure_player).
+
+        Args:
+            name (str): Player name.
+        """
+        try:
+            with self.lock, self._transaction() as db:
+                db.execute("INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+        except sqlite3.Error as e:
+            logging.error(f"Failed to create progress of {name}: {e}")
+
+
+    def _write_reset(self, name):
+        """
+        Writes the reset progress of a player (worker thread body of reset_player).
+
+        Args:
+            name (str): Player name.
+        """
+        try:
+            with self.lock, self._transaction() as db:
+                db.execute(
+                    "INSERT INTO players (name, highest_level) VALUES (?, 0) "
+                    "ON CONFLICT (name) DO UPDATE SET highest_level = 0",
+                    (name,)
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Failed to reset progress of {name}: {e}")
+
+
+    def _connect(self):
+        """
+        Gets the database connection, opening the database (creating its tables and importing the JSON files)
+        on first use. Call with the lock held.
+
+        Returns:
+            sqlite3.Connection: The database connection.
+        """
+        if self.connection is None:
+            self.connection = connect(self.db_file, SCHEMA, SCHEMA_VERSION)
+            try:
+                self.import_json()
+            except sqlite3.Error as e:
+                logging.error(f"Failed to import leaderboard and player files: {e}")
+        return self.connection
+
+
+    def _raise_progress(self, name, level_number):
+        """
+        Raises the highest level of a player in memory (it is never lowered).
+
+        Args:
+            name (str): Player name.
+            level_number (int): Completed level number (0 to only create the progress).
+        """
+        with self.progress_lock:
+            progress = self.progress if name in self.progress else self.raised
+            progress[name] = max(progress.get(name, 0), level_number)
+
+
+    def _transaction(self):
+        """
+        Starts a write transaction (see Transaction).
+
+        Returns:
+            Transaction: Context manager committing the transaction on success and rolling it back on errors.
+        """
+        return Transaction(self._connect())
+
+
+    @staticmethod
+    def _raise_level(db, name, level_number):
+        """
+        Raises the highest level of a player (it is never lowered).
+
+        Args:
+            db (sqlite3.Connection): Database connection, inside a transaction.
+            name (str): Player name.
+            level_number (int): Completed level number.
+        """
+        db.execute(
+            "INSERT INTO players (name, highest_level) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET highest_level = MAX(highest_level, excluded.highest_level)",
+            (name, int(level_number))
+        )
+
+
+    @staticmethod
+    def _import_leaderboard(db, level, leaderboard):
+        """
+        Imports the entries of a leaderboard file, skipping invalid entries and scores already stored.
+
+        Args:
+            db (sqlite3.Connection): Database connection, inside a transaction.
+            level (str): Level folder name.
+            leaderboard (list): Entries read from the leaderboard file.
+        """
+        if not isinstance(leaderboard, list):
+            if leaderboard is not None:  # Unreadable files were already reported
+                logging.warning(f"Leaderboard of {level} is not a list, skipping it")
+            return
+        rows = []
+        for entry in leaderboard:
+            try:
+                rows.append((level, str(entry["name"]), *(int(entry[field]) for field in SCORE_FIELDS[1:])))
+            except (TypeError, KeyError, ValueError):
+                logging.warning(f"Skipping invalid leaderboard entry of {level}: {entry!r}")
+        db.executemany(
+            "INSERT OR IGNORE INTO scores (level, name, score, steps_taken, collectables, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+
+    @staticmethod
+    def _read_json(path):
+        """
+        Reads a JSON file to import.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            object: The file content, or None if it is not valid JSON.
+        """
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            logging.warning(f"Could not import {path}: {e}")
+            return None
+
+
+score_store = ScoreStore()
@@ -0,0 +1,314 @@
+"""
+Script store module.
+Keeps the scripts of the players (one per level, robot and player) in a SQLite database, with every saved revision.
+Revisions are stored as content-addressed blobs (by the SHA-256 hash of the script), so a script saved again without
+changes, or the same script saved by many players, is stored only once. The current scripts are cached in memory, so
+selecting a robot or pressing Play does not touch the disk, and saves are written in the background (see persistence).
+
+Scripts saved as data/level/<level>/script/<robot>_<player>.sds files by older versions of the game are imported the
+first time they are loaded.
+
+Classes:
+    ScriptStore: Versioned, content-addressed store of the player scripts.
+
+Objects:
+    script_store (ScriptStore): Global script store instance.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from src.level.load_level import DEFAULT_LEVEL_PATH
+from src.storage.database import connect, Transaction
+from src.storage.persistence import persistence
+
+STORE_FILE = "data/scripts.db"
+LEGACY_FOLDER = "script"  # Folder of the .sds script files inside each level folder
+SCHEMA_VERSION = 1  # Stored as the database user_version
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    level TEXT NOT NULL,
+    robot TEXT NOT NULL,
+    player TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs (hash),
+    saved REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS versions_script ON versions (level, robot, player, id);
+CREATE TABLE IF NOT EXISTS scripts (
+    level TEXT NOT NULL,
+    robot TEXT NOT NULL,
+    player TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs (hash),
+    saved REAL NOT NULL,
+    PRIMARY KEY (level, robot, player)
+);
+CREATE INDEX IF NOT EXISTS scripts_player ON scripts (player, level);
+CREATE INDEX IF NOT EXISTS scripts_robot ON scripts (robot, level);
+"""
+
+
+def script_hash(text):
+    """
+    Gets the content address of a script.
+
+    Args:
+        text (str): Script text.
+
+    Returns:
+        str: Hexadecimal SHA-256 hash of the script.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScriptStore:
+    """
+    Versioned, content-addressed store of the player scripts. A script is identified by its level folder name,
+    robot name ("red", "blue" or "green") and player name. Saving a script that did not change does nothing.
+
+    Attributes:
+        db_file (str): Database file.
+        level_path (str): Folder containing the level folders (with the legacy script files to import).
+        cache (dict): (level, robot, player) -> current script text (None if the script does not exist).
+        connection (sqlite3.Connection): Open database connection (None until first used).
+        lock (threading.RLock): Guards the connection.
+
+    Methods:
+        load(level, robot, player): Gets the current text of a script.
+        save(level, robot, player, text): Saves a new revision of a script.
+        history(level, robot, player): Lists the saved revisions of a script.
+        restore(level, robot, player, version): Makes a previous revision the current script.
+        list_scripts(level=None, robot=None, player=None): Lists the current scripts matching some filters.
+        close(): Closes the database connection.
+
+    Example:
+        script_store.save("1_First Steps", "red", "Ana", "move();")
+        previous = script_store.history("1_First Steps", "red", "Ana")[1]
+        script_store.restore("1_First Steps", "red", "Ana", previous["version"])
+    """
+    def __init__(self, db_file=STORE_FILE, level_path=DEFAULT_LEVEL_PATH):
+        """
+        Initializes the store. The database is opened on first use.
+
+        Args:
+            db_file (str, optional): Database file. Default is STORE_FILE.
+            level_path (str, optional): Folder containing the level folders. Default is DEFAULT_LEVEL_PATH.
+        """
+        self.db_file = db_file
+        self.level_path = level_path
+        self.cache = {}
+        self.connection = None
+        self.lock = threading.RLock()
+
+
+    def load(self, level, robot, player):
+        """
+        Gets the current text of a script, from the memory cache if it was loaded or saved before.
+
+        Args:
+            level (str): Level folder name.
+            robot (str): Robot name.
+            player (str): Player name.
+
+        Returns:
+            str: Text of the script, or None if it does not exist.
+        """
+        key = (level, robot, player)
+        if key not in self.cache:  # Not loaded nor saved yet in this run
+            self.cache[key] = self._read_current(key)
+        return self.cache[key]
+
+
+    def save(self, level, robot, player, text):
+        """
+        Saves a new revision of a script. The memory cache is updated right away and the revision is written in the
+        background. Nothing is saved if the script did not change.
+
+        Args:
+            level (str): Level folder name.
+            robot (str): Robot name.
+            player (str): Player name.
+            text (str): Text of the script.
+        """
+        key = (level, robot, player)
+        if self.load(level, robot, player) == text:
+            return
+        self.cache[key] = text
+        persistence.submit("scripts", self._write_version, key, text, time.time())
+
+
+    def history(self, level, robot, player):
+        """
+        Lists the saved revisions of a script, newest first (the first one is the current script).
+
+        Args:
+            level (str): Level folder name.
+            robot (str): Robot name.
+            player (str): Player name.
+
+        Returns:
+            list: Revisions, as dicts with their version number, content hash and save time.
+        """
+        self.load(level, robot, player)  # Imports the legacy file of the script, if any
+        persistence.flush("scripts")
+        try:
+            with self.lock:
+                rows = self._connect().execute(
+                    "SELECT id, hash, saved FROM versions WHERE level = ? AND robot = ? AND player = ? ORDER BY id DESC",
+                    (level, robot, player)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to read history of {robot}_{player} in {level}: {e}")
+            return []
+        return [{"version": version, "hash": hash, "saved": saved} for version, hash, saved in rows]
+
+
+    def restore(self, level, robot, player, version):
+        """
+        Makes a previous revision the current script, saving it as a new revision (the history is kept).
+
+        Args:
+            level (str): Level folder name.
+            robot (str): Robot name.
+            player (str): Player name.
+            version (int): Version number of the revision (see history).
+
+        Returns:
+            str: Text of the restored script, or None if the revision does not exist.
+        """
+        persistence.flush("scripts")
+        try:
+            with self.lock:
+                row = self._connect().execute(
+                    "SELECT blobs.text FROM versions JOIN blobs ON blobs.hash = versions.hash "
+                    "WHERE versions.id = ? AND level = ? AND robot = ? AND player = ?",
+                    (version, level, robot, player)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to read version {version} of {robot}_{player} in {level}: {e}")
+            return None
+        if row is None:
+            logging.warning(f"Version {version} of {robot}_{player} in {level} does not exist")
+            return None
+        self.save(level, robot, player, row[0])
+        return row[0]
+
+
+    def list_scripts(self, level=None, robot=None, player=None):
+        """
+        Lists the current scripts matching some filters (each filter uses an index).
+
+        Args:
+            level (str, optional): Level folder name. Default is None (any level).
+            robot (str, optional): Robot name. Default is None (any robot).
+            player (str, optional): Player name. Default is None (any player).
+
+        Returns:
+            list: Scripts, as dicts with their level, robot, player, content hash and save time.
+        """
+        persistence.flush("scripts")
+        filters = {"level": level, "robot": robot, "player": player}
+        where = " AND ".join(f"{column} = ?" for column, value in filters.items() if value is not None)
+        try:
+            with self.lock:
+                rows = self._connect().execute(
+                    "SELECT level, robot, player, hash, saved FROM scripts"
+                    + (f" WHERE {where}" if where else "") + " ORDER BY level, robot, player",
+                    [value for value in filters.values() if value is not None]
+                ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to list scripts: {e}")
+            return []
+        return [dict(zip(("level", "robot", "player", "hash", "saved"), row)) for row in rows]
+
+
+    def close(self):
+        """
+        Closes the database connection (it is opened again if the store is used afterwards).
+        """
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+    def _read_current(self, key):
+        """
+        Reads the current text of a script from the database, importing its legacy script file if it is not stored.
+
+        Args:
+            key (tuple): (level, robot, player) of the script.
+
+        Returns:
+            str: Text of the script, or None if it does not exist.
+        """
+        try:
+            with self.lock:
+                row = self._connect().execute(
+                    "SELECT blobs.text FROM scripts JOIN blobs ON blobs.hash = scripts.hash "
+                    "WHERE level = ? AND robot = ? AND player = ?",
+                    key
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to load script {key}: {e}")
+            return None
+        if row is not None:
+            return row[0]
+
+        level, robot, player = key
+        legacy_file = os.path.join(self.level_path, level, LEGACY_FOLDER, f"{robot}_{player}.sds")
+        try:
+            with open(legacy_file, "r") as f:
+                text = f.read()
+            saved = os.path.getmtime(legacy_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            logging.error(f"Failed to import script {legacy_file}: {e}")
+            return None
+        persistence.submit("scripts", self._write_version, key, text, saved)
+        return text
+
+
+    def _write_version(self, key, text, saved):
+        """
+        Writes a revision of a script (worker thread body of save). The blob is only written if its content is new.
+
+        Args:
+            key (tuple): (level, robot, player) of the script.
+            text (str): Text of the script.
+            saved (float): Save time.
+        """
+        content = script_hash(text)
+        with self.lock, Transaction(self._connect()) as db:
+            current = db.execute(
+                "SELECT hash FROM scripts WHERE level = ? AND robot = ? AND player = ?", key
+            ).fetchone()
+            if current is not None and current[0] == content:  # Saved by another game instance meanwhile
+                return
+            db.execute("INSERT OR IGNORE INTO blobs (hash, text) VALUES (?, ?)", (content, text))
+            db.execute("INSERT INTO versions (level, robot, player, hash, saved) VALUES (?, ?, ?, ?, ?)", (*key, content, saved))
+            db.execute("INSERT OR REPLACE INTO scripts (level, robot, player, hash, saved) VALUES (?, ?, ?, ?, ?)", (*key, content, saved))
+
+
+    def _connect(self):
+        """
+        Gets the database connection, opening the database on first use. Call with the lock held.
+
+        Returns:
+            sqlite3.Connection: The database connection.
+        """
+        if self.connection is None:
+            self.connection = connect(self.db_file, SCHEMA, SCHEMA_VERSION)
+        return self.connection
+
+
+script_store = ScriptStore()
@@ -0,0 +1,171 @@
+"""
+Settings module.
+Keeps the options of the game (data/options.json) in memory: the file is read and validated once, every read is
+served from memory and changes are saved after a short delay, so several changes in a row (toggling mute a few times)
+are written once, in the background (see persistence). Pending changes are saved when the game exits.
+
+Classes:
+    Settings: In-memory settings with validation and delayed saving.
+
+Objects:
+    settings (Settings): Global settings instance.
+"""
+
+import json
+import atexit
+import logging
+import threading
+from src.storage.persistence import persistence
+
+SETTINGS_FILE = "data/options.json"
+SAVE_DELAY = 1.0  # Seconds without changes before the settings are saved
+
+# Setting -> (validation function, default value)
+SCHEMA = {
+    "last_player": (lambda value: isinstance(value, str) and value != "", "Anonymous"),  # Name of the last player
+    "mute": (lambda value: type(value) is int and value in (0, 1), 0),  # Sound effects muted
+    "mute_music": (lambda value: type(value) is int and value in (0, 1), 0),  # Music muted
+}
+
+
+class Settings:
+    """
+    In-memory settings with validation and delayed saving. Settings with a missing or invalid value get their
+    default value (the fixed file is saved back); settings not in the schema are kept as they are.
+
+    Attributes:
+        settings_file (str): File the settings are saved to.
+        values (dict): Setting -> value.
+        loaded (bool): Whether the settings file was loaded.
+        timer (threading.Timer): Timer of the pending save (None if there are no unsaved changes).
+        lock (threading.RLock): Guards the values and the timer.
+
+    Methods:
+        get(key): Gets the value of a setting.
+        set(key, value): Changes a setting and schedules a save.
+        load(): Loads and validates the settings file.
+        flush(): Saves the pending changes right away.
+
+    Example:
+        settings.set("mute", 1)
+        print(settings.get("last_player"))
+    """
+    def __init__(self, settings_file=SETTINGS_FILE):
+        """
+        Initializes the settings. The settings file is loaded on first use.
+
+        Args:
+            settings_file (str, optional): File the settings are saved to. Default is SETTINGS_FILE.
+        """
+        self.settings_file = settings_file
+        self.values = {}
+        self.loaded = False
+        self.timer = None
+        self.lock = threading.RLock()
+
+
+    def get(self, key):
+        """
+        Gets the value of a setting.
+
+        Args:
+            key (str): Setting name (a key of SCHEMA).
+
+        Returns:
+            object: Value of the setting.
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            return self.values[key]
+
+
+    def set(self, key, value):
+        """
+        Changes a setting. The settings are saved SAVE_DELAY seconds after the last change.
+
+        Args:
+            key (str): Setting name (a key of SCHEMA).
+            value (object): New value.
+
+        Raises:
+            ValueError: If the setting is not known or the value is not valid.
+        """
+        if key not in SCHEMA:
+            raise ValueError(f"unknown setting {key!r}")
+        if not SCHEMA[key][0](value):
+            raise ValueError(f"invalid value for setting {key!r}: {value!r}")
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            if self.values[key] == value:
+                return
+            self.values[key] = value
+            self._schedule_save()
+
+
+    def load(self):
+        """
+        Loads and validates the settings file. A missing, corrupted or invalid file is replaced (saved after SAVE_DELAY)
+        with the valid settings it had and the default values of the others.
+        """
+        with self.lock:
+            self.loaded = True
+            try:
+                with open(self.settings_file, "r") as f:
+                    values = json.load(f)
+                if not isinstance(values, dict):
+                    raise ValueError("not a JSON object")
+            except FileNotFoundError:
+                logging.warning("Options file not found. Creating a new one.")
+                values = {}
+            except (OSError, UnicodeDecodeError, ValueError) as e:
+                logging.warning(f"Options file is corrupted: {e}. Recreating the file.")
+                values = {}
+
+            valid = True
+            report = bool(values)  # Missing settings of a new file are not worth a warning
+            for key, (is_valid, default) in SCHEMA.items():
+                if key not in values or not is_valid(values[key]):
+                    if report:
+                        logging.warning(f"Invalid or missing option {key!r}, using {default!r}")
+                    values[key] = default
+                    valid = False
+            self.values = values
+            if not valid:
+                self._schedule_save()
+
+
+    def flush(self):
+        """
+        Saves the pending changes right away (written in the background, see persistence).
+        """
+        with self.lock:
+            if self.timer is None:
+                return
+            self.timer.cancel()
+            self._save()
+
+
+    def _schedule_save(self):
+        """
+        Schedules a save SAVE_DELAY seconds from now, replacing the one pending. Call with the lock held.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(SAVE_DELAY, self._save)
+        self.timer.daemon = True
+        self.timer.start()
+
+
+    def _save(self):
+        """
+        Queues the write of the settings file (timer thread body of the delayed saves).
+        """
+        with self.lock:
+            self.timer = None
+            persistence.write_text(self.settings_file, json.dumps(self.values))
+
+
+settings = Settings()
+atexit.register(settings.flush)  # Exit functions run in reverse order, so this runs before persistence.shutdown
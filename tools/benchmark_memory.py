@@ -0,0 +1,173 @@
+"""
+Memory benchmark.
+Measures the memory used by the per-cell representation of a large generated level:
+the Tile matrix, the entities and the LevelGrid arrays. The slotted classes are compared against
+dict-backed copies of the same objects, to see what __slots__ saves per simulated level instance.
+Levels no longer keep a Tile matrix (level.tiles are views of the LevelGrid), so the Tile rows show what
+that saves.
+
+Usage (from the project root):
+    python -m tools.benchmark_memory [--size 500] [--seed 1]
+"""
+
+import os
+import sys
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.level.tile import Tile
+from src.level.grid import LevelGrid, PATH, MID_WALL, LAYERS
+from src.level.generate import generate_warehouse
+from src.entities.blue import Blue
+from src.entities.charge_pad import ChargePad
+from src.entities.collectable import Collectable
+from src.entities.crate import Crate
+from src.entities.crate_del import CrateDel
+from src.entities.green import Green
+from src.entities.red import Red
+
+ENTITY_CLASSES = {
+    "Blue": lambda e: Blue(e["x"], e["y"], e.get("direction", "N")),
+    "Red": lambda e: Red(e["x"], e["y"], e.get("direction", "N")),
+    "Green": lambda e: Green(e["x"], e["y"], e.get("direction", "N")),
+    "ChargePad": lambda e: ChargePad(e["x"], e["y"], 0),
+    "CrateDel": lambda e: CrateDel(e["x"], e["y"], 0),
+    "Crate": lambda e: Crate(e["x"], e["y"], 1, small=e.get("small", False)),
+    "Collectable": lambda e: Collectable(e["x"], e["y"], 1),
+}
+
+
+class DictBacked:
+    """
+    Plain class without __slots__, used to rebuild the previous dict-backed representation of an object.
+    """
+
+
+def as_dict_backed(obj):
+    """
+    Copy the slotted attributes of an object into a new dict-backed object.
+
+    Args:
+        obj (object): Slotted object (Tile or Entity).
+
+    Returns:
+        DictBacked: The dict-backed copy (the "entities" of tiles become a dictionary, as they used to be).
+    """
+    copy = DictBacked()
+    for klass in type(obj).__mro__:
+        for name in getattr(klass, "__slots__", ()):
+            value = getattr(obj, name)
+            setattr(copy, name, dict(value.items()) if name == "entities" else value)
+    return copy
+
+
+def measure(build):
+    """
+    Measure the memory allocated by a build function, keeping its result alive while measuring.
+
+    Args:
+        build (function): Function that builds the structure to measure.
+
+    Returns:
+        int: Allocated bytes.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def build_tiles(structure, tile_class, image):
+    """
+    Build the Tile matrix of a structure, as Level does (all tiles share the same image here).
+
+    Args:
+        structure (dict): Level structure.
+        tile_class (type): Tile class to instance.
+        image (pygame.Surface): Image for every tile.
+
+    Returns:
+        list: 2D list of tiles.
+    """
+    width, height = structure["size"]
+    matrix = structure["matrix"]
+    tiles = [[tile_class(x, y, image) for x in range(width)] for y in range(height)]
+    for y in range(height):
+        for x in range(width):
+            if matrix[y][x] == PATH:
+                tiles[y][x].set_path()
+            elif matrix[y][x] == MID_WALL:
+                tiles[y][x].set_mid_wall()
+    return tiles
+
+
+def build_entities(structure, factories):
+    """
+    Build the entities of a structure.
+
+    Args:
+        structure (dict): Level structure.
+        factories (dict): Entity type name -> factory function.
+
+    Returns:
+        list: List of entities.
+    """
+    return [factories[e["type"]](e) for entity_list in structure["entities"].values() for e in entity_list]
+
+
+def build_grid(structure):
+    """
+    Build the LevelGrid of a structure, registering the entities in their layers.
+
+    Args:
+        structure (dict): Level structure.
+
+    Returns:
+        LevelGrid: The grid.
+    """
+    grid = LevelGrid.from_matrix(structure["matrix"])
+    for height, entity_list in structure["entities"].items():
+        layer = LAYERS.index(height)
+        for e in entity_list:
+            grid.place(ENTITY_CLASSES[e["type"]](e), e["x"], e["y"], layer)
+    return grid
+
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    parser = argparse.ArgumentParser(description="Measure the per-level memory of the level representations.")
+    parser.add_argument("--size", type=int, default=500, help="Width and height of the generated level (default 500).")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the level generator (default 1).")
+    args = parser.parse_args()
+
+    structure = generate_warehouse(args.size, args.size, seed=args.seed)
+    structure["matrix"] = structure["matrix"].tolist()  # Same as read from structure.json
+    cells = args.size * args.size
+    entity_count = sum(len(entity_list) for entity_list in structure["entities"].values())
+    image = pygame.Surface((1, 1))
+
+    dict_factories = {name: (lambda e, factory=factory: as_dict_backed(factory(e))) for name, factory in ENTITY_CLASSES.items()}
+
+    results = [
+        ("Tiles (slots)", measure(lambda: build_tiles(structure, Tile, image)), cells),
+        ("Tiles (dict)", measure(lambda: [[as_dict_backed(t) for t in row] for row in build_tiles(structure, Tile, image)]), cells),
+        ("Entities (slots)", measure(lambda: build_entities(structure, ENTITY_CLASSES)), entity_count),
+        ("Entities (dict)", measure(lambda: build_entities(structure, dict_factories)), entity_count),
+        ("LevelGrid", measure(lambda: build_grid(structure)), cells),
+    ]
+
+    print(f"Generated level: {args.size}x{args.size} ({cells} tiles, {entity_count} entities)")
+    for name, size, count in results:
+        print(f"{name:<18} {size / 2**20:>10.2f} MiB {size / count:>10.1f} B/item")
+
+
+if __name__ == "__main__":
+    main()
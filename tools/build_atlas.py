@@ -0,0 +1,43 @@
+"""
+Sprite atlas builder.
+Builds the sprite atlases of the given tile sizes into the atlas cache ahead of time, so the game does not have to
+build them on the first level it draws. Atlases already cached for the current sprites are left untouched.
+
+Usage (from the project root):
+    python -m tools.build_atlas [--sizes 64] [--force]
+"""
+
+import os
+import sys
+import glob
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.render.sprite_atlas import ATLAS_FOLDER, atlas_hash, load_atlas
+
+
+def main():
+    """
+    Build the atlases and print where they were saved.
+    """
+    parser = argparse.ArgumentParser(description="Build the sprite atlases of the level sprites.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64], help="Tile sizes to build atlases for (default 64).")
+    parser.add_argument("--force", action="store_true", help="Rebuild the atlases even if they are cached.")
+    args = parser.parse_args()
+
+    pygame.init()
+    for tile_size in args.sizes:
+        base_path = os.path.join(ATLAS_FOLDER, f"atlas_{tile_size}_{atlas_hash(tile_size)[:16]}")
+        for old_path in glob.glob(os.path.join(ATLAS_FOLDER, f"atlas_{tile_size}_*")):
+            if args.force or not old_path.startswith(base_path):  # Stale atlases of older sprites
+                os.remove(old_path)
+
+        atlas = load_atlas(tile_size)
+        width, height = atlas.surface.get_size()
+        print(f"Tile size {tile_size}: {len(atlas.rects)} sprite rects, {width}x{height} -> {base_path}.png")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Level pack builder.
+Compiles a level folder, or a whole tree of level folders, into the level pack, so the game loads the levels from
+the pack without parsing, validating and splitting them first. Levels already packed with unchanged source files
+are left untouched. Compiling a whole tree drops the packed levels that are no longer in it.
+
+The game appends the levels it compiles to the pack, leaving the sections they replace unused; the pack is compacted
+here, when it has unused space or levels were compiled or dropped.
+
+Usage (from the project root):
+    python -m tools.build_level_pack [path] [--output data/cache/levels.pack] [--force]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.level.load_level import DEFAULT_LEVEL_PATH
+from src.level.level_pack import PACK_FILE, build_pack, open_pack
+from src.render.error_handler import error_handler
+
+
+def main():
+    """
+    Build the pack and print the state of each level.
+    """
+    parser = argparse.ArgumentParser(description="Compile level folders into a level pack.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_LEVEL_PATH, help="Level folder, or folder of level folders (default data/level).")
+    parser.add_argument("--output", default=PACK_FILE, help=f"Pack file to write (default {PACK_FILE}).")
+    parser.add_argument("--force", action="store_true", help="Compile the levels even if they are up to date.")
+    args = parser.parse_args()
+
+    path = os.path.normpath(args.path)
+    if os.path.exists(os.path.join(path, "structure.json")):  # A single level folder
+        level_path, folders = os.path.dirname(path), [os.path.basename(path)]
+        prune = False  # Keep the other packed levels
+    else:
+        level_path = path
+        prune = True  # The pack holds exactly the levels of the tree
+        folders = sorted(
+            folder for folder in os.listdir(level_path)
+            if os.path.exists(os.path.join(level_path, folder, "structure.json"))
+        )
+
+    pygame.init()
+    error_handler.set_headless(True)  # Collect the errors of invalid levels instead of showing them
+    compiled = build_pack(folders, level_path, args.output, force=args.force, prune=prune, compact=True)
+
+    pack = open_pack(args.output)
+    packed = pack.levels if pack is not None else {}
+    for folder in folders:
+        if folder in compiled:
+            print(f"{folder}: compiled")
+        elif folder in packed:
+            print(f"{folder}: up to date")
+        else:
+            print(f"{folder}: not valid, left out of the pack")
+    for record in error_handler.records:
+        print(f"  {record.title}: {record.message}")
+    if pack is not None:
+        print(f"{len(packed)} levels -> {args.output} ({os.path.getsize(args.output) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
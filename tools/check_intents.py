@@ -0,0 +1,100 @@
+"""
+Intent resolution check.
+Runs small multi-robot scenarios through Level.resolve_intents (the TICK_INTENTS mode of the game manager) and checks
+the conflict rules: robots claiming the same tile all fail, a robot can move into a tile another robot is leaving
+(trains move, unless the front robot is blocked), and robots swapping places fail. Every scenario is run with the
+robots in every order, as the outcome must not depend on it.
+
+Usage (from the project root):
+    python -m tools.check_intents
+"""
+
+import os
+import sys
+import logging
+import itertools
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.level.level import Level
+from src.entities.red import Red
+from src.entities.blue import Blue
+from src.script.interpreter import ActionIntent
+from src.render.error_handler import error_handler
+
+# Scenario -> (robots as (class, x, y, direction), expected results, expected positions after the tick)
+# All robots move, on an open 5x3 level
+SCENARIOS = {
+    "contested tile": (
+        [(Red, 1, 1, "E"), (Blue, 3, 1, "W")],
+        [False, False],
+        [(1, 1), (3, 1)],
+    ),
+    "train": (
+        [(Red, 1, 1, "E"), (Blue, 2, 1, "E")],
+        [True, True],
+        [(2, 1), (3, 1)],
+    ),
+    "swap": (
+        [(Red, 1, 1, "E"), (Blue, 2, 1, "W")],
+        [False, False],
+        [(1, 1), (2, 1)],
+    ),
+    "blocked train": (  # The front robot runs into the edge of the level, the one behind it can not follow
+        [(Red, 3, 1, "E"), (Blue, 4, 1, "E")],
+        [False, False],
+        [(3, 1), (4, 1)],
+    ),
+}
+
+
+def run_scenario(robots, order):
+    """
+    Run one tick of a scenario, with every robot moving.
+
+    Args:
+        robots (list): Robots as (class, x, y, direction).
+        order (tuple): Order of the robots in the intents (indexes of robots).
+
+    Returns:
+        tuple: (results, positions, success), results and positions in the order of robots.
+    """
+    level = Level(5, 3, None, remove_callback=lambda entity: None, img_mtx=[[pygame.Surface((64, 64))] * 5] * 3)
+    level.set_terrain([[0] * 5] * 3)
+    entities = []
+    for robot_class, x, y, direction in robots:
+        robot = robot_class(x, y, direction)
+        robot.height = 1  # Ground robots
+        level.add_entity(robot)
+        entities.append(robot)
+    results = level.resolve_intents({entities[i]: ActionIntent("move", []) for i in order})
+    return [results[robot] for robot in entities], [(robot.x, robot.y) for robot in entities], level.success
+
+
+def main():
+    """
+    Run every scenario in every robot order and report the failures.
+    """
+    logging.disable(logging.CRITICAL)  # Failed moves are expected here
+    error_handler.set_headless(True)
+    pygame.init()
+
+    failures = 0
+    for name, (robots, expected_results, expected_positions) in SCENARIOS.items():
+        for order in itertools.permutations(range(len(robots))):
+            results, positions, success = run_scenario(robots, order)
+            if results != expected_results or positions != expected_positions or success != all(expected_results):
+                failures += 1
+                print(f"FAIL {name} (order {order}): results {results}, positions {positions}, level success {success}")
+        print(f"{name}: checked")
+
+    pygame.quit()
+    if failures:
+        print(f"{failures} failed checks")
+        sys.exit(1)
+    print("All intent conflict rules hold")
+
+
+if __name__ == "__main__":
+    main()
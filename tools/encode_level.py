@@ -0,0 +1,77 @@
+"""
+Level matrix encoder.
+Rewrites the "matrix" of level structure files in a compact encoding (run-length rows or bit planes, see
+src/level/matrix_encoding.py), or back to plain lists of rows. Can also write a generated warehouse level,
+for testing large levels.
+
+Usage (from the project root):
+    python -m tools.encode_level "data/level/1_First Steps/structure.json" [--encoding rle|bitplanes|plain]
+    python -m tools.encode_level new_level/structure.json --generate 2000 [--seed 1] [--encoding bitplanes]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from src.level.grid import LevelGrid
+from src.level.generate import generate_warehouse
+from src.level.matrix_encoding import ENCODINGS, encode_matrix, iter_matrix_rows
+
+
+def read_terrain(structure):
+    """
+    Read the terrain codes of a structure, whatever its matrix encoding.
+
+    Args:
+        structure (dict): Level structure.
+
+    Returns:
+        numpy.ndarray: (height, width) array of terrain codes.
+    """
+    width, height = structure["size"]
+    matrix = structure["matrix"]
+    if not isinstance(matrix, dict):
+        return np.asarray(matrix, dtype=np.uint8)
+    grid = LevelGrid(width, height)
+    if not grid.set_terrain_rows(iter_matrix_rows(matrix, width, height)):
+        raise ValueError("matrix does not match the level size")
+    return grid.terrain
+
+
+def main():
+    """
+    Encode the structure files and print their new sizes.
+    """
+    parser = argparse.ArgumentParser(description="Rewrite the matrix of level structure files in a compact encoding.")
+    parser.add_argument("paths", nargs="+", help="structure.json files to rewrite (or to write, with --generate).")
+    parser.add_argument("--encoding", choices=ENCODINGS + ("plain",), default="rle", help="Matrix encoding (default rle).")
+    parser.add_argument("--generate", type=int, metavar="SIZE", help="Write a generated SIZE x SIZE warehouse level instead.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the level generator (default 1).")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if args.generate:
+            structure = generate_warehouse(args.generate, args.generate, seed=args.seed)
+            terrain = structure["matrix"]
+        else:
+            with open(path, "r") as f:
+                structure = json.load(f)
+            try:
+                terrain = read_terrain(structure)
+            except (KeyError, ValueError) as e:
+                print(f"{path}: not a valid level structure ({e}), skipped")
+                continue
+
+        structure["matrix"] = terrain.tolist() if args.encoding == "plain" else encode_matrix(terrain, args.encoding)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(structure, f)
+        print(f"{path}: {args.encoding} matrix, {os.path.getsize(path) // 1024} KB")
+
+
+if __name__ == "__main__":
+    main()
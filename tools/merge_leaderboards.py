@@ -0,0 +1,310 @@
+"""
+Leaderboard merger.
+Merges the leaderboards collected from many machines (their data/scores.db score stores, the leaderboard.json files
+of older versions of the game, or chunks exported by this tool) into one top-N leaderboard per level. The sources are
+streamed through a k-way merge ordered by level, score and timestamp, so memory stays bounded by the number of sources
+and N, not by the number of scores. Scores found in several sources (same name, level and timestamp) are only counted
+once.
+
+Score stores are read in merge order straight from their rank index. Chunks are JSON Lines files (.jsonl), one score
+per line with its level, sorted by level, score, timestamp and name. Chunks written with --export are sorted this way,
+so partial merges can be merged again.
+
+Usage (from the project root):
+    python -m tools.merge_leaderboards path [path ...] [--top 10] [--output data/scores.db] [--export merged.jsonl]
+
+Paths can be score stores (.db), leaderboard.json files, chunks, or folders searched for them. --output adds the merged
+scores to a score store (scores already in it are skipped), without touching its other scores nor the player progress.
+Without --output nor --export, the merged leaderboards are printed.
+"""
+
+import os
+import sys
+import json
+import heapq
+import sqlite3
+import argparse
+from collections import defaultdict
+from urllib.request import pathname2url
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.storage.database import connect, Transaction
+from src.storage.score_store import DEFAULT_TOP_SIZE, SCORE_FIELDS, SCHEMA, SCHEMA_VERSION
+
+LEADERBOARD_FILE = "leaderboard.json"
+CHUNK_EXTENSION = ".jsonl"
+STORE_EXTENSION = ".db"
+STORE_CACHE_SIZE = 256  # KiB of page cache of each score store read (the default is 2 MiB per store)
+
+
+def parse_entry(level, entry):
+    """
+    Validates a score entry and gets its merge row.
+
+    Args:
+        level (str): Level folder name.
+        entry (dict): Score entry (name, score, steps_taken, collectables and timestamp).
+
+    Returns:
+        tuple: (level, score, timestamp, name, entry) row, or None if the entry is not valid.
+    """
+    if level in ("", ".", "..") or "/" in level or "\\" in level:  # Not a level folder name
+        return None
+    try:
+        entry = {"name": str(entry["name"]), **{field: int(entry[field]) for field in SCORE_FIELDS[1:]}}
+    except (TypeError, KeyError, ValueError):
+        return None
+    return (level, entry["score"], entry["timestamp"], entry["name"], entry)
+
+
+def merge_key(row):
+    """
+    Gets the merge order of a row: level, then lowest score, older first on ties (as the game ranks the scores),
+    then name.
+
+    Args:
+        row (tuple): Merge row (see parse_entry).
+
+    Returns:
+        tuple: (level, score, timestamp, name).
+    """
+    return row[:4]
+
+
+def find_sources(paths):
+    """
+    Finds the score stores, leaderboard files and chunks to merge.
+
+    Args:
+        paths (list): Score stores, leaderboard.json files, chunks, or folders searched (recursively) for them.
+
+    Returns:
+        tuple: (stores, leaderboards, chunks), with stores and chunks as lists of files and leaderboards as
+            level -> leaderboard files.
+    """
+    stores = []
+    leaderboards = defaultdict(list)
+    chunks = []
+
+    def add(file):
+        if file.endswith(STORE_EXTENSION):
+            stores.append(file)
+        elif file.endswith(CHUNK_EXTENSION):
+            chunks.append(file)
+        else:  # A leaderboard file, in its level folder
+            leaderboards[os.path.basename(os.path.dirname(os.path.abspath(file)))].append(file)
+
+    for path in paths:
+        if not os.path.isdir(path):
+            add(path)
+            continue
+        for folder, _, files in os.walk(path):
+            for file in sorted(files):
+                if file == LEADERBOARD_FILE or file.endswith((STORE_EXTENSION, CHUNK_EXTENSION)):
+                    add(os.path.join(folder, file))
+    return stores, leaderboards, chunks
+
+
+def read_leaderboard(level, path, top):
+    """
+    Reads the best distinct scores of a leaderboard file (only those can be in the merged top).
+
+    Args:
+        level (str): Level folder name.
+        path (str): Path to the leaderboard file.
+        top (int): Number of scores to keep.
+
+    Returns:
+        list: Merge rows (see parse_entry), best first.
+    """
+    try:
+        with open(path, "r") as f:
+            leaderboard = json.load(f)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f"Skipping {path}: {e}", file=sys.stderr)
+        return []
+    if not isinstance(leaderboard, list):
+        print(f"Skipping {path}: not a list of scores", file=sys.stderr)
+        return []
+
+    rows = sorted((row for row in (parse_entry(level, entry) for entry in leaderboard) if row is not None), key=merge_key)
+    if len(rows) < len(leaderboard):
+        print(f"Skipped {len(leaderboard) - len(rows)} invalid scores of {path}", file=sys.stderr)
+    return list(top_rows(rows, top))
+
+
+def stream_leaderboards(leaderboards, top):
+    """
+    Streams the scores of the leaderboard files, level by level, so only the files of one level are loaded at a time.
+
+    Args:
+        leaderboards (dict): Level -> leaderboard files.
+        top (int): Number of scores to keep per level.
+
+    Yields:
+        tuple: Merge rows (see parse_entry), in merge order.
+    """
+    for level in sorted(leaderboards):
+        yield from heapq.merge(*(read_leaderboard(level, path, top) for path in leaderboards[level]), key=merge_key)
+
+
+def stream_store(path):
+    """
+    Streams the scores of a score store, read-only, in merge order (served by its rank index).
+
+    Args:
+        path (str): Path to the score store database.
+
+    Yields:
+        tuple: Merge rows (see parse_entry), in merge order.
+
+    Raises:
+        sqlite3.Error: If the file is not a score store.
+    """
+    connection = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+    try:
+        connection.execute(f"PRAGMA cache_size = -{STORE_CACHE_SIZE}")  # Read once in order, a big cache does not help
+        cursor = connection.execute(
+            "SELECT level, score, timestamp, name, steps_taken, collectables FROM scores "
+            "ORDER BY level, score, timestamp, name"
+        )
+        for level, score, timestamp, name, steps_taken, collectables in cursor:
+            entry = {"name": name, "score": score, "steps_taken": steps_taken, "collectables": collectables, "timestamp": timestamp}
+            yield (level, score, timestamp, name, entry)
+    finally:
+        connection.close()
+
+
+def stream_chunk(path):
+    """
+    Streams the scores of a chunk, line by line.
+
+    Args:
+        path (str): Path to the chunk.
+
+    Yields:
+        tuple: Merge rows (see parse_entry), in merge order.
+
+    Raises:
+        ValueError: If the chunk is not sorted.
+    """
+    previous = None
+    with open(path, "r") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                row = parse_entry(str(entry["level"]), entry)
+            except (json.JSONDecodeError, TypeError, KeyError):
+                row = None
+            if row is None:
+                print(f"Skipping invalid score at {path}:{number}", file=sys.stderr)
+                continue
+            if previous is not None and merge_key(row) < previous:
+                raise ValueError(f"{path}:{number} is out of order (chunks must be sorted, see --export)")
+            previous = merge_key(row)
+            yield row
+
+
+def top_rows(rows, top):
+    """
+    Keeps the best distinct scores of each level of a stream of merge rows.
+
+    Args:
+        rows (iterable): Merge rows (see parse_entry), in merge order.
+        top (int): Number of scores to keep per level.
+
+    Yields:
+        tuple: The first `top` rows of each level, without repeated scores (same name and timestamp).
+    """
+    level, seen = None, set()
+    for row in rows:
+        if row[0] != level:
+            level, seen = row[0], set()
+        key = (row[3], row[2])  # Name and timestamp (the level is the same)
+        if len(seen) < top and key not in seen:  # Only the kept scores are remembered
+            seen.add(key)
+            yield row
+
+
+def main():
+    """
+    Merge the leaderboards and write, export or print the result.
+    """
+    parser = argparse.ArgumentParser(description="Merge leaderboards from many machines into a top-N per level.")
+    parser.add_argument("paths", nargs="+", help="Score stores (.db), leaderboard.json files, .jsonl chunks, or folders containing them.")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_SIZE, help=f"Scores kept per level (default {DEFAULT_TOP_SIZE}).")
+    parser.add_argument("--output", help="Score store to add the merged scores to (such as data/scores.db), not one of the merged ones.")
+    parser.add_argument("--export", help="Chunk file to write the merged scores to.")
+    args = parser.parse_args()
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+
+    stores, leaderboards, chunks = find_sources(args.paths)
+    if args.output and os.path.exists(args.output) and any(os.path.samefile(args.output, store) for store in stores):
+        parser.error("--output can not be one of the merged score stores (scores already in it are skipped anyway)")
+    streams = (
+        [stream_store(path) for path in stores]
+        + [stream_leaderboards(leaderboards, args.top)]
+        + [stream_chunk(path) for path in chunks]
+    )
+    print(
+        f"Merging {len(stores)} score stores, {sum(map(len, leaderboards.values()))} leaderboard files "
+        f"and {len(chunks)} chunks",
+        file=sys.stderr
+    )
+
+    output = export = None
+    levels, added, level, board = 0, 0, None, []
+
+    def finish_level():
+        nonlocal added
+        if output is not None:
+            changes = output.total_changes
+            with Transaction(output) as db:  # One short transaction per level, so running games are not held up
+                db.executemany(
+                    "INSERT OR IGNORE INTO scores (level, name, score, steps_taken, collectables, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(level, *(entry[field] for field in SCORE_FIELDS)) for entry in board]
+                )
+            added += output.total_changes - changes
+        elif not args.export:
+            print(f"{level}:")
+            for rank, entry in enumerate(board, 1):
+                print(f"  {rank:>3}. {entry['name']}: {entry['score']} ({entry['steps_taken']} steps, {entry['collectables']}% collected)")
+
+    try:
+        if args.output:
+            output = connect(args.output, SCHEMA, SCHEMA_VERSION)
+        if args.export:
+            export = open(f"{args.export}.tmp", "w")
+        for row in top_rows(heapq.merge(*streams, key=merge_key), args.top):
+            if row[0] != level:
+                if level is not None:
+                    finish_level()
+                levels, level, board = levels + 1, row[0], []
+            board.append(row[4])
+            if export is not None:
+                export.write(json.dumps({"level": row[0], **row[4]}) + "\n")
+        if level is not None:
+            finish_level()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Merge failed: {e}", file=sys.stderr)
+        if export is not None:
+            export.close()
+            os.remove(export.name)
+        sys.exit(1)
+    finally:
+        if output is not None:
+            output.close()  # The levels already merged are kept (merging again skips them)
+
+    if export is not None:
+        export.close()
+        os.replace(export.name, args.export)
+    print(f"Merged {levels} levels" + (f", {added} new scores in {args.output}" if output is not None else ""), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()